@@ -2,12 +2,31 @@ import logging
 import voluptuous as vol
 from typing import List, Dict, Any, Optional
 
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.discovery import async_load_platform
-from homeassistant.helpers import area_registry as ar, entity_registry as er
-
-from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_SEGMENTS, CONF_AREA, CONF_DEBUG, CONF_OCCUPANCY_COOLDOWN, CONF_MIN_SEGMENT_DURATION, CONF_SEGMENT_ATTRIBUTE, CONF_SENSOR_PLATFORM
+from homeassistant.helpers import area_registry as ar
+
+from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_SEGMENTS, CONF_AREA, CONF_DEBUG, CONF_OCCUPANCY_COOLDOWN, CONF_MIN_SEGMENT_DURATION, CONF_SEGMENT_ATTRIBUTE, CONF_SENSOR_PLATFORM, CONF_PLAN_UPDATE_DELAY
+from .const import (
+    CONF_COMMAND_STRATEGIES,
+    CONF_DEFAULT_SEGMENT_DURATION,
+    CONF_HONORS_ORDER,
+    CONF_MAX_DURATION,
+    CONF_PRIORITY,
+    CONF_MANUFACTURER,
+    CONF_SEGMENTS_KEY,
+    CONF_SERVICE,
+    CONF_SERVICE_DATA,
+    CONF_STRATEGY_NAME,
+    CONF_START_TIMEOUT,
+    CONF_STOP_TIMEOUT,
+    CONF_SWITCH_TIMEOUT,
+    DEFAULT_SEGMENT_DURATION,
+    DEFAULT_START_TIMEOUT,
+    DEFAULT_STOP_TIMEOUT,
+    DEFAULT_SWITCH_TIMEOUT,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,6 +37,16 @@ ROOM_SCHEMA = vol.Schema({
     vol.Optional(CONF_OCCUPANCY_COOLDOWN): cv.positive_int,
     vol.Optional(CONF_SEGMENT_ATTRIBUTE): cv.string,
     vol.Optional(CONF_SENSOR_PLATFORM): cv.string,
+    vol.Optional(CONF_PRIORITY, default=1): vol.All(vol.Coerce(int), vol.Range(min=1)),
+})
+
+STRATEGY_SCHEMA = vol.Schema({
+    vol.Required(CONF_STRATEGY_NAME): cv.string,
+    vol.Required(CONF_MANUFACTURER): cv.string,
+    vol.Required(CONF_SERVICE): cv.service,
+    vol.Optional(CONF_SEGMENTS_KEY, default="segments"): cv.string,
+    vol.Optional(CONF_SERVICE_DATA, default={}): dict,
+    vol.Optional(CONF_HONORS_ORDER, default=False): cv.boolean,
 })
 
 CONFIG_SCHEMA = vol.Schema({
@@ -26,8 +55,14 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_DEBUG, default=False): cv.boolean,
         vol.Optional(CONF_OCCUPANCY_COOLDOWN, default=0): cv.positive_int,
         vol.Optional(CONF_MIN_SEGMENT_DURATION, default=180): cv.positive_int,
+        vol.Optional(CONF_DEFAULT_SEGMENT_DURATION, default=DEFAULT_SEGMENT_DURATION): vol.All(vol.Coerce(int), vol.Range(min=1)),
         vol.Optional(CONF_SEGMENT_ATTRIBUTE, default="current_segment"): cv.string,
         vol.Optional(CONF_SENSOR_PLATFORM, default=None): vol.Any(cv.string, None),
+        vol.Optional(CONF_PLAN_UPDATE_DELAY, default=1.0): cv.positive_float,
+        vol.Optional(CONF_START_TIMEOUT, default=DEFAULT_START_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(CONF_STOP_TIMEOUT, default=DEFAULT_STOP_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(CONF_SWITCH_TIMEOUT, default=DEFAULT_SWITCH_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(CONF_COMMAND_STRATEGIES, default=[]): vol.All(cv.ensure_list, [STRATEGY_SCHEMA]),
     }),
 }, extra=vol.ALLOW_EXTRA)
 
@@ -134,16 +169,18 @@ async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
         # Continue without card - not critical
 
     # Register services
-    async def handle_reset_toggles(call: ServiceCall) -> None:
+    async def handle_reset_toggles(call: ServiceCall) -> ServiceResponse:
         try:
-            await manager.reset_all_toggles()
+            result = await manager.reset_all_toggles()
+            return result if call.return_response else None
         except Exception as err:
             _LOGGER.error(f"Error in reset_all_toggles service: {err}", exc_info=True)
             raise
 
-    async def handle_clean_all(call: ServiceCall) -> None:
+    async def handle_clean_all(call: ServiceCall) -> ServiceResponse:
         try:
-            await manager.start_cleaning()
+            result = await manager.start_cleaning(max_duration=call.data.get(CONF_MAX_DURATION))
+            return result if call.return_response else None
         except Exception as err:
             _LOGGER.error(f"Error in clean_all_enabled service: {err}", exc_info=True)
             raise
@@ -159,17 +196,32 @@ async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
             _LOGGER.error(f"Error in clean_specific_room service: {err}", exc_info=True)
             raise
 
-    async def handle_stop_cleaning(call: ServiceCall) -> None:
+    async def handle_stop_cleaning(call: ServiceCall) -> ServiceResponse:
         try:
-            await manager.stop_cleaning()
+            result = await manager.stop_cleaning()
+            return result if call.return_response else None
         except Exception as err:
             _LOGGER.error(f"Error in stop_cleaning service: {err}", exc_info=True)
             raise
 
-    hass.services.async_register(DOMAIN, "reset_all_toggles", handle_reset_toggles)
-    hass.services.async_register(DOMAIN, "clean_all_enabled", handle_clean_all)
+    async def handle_get_diagnostics(call: ServiceCall) -> ServiceResponse:
+        return manager.diagnostics
+
+    hass.services.async_register(
+        DOMAIN, "reset_all_toggles", handle_reset_toggles, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, "clean_all_enabled", handle_clean_all,
+        schema=vol.Schema({vol.Optional(CONF_MAX_DURATION): vol.All(vol.Coerce(float), vol.Range(min=1))}),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     hass.services.async_register(DOMAIN, "clean_specific_room", handle_clean_room)
-    hass.services.async_register(DOMAIN, "stop_cleaning", handle_stop_cleaning)
+    hass.services.async_register(
+        DOMAIN, "get_diagnostics", handle_get_diagnostics, supports_response=SupportsResponse.ONLY
+    )
+    hass.services.async_register(
+        DOMAIN, "stop_cleaning", handle_stop_cleaning, supports_response=SupportsResponse.OPTIONAL
+    )
 
     return True
 
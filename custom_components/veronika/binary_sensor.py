@@ -1,16 +1,14 @@
 import logging
-from typing import Any, Dict, List, Optional, Set, Callable
+from typing import Any, Dict, List, Optional, Set
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.core import HomeAssistant, callback, Event
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.helpers import area_registry as ar, entity_registry as er, device_registry as dr
-from homeassistant.util import slugify, dt as dt_util
-from homeassistant.const import STATE_ON, STATE_OFF, STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.helpers.event import async_call_later
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_AREA, CONF_SEGMENTS, CONF_OCCUPANCY_COOLDOWN, CONF_SENSOR_PLATFORM
-from .utils import get_room_identity, discover_occupancy_sensors, discover_door_sensors
+from .utils import get_room_identity, AreaSensorIndex
+from .entity import VeronikaEntity
 from collections import Counter
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,6 +22,11 @@ async def async_setup_platform(
     if discovery_info is None:
         return
 
+    manager = hass.data.get(f"{DOMAIN}_manager")
+    if not manager:
+        _LOGGER.error("Veronika manager not initialized, skipping binary_sensor platform setup")
+        return
+
     global_config: Dict[str, Any] = hass.data[DOMAIN]
     rooms: List[Dict[str, Any]] = global_config[CONF_ROOMS]
     global_cooldown: int = global_config.get(CONF_OCCUPANCY_COOLDOWN, 0)
@@ -44,14 +47,29 @@ async def async_setup_platform(
     
     for room in rooms:
         is_duplicate = area_counts[room[CONF_AREA]] > 1
-        entities.append(VeronikaRoomSensor(hass, room, vacuum_areas, is_duplicate, global_cooldown, global_sensor_platform))
+        entities.append(VeronikaRoomSensor(
+            hass, manager, room, vacuum_areas, is_duplicate, global_cooldown, global_sensor_platform
+        ))
 
     async_add_entities(entities)
 
-class VeronikaRoomSensor(BinarySensorEntity):
+class VeronikaRoomSensor(VeronikaEntity, BinarySensorEntity):
+    # Configuration and discovery results only change on restart or registry
+    # updates; history keeps status_reason and the sensor counts instead.
+    _unrecorded_attributes = VeronikaEntity._unrecorded_attributes | frozenset({
+        "veronika_segments",
+        "veronika_vacuum",
+        "veronika_area",
+        "veronika_door_sensors",
+        "veronika_occupancy_sensors",
+        "veronika_disable_entity",
+        "veronika_clean_entity",
+    })
+
     def __init__(
         self,
         hass: HomeAssistant,
+        manager: Any,
         config: Dict[str, Any],
         vacuum_areas: Dict[str, Set[str]],
         is_duplicate: bool,
@@ -59,6 +77,8 @@ class VeronikaRoomSensor(BinarySensorEntity):
         global_sensor_platform: Optional[str]
     ) -> None:
         self.hass: HomeAssistant = hass
+        self._manager: Any = manager
+        self._sensor_index: AreaSensorIndex = manager.sensor_index
         self._config: Dict[str, Any] = config
         self._vacuum: str = config[CONF_VACUUM]
         self._area: str = config[CONF_AREA]
@@ -70,7 +90,6 @@ class VeronikaRoomSensor(BinarySensorEntity):
         self._sensor_platform: Optional[str] = config.get(CONF_SENSOR_PLATFORM, global_sensor_platform)
 
         self._last_occupancy_time: Optional[dt_util.dt.datetime] = None
-        self._cooldown_timer: Optional[Callable[[], None]] = None
         
         self._slug, self._name = get_room_identity(hass, config, is_duplicate)
 
@@ -90,6 +109,31 @@ class VeronikaRoomSensor(BinarySensorEntity):
     def is_on(self) -> bool:
         return self._is_on
 
+    @property
+    def room_slug(self) -> str:
+        return self._slug
+
+    @property
+    def room_area(self) -> str:
+        return self._area
+
+    @property
+    def vacuum(self) -> str:
+        return self._vacuum
+
+    @property
+    def door_sensors(self) -> List[str]:
+        return self._doors
+
+    @property
+    def occupancy_sensors(self) -> List[str]:
+        return self._occupancy
+
+    @property
+    def dependent_areas(self) -> Set[str]:
+        """Areas whose sensors can affect this room's verdict."""
+        return self._vacuum_areas | {self._area}
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         return {
@@ -99,21 +143,20 @@ class VeronikaRoomSensor(BinarySensorEntity):
             "status_reason": self._status_reason,
             "veronika_door_sensors": self._doors,
             "veronika_occupancy_sensors": self._occupancy,
+            "door_sensor_count": len(self._doors),
+            "occupancy_sensor_count": len(self._occupancy),
             "veronika_disable_entity": self._disable_switch,
-            "veronika_clean_entity": self._clean_switch
+            "veronika_clean_entity": self._clean_switch,
         }
 
     async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
         # Resolve entity IDs from unique IDs
         ent_reg: er.EntityRegistry = er.async_get(self.hass)
         
         # Register with Manager
         try:
-            manager = self.hass.data.get(f"{DOMAIN}_manager")
-            if manager:
-                manager.register_entity("binary_sensor", self._slug, self.entity_id)
-            else:
-                _LOGGER.warning(f"Manager not found for {self._name}")
+            self._manager.register_entity("binary_sensor", self._slug, self.entity_id)
         except Exception as err:
             _LOGGER.error(f"Failed to register entity with manager: {err}")
 
@@ -130,26 +173,16 @@ class VeronikaRoomSensor(BinarySensorEntity):
 
         # Discover sensors
         try:
-            await self._discover_sensors()
+            self._discover_sensors()
         except Exception as err:
             _LOGGER.error(f"Failed to discover sensors for {self._name}: {err}")
             # Continue with empty sensor lists
         
-        # Subscribe to state changes
+        # State changes are dispatched centrally by the manager
         try:
-            entities_to_track = [self._clean_switch, self._disable_switch, self._vacuum] + self._doors + self._occupancy
-            # Filter out None values in case some entities haven't been resolved
-            entities_to_track = [e for e in entities_to_track if e is not None]
-            if entities_to_track:
-                self.async_on_remove(
-                    async_track_state_change_event(
-                        self.hass, 
-                        entities_to_track,
-                        self._on_state_change
-                    )
-                )
-            else:
-                _LOGGER.warning(f"No entities to track for {self._name}")
+            self._restore_state()
+            self._manager.register_room_sensor(self)
+            self.async_on_remove(lambda: self._manager.unregister_room_sensor(self._slug))
         except Exception as err:
             _LOGGER.error(f"Failed to set up state tracking for {self._name}: {err}")
         
@@ -161,59 +194,75 @@ class VeronikaRoomSensor(BinarySensorEntity):
             # Set a default state so it's not stuck initializing
             self._status_reason = "Error during initialization"
             self._is_on = False
-            self.async_write_ha_state()
+            self.async_write_ha_state_if_changed()
 
     async def async_will_remove_from_hass(self) -> None:
         """Cleanup when entity is removed."""
-        # Cancel any pending cooldown timer
-        if self._cooldown_timer:
-            self._cooldown_timer()
-            self._cooldown_timer = None
-
-    async def _discover_sensors(self) -> None:
-        """Discover occupancy and door sensors for this room."""
-        # Discover occupancy sensors in the room's area
-        self._occupancy = discover_occupancy_sensors(self.hass, self._area, platform_filter=self._sensor_platform)
+        # Cancel any pending cooldown expiry
+        self._manager.cancel_cooldown(self._slug)
+
+    def _discover_sensors(self) -> None:
+        """Discover occupancy and door sensors for this room from the manager's index."""
+        # Occupancy sensors in the room's area
+        self._occupancy = self._sensor_index.get_occupancy_sensors(self._area, platform_filter=self._sensor_platform)
         
-        # Discover door sensors in all areas the vacuum can access
-        self._doors = discover_door_sensors(self.hass, list(self._vacuum_areas))
+        # Door sensors in all areas the vacuum can access
+        self._doors = self._sensor_index.get_door_sensors(self._vacuum_areas)
 
     @callback
-    def _on_state_change(self, event: Event) -> None:
-        self._update_state()
+    def async_refresh_sensors(self) -> bool:
+        """Re-query the sensor index after a registry change.
+
+        Returns True if the door or occupancy set of this room changed.
+        """
+        old_doors, old_occupancy = set(self._doors), set(self._occupancy)
+        self._occupancy = self._sensor_index.get_occupancy_sensors(self._area, platform_filter=self._sensor_platform)
+        self._doors = self._sensor_index.get_door_sensors(self._vacuum_areas)
+
+        changed = set(self._doors) != old_doors or set(self._occupancy) != old_occupancy
+        if changed:
+            _LOGGER.info(f"Sensors changed for {self._name}")
+        return changed
 
     @callback
-    def _cooldown_expired(self, _: Any) -> None:
-        self._cooldown_timer = None
+    def async_evaluate(self) -> None:
+        """Re-evaluate readiness, called by the manager's state dispatcher."""
         self._update_state()
 
+    def _restore_state(self) -> None:
+        """Start from the verdict and last occupancy saved before the restart.
+
+        A room that was still occupied is treated as cleared on its first
+        evaluation, so its cooldown restarts instead of it reporting Ready.
+        """
+        restored = self._manager.restored_room_state(self._slug)
+        if not restored:
+            return
+        self._status_reason = restored["status"]
+        self._is_on = restored["is_on"]
+        if restored["last_occupancy"] is not None:
+            self._last_occupancy_time = dt_util.as_local(dt_util.utc_from_timestamp(restored["last_occupancy"]))
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        super().async_write_ha_state_if_changed()
+        self._manager.update_room_state(self._slug, self._last_occupancy_time, self._status_reason, self._is_on)
+
     def _update_state(self) -> None:
         # Check Occupancy
-        is_occupied = False
-        for sens in self._occupancy:
-            try:
-                st = self.hass.states.get(sens)
-                if st is None:
-                    _LOGGER.debug(f"Occupancy sensor {sens} state not found for {self._name}")
-                    continue
-                if st.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN) and st.state == STATE_ON:
-                    is_occupied = True
-                    break
-            except Exception as err:
-                _LOGGER.warning(f"Error checking occupancy sensor {sens}: {err}")
-                continue
-        
+        # Counted incrementally by the manager's state dispatcher
+        is_occupied = self._manager.active_occupancy_count(self._slug) > 0
+        if not is_occupied and self._status_reason == "Occupied":
+            # Occupancy just cleared, the cooldown starts now
+            self._last_occupancy_time = dt_util.now()
+
         if is_occupied:
             self._status_reason = "Occupied"
             self._is_on = False
             self._last_occupancy_time = dt_util.now()
             
-            # Cancel any pending cooldown timer
-            if self._cooldown_timer:
-                self._cooldown_timer()
-                self._cooldown_timer = None
-                
-            self.async_write_ha_state()
+            self._manager.cancel_cooldown(self._slug)
+            self.async_write_ha_state_if_changed()
             return
 
         # Check Cooldown
@@ -223,79 +272,25 @@ class VeronikaRoomSensor(BinarySensorEntity):
                 self._status_reason = "Occupied (Cooldown)"
                 self._is_on = False
                 
-                # Schedule update for when cooldown expires
-                if not self._cooldown_timer:
-                    remaining = self._cooldown - elapsed
-                    self._cooldown_timer = async_call_later(self.hass, remaining + 1, self._cooldown_expired)
+                # Re-evaluated by the manager's cooldown scheduler when it expires
+                self._manager.schedule_cooldown(self._slug, self._cooldown - elapsed + 1)
                 
-                self.async_write_ha_state()
+                self.async_write_ha_state_if_changed()
                 return
 
         # If we are here, occupancy is clear and cooldown is over
-        if self._cooldown_timer:
-            self._cooldown_timer()
-            self._cooldown_timer = None
+        self._manager.cancel_cooldown(self._slug)
 
-        # Check Doors
-        ent_reg = er.async_get(self.hass)
-        dev_reg = dr.async_get(self.hass)
-        
-        # Get Vacuum Area
-        vacuum_area = None
-        try:
-            vac_entry = ent_reg.async_get(self._vacuum)
-            if vac_entry and vac_entry.area_id:
-                vacuum_area = vac_entry.area_id
-            elif vac_entry and vac_entry.device_id:
-                dev = dev_reg.async_get(vac_entry.device_id)
-                if dev:
-                    vacuum_area = dev.area_id
-        except Exception as err:
-            _LOGGER.warning(f"Error determining vacuum area for {self._vacuum}: {err}")
-        
-        target_area = self._area
-        
-        for door in self._doors:
-            try:
-                st = self.hass.states.get(door)
-                if not st:
-                    _LOGGER.debug(f"Door sensor {door} state not found for {self._name}")
-                    continue
-                    
-                if st.state == STATE_OFF: # Door Closed
-                    # Find area of this door
-                    door_area = None
-                    try:
-                        d_entry = ent_reg.async_get(door)
-                        if d_entry:
-                            door_area = d_entry.area_id
-                            # Fallback to device area if entity area is not set
-                            if not door_area and d_entry.device_id:
-                                dev = dev_reg.async_get(d_entry.device_id)
-                                if dev:
-                                    door_area = dev.area_id
-                    except Exception as err:
-                        _LOGGER.warning(f"Error getting area for door {door}: {err}")
-                        continue
-
-                    # 1. Target Room Door
-                    if door_area == target_area and vacuum_area != target_area:
-                        self._status_reason = "Door Closed"
-                        self._is_on = False
-                        self.async_write_ha_state()
-                        return
-
-                    # 2. Current Room Door (Trapped)
-                    if door_area == vacuum_area and vacuum_area != target_area:
-                        self._status_reason = "Trapped"
-                        self._is_on = False
-                        self.async_write_ha_state()
-                        return
-            except Exception as err:
-                _LOGGER.warning(f"Error processing door sensor {door}: {err}")
-                continue
+        # Check Doors: the vacuum must be able to reach the target area
+        vacuum_area = self._sensor_index.get_entity_area(self._vacuum)
+        reason = self._manager.door_graph.blocked_reason(vacuum_area, self._area)
+        if reason is not None:
+            self._status_reason = reason
+            self._is_on = False
+            self.async_write_ha_state_if_changed()
+            return
 
         # If we reach here, all checks passed - room is ready
         self._status_reason = "Ready"
         self._is_on = True
-        self.async_write_ha_state()
+        self.async_write_ha_state_if_changed()
@@ -0,0 +1,96 @@
+"""Area connectivity through doors, used for room readiness."""
+from typing import Any, Dict, Iterable, KeysView, Optional, Set
+
+# Verdicts when the vacuum cannot reach the target area
+REASON_DOOR_CLOSED = "Door Closed"
+REASON_TRAPPED = "Trapped"
+
+# Component of the hub (hallways and every area whose doors are open)
+HUB_COMPONENT = 0
+
+
+class DoorGraph:
+    """Door/area graph with incrementally maintained connected components.
+
+    Areas are connected in a star around the rest of the home: the doors of an
+    area are the edges between that area and the hub, and the edge is open
+    only while all of them are open. Components are only recomputed when an
+    area's edge flips, so reachability queries are dictionary lookups.
+    Areas without doors, and unknown areas (None), belong to the hub.
+    """
+
+    def __init__(self) -> None:
+        self._door_areas: Dict[str, str] = {}
+        self._closed_doors: Dict[str, Set[str]] = {}
+        self._component: Dict[str, int] = {}
+        self.recomputes: int = 0
+
+    @property
+    def doors(self) -> KeysView[str]:
+        """Return a live view of the tracked doors."""
+        return self._door_areas.keys()
+
+    def has_door(self, door: str) -> bool:
+        return door in self._door_areas
+
+    def rebuild(self, door_areas: Dict[str, str], closed: Iterable[str]) -> None:
+        """Replace all doors, given their areas and the set of currently closed doors."""
+        self._door_areas = dict(door_areas)
+        self._closed_doors = {}
+        for door in closed:
+            area = self._door_areas.get(door)
+            if area is not None:
+                self._closed_doors.setdefault(area, set()).add(door)
+        self._recompute()
+
+    def update_door(self, door: str, is_closed: bool) -> Optional[str]:
+        """Apply a door state change.
+
+        Returns the area whose connectivity flipped, or None if the topology
+        did not change (e.g. a second door of an already closed-off area).
+        """
+        area = self._door_areas.get(door)
+        if area is None:
+            return None
+        closed = self._closed_doors.get(area)
+        was_isolated = bool(closed)
+        if is_closed:
+            self._closed_doors.setdefault(area, set()).add(door)
+        elif closed is not None:
+            closed.discard(door)
+            if not closed:
+                del self._closed_doors[area]
+        if was_isolated == bool(self._closed_doors.get(area)):
+            return None
+        self._recompute()
+        return area
+
+    def _recompute(self) -> None:
+        # Every closed-off area is its own component, everything else is the hub
+        self._component = {area: i for i, area in enumerate(sorted(self._closed_doors), HUB_COMPONENT + 1)}
+        self.recomputes += 1
+
+    def is_isolated(self, area: Optional[str]) -> bool:
+        return area in self._component
+
+    def reachable(self, from_area: Optional[str], to_area: Optional[str]) -> bool:
+        """Return True if the vacuum can travel between the two areas."""
+        if from_area == to_area:
+            return True
+        return self._component.get(from_area, HUB_COMPONENT) == self._component.get(to_area, HUB_COMPONENT)
+
+    def blocked_reason(self, vacuum_area: Optional[str], target_area: str) -> Optional[str]:
+        """Return why the vacuum cannot reach the target area, or None if it can."""
+        if self.reachable(vacuum_area, target_area):
+            return None
+        if self.is_isolated(target_area):
+            return REASON_DOOR_CLOSED
+        return REASON_TRAPPED
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        return {
+            "doors": len(self._door_areas),
+            "closed_off_areas": sorted(self._component),
+            "recomputes": self.recomputes,
+        }
@@ -10,5 +10,32 @@ CONF_OCCUPANCY_COOLDOWN = "occupancy_cooldown"
 CONF_MIN_SEGMENT_DURATION = "min_segment_duration"
 CONF_SEGMENT_ATTRIBUTE = "segment_attribute"
 CONF_SENSOR_PLATFORM = "sensor_platform"
+CONF_PLAN_UPDATE_DELAY = "plan_update_delay"
+CONF_START_TIMEOUT = "start_timeout"
+CONF_STOP_TIMEOUT = "stop_timeout"
+CONF_SWITCH_TIMEOUT = "switch_timeout"
+CONF_COMMAND_STRATEGIES = "command_strategies"
+CONF_PRIORITY = "priority"
+CONF_MAX_DURATION = "max_duration"
+CONF_DEFAULT_SEGMENT_DURATION = "default_segment_duration"
+
+# Keys of a configured command strategy
+CONF_STRATEGY_NAME = "name"
+CONF_MANUFACTURER = "manufacturer"
+CONF_SERVICE = "service"
+CONF_SERVICE_DATA = "data"
+CONF_SEGMENTS_KEY = "segments_key"
+CONF_HONORS_ORDER = "honors_order"
+
+# Default per-operation service call timeouts (seconds)
+DEFAULT_START_TIMEOUT = 30.0
+DEFAULT_STOP_TIMEOUT = 30.0
+DEFAULT_SWITCH_TIMEOUT = 10.0
+
+# Assumed cleaning time of a segment (seconds) while a vacuum has no history at all
+DEFAULT_SEGMENT_DURATION = 600
 
 EVENT_VERONIKA_CLEANING_FINISHED = "veronika_cleaning_finished"
+
+# Dispatcher signal sent with a vacuum entity ID when its cleaning progress changed
+SIGNAL_VACUUM_PROGRESS = f"{DOMAIN}_vacuum_progress"
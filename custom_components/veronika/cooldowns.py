@@ -0,0 +1,105 @@
+"""Shared scheduling of occupancy cooldown expiries."""
+import heapq
+import math
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_at
+
+# Expiries are rounded up to whole ticks (seconds) so close ones fire together
+DEFAULT_TICK = 1.0
+
+
+class CooldownScheduler:
+    """One timer for the cooldowns of all rooms.
+
+    Expiry times are rounded up to the next tick and kept in a heap. A single
+    timer is armed for the earliest tick, and every room due in that tick is
+    handed to the callback in one batch. Rescheduling or cancelling a room
+    leaves its old heap entry behind; stale entries are skipped when popped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        on_expired: Callable[[Set[str]], None],
+        tick: float = DEFAULT_TICK,
+    ) -> None:
+        self.hass = hass
+        self._on_expired = on_expired
+        self._tick = tick
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._timer: Optional[Callable[[], None]] = None
+        self._armed_at: Optional[float] = None
+        self.timers_armed: int = 0
+        self.batches: int = 0
+        self.expired: int = 0
+
+    def schedule(self, key: str, delay: float) -> None:
+        """Fire the callback for key once delay seconds have passed."""
+        due = math.ceil((self.hass.loop.time() + delay) / self._tick) * self._tick
+        if self._due.get(key) == due:
+            return
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+        self._arm()
+
+    def cancel(self, key: str) -> None:
+        """Forget the pending expiry of key, if any."""
+        self._due.pop(key, None)
+
+    def cancel_all(self) -> None:
+        if self._timer:
+            self._timer()
+        self._timer = None
+        self._armed_at = None
+        self._heap = []
+        self._due = {}
+
+    def _arm(self) -> None:
+        """Arm the timer for the earliest live expiry, unless it already fires earlier."""
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        if not heap:
+            return
+        due = heap[0][0]
+        if self._armed_at is not None and self._armed_at <= due:
+            return
+        if self._timer:
+            self._timer()
+        self._timer = async_call_at(self.hass, self._fire, due)
+        self._armed_at = due
+        self.timers_armed += 1
+
+    @callback
+    def _fire(self, _: datetime) -> None:
+        # The timer firing means its tick is due, even if the loop clock lags
+        now = max(self.hass.loop.time(), self._armed_at or 0.0)
+        self._timer = None
+        self._armed_at = None
+
+        expired: Set[str] = set()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, key = heapq.heappop(heap)
+            if self._due.get(key) == due:
+                del self._due[key]
+                expired.add(key)
+        self._arm()
+
+        if expired:
+            self.batches += 1
+            self.expired += len(expired)
+            self._on_expired(expired)
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._due),
+            "timers_armed": self.timers_armed,
+            "batches": self.batches,
+            "expired": self.expired,
+        }
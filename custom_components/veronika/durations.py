@@ -0,0 +1,102 @@
+"""Learned cleaning durations per (vacuum, segment)."""
+import math
+from collections import deque
+from statistics import median
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+# Number of recent runs kept per segment
+DEFAULT_MAX_SAMPLES = 20
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+class SegmentDurationHistory:
+    """Bounded history of segment cleaning durations with robust statistics.
+
+    Only the last `max_samples` durations of each (vacuum, segment) are kept,
+    and estimates use the median so one interrupted run does not skew them.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[str, Hashable], Deque[float]] = {}
+        self._last_cleaned: Dict[Tuple[str, Hashable], float] = {}
+
+    def add(
+        self, vacuum: str, segment: Hashable, duration: float, finished_at: Optional[float] = None
+    ) -> None:
+        """Record the duration of one cleaned segment and when it finished (timestamp)."""
+        key = (vacuum, segment)
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.max_samples)
+        samples.append(round(duration, 1))
+        if finished_at is not None:
+            self._last_cleaned[key] = finished_at
+
+    def last_cleaned(self, vacuum: str, segment: Hashable) -> Optional[float]:
+        """Return when the segment was last cleaned (timestamp), or None if unknown."""
+        return self._last_cleaned.get((vacuum, segment))
+
+    def known_medians(self, vacuum: str) -> List[float]:
+        """Return the median durations of every segment of a vacuum with history."""
+        return [median(samples) for (vac, _), samples in self._samples.items() if vac == vacuum and samples]
+
+    def samples(self, vacuum: str, segment: Hashable) -> List[float]:
+        return list(self._samples.get((vacuum, segment), ()))
+
+    def median(self, vacuum: str, segment: Hashable) -> Optional[float]:
+        """Return the median duration in seconds, or None without history."""
+        samples = self._samples.get((vacuum, segment))
+        return median(samples) if samples else None
+
+    def p90(self, vacuum: str, segment: Hashable) -> Optional[float]:
+        """Return the 90th percentile duration in seconds, or None without history."""
+        samples = self._samples.get((vacuum, segment))
+        return _percentile(list(samples), 90) if samples else None
+
+    def stats(self, vacuum: str, segment: Hashable) -> Optional[Dict[str, Any]]:
+        """Return median, p90 and sample count of a segment, or None without history."""
+        samples = self._samples.get((vacuum, segment))
+        if not samples:
+            return None
+        return {
+            "median": median(samples),
+            "p90": _percentile(list(samples), 90),
+            "samples": len(samples),
+        }
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Serialize as {"durations": {vacuum: {segment: [...]}}, "last_cleaned": {...}} for storage."""
+        durations: Dict[str, Dict[str, List[float]]] = {}
+        for (vacuum, segment), samples in self._samples.items():
+            durations.setdefault(vacuum, {})[str(segment)] = list(samples)
+        last_cleaned: Dict[str, Dict[str, float]] = {}
+        for (vacuum, segment), timestamp in self._last_cleaned.items():
+            last_cleaned.setdefault(vacuum, {})[str(segment)] = timestamp
+        return {"durations": durations, "last_cleaned": last_cleaned}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_samples: int = DEFAULT_MAX_SAMPLES) -> "SegmentDurationHistory":
+        """Restore a history saved with as_dict."""
+        history = cls(max_samples)
+        # Early saves only held the durations mapping
+        durations = data["durations"] if "durations" in data else data
+        for vacuum, segments in durations.items():
+            for segment, samples in segments.items():
+                for duration in samples:
+                    history.add(vacuum, _segment_key(segment), duration)
+        for vacuum, segments in data.get("last_cleaned", {}).items():
+            for segment, timestamp in segments.items():
+                history._last_cleaned[(vacuum, _segment_key(segment))] = timestamp
+        return history
+
+
+def _segment_key(segment: str) -> Hashable:
+    """JSON turns segment IDs into strings, restore numeric ones."""
+    return int(segment) if segment.lstrip("-").isdigit() else segment
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional, Tuple
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+from .const import DOMAIN
+
+
+class VeronikaEntity(Entity):
+    """Base class for push-only Veronika entities that skip redundant state writes.
+
+    The state and attributes of the last write are remembered, and
+    async_write_ha_state_if_changed only writes when they differ. Entities
+    are never polled, so every write goes through this check.
+
+    The skip counter is reported through the manager's diagnostics rather
+    than as an attribute, so it never causes a write of its own.
+    """
+
+    _attr_should_poll = False
+
+    _last_written: Optional[Tuple[Any, bool, Dict[str, Any]]] = None
+    _skipped_writes: int = 0
+
+    @property
+    def skipped_writes(self) -> int:
+        """Return the number of state writes skipped because nothing changed."""
+        return self._skipped_writes
+
+    @property
+    def write_stats(self) -> Dict[str, Any]:
+        """Return the write counters reported in the manager's diagnostics."""
+        return {"skipped_writes": self._skipped_writes}
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        manager = self.hass.data.get(f"{DOMAIN}_manager")
+        if manager is not None:
+            manager.register_write_stats(self)
+            self.async_on_remove(lambda: manager.unregister_write_stats(self))
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state only if state or attributes changed."""
+        snapshot = (self.state, self.available, dict(self.extra_state_attributes or {}))
+        if snapshot == self._last_written:
+            self._skipped_writes += 1
+            return
+
+        self._last_written = snapshot
+        self.async_write_ha_state()
@@ -1,11 +1,15 @@
 import logging
 import asyncio
-import time
+import math
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Callable, Tuple
-from homeassistant.core import HomeAssistant, callback, Event
+from homeassistant.core import HomeAssistant, callback, Event, split_entity_id
 from homeassistant.helpers import device_registry as dr, entity_registry as er, area_registry as ar
 from homeassistant.util import dt as dt_util
 from homeassistant.const import (
+    EVENT_HOMEASSISTANT_STOP,
+    STATE_OFF,
+    STATE_ON,
     STATE_UNAVAILABLE, 
     STATE_UNKNOWN, 
     ATTR_ENTITY_ID,
@@ -13,15 +17,170 @@ from homeassistant.const import (
     SERVICE_TURN_ON
 )
 from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.exceptions import HomeAssistantError, ServiceNotFound
 from homeassistant.components.persistent_notification import async_create as async_create_notification
 
-from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_SEGMENTS, CONF_DEBUG, CONF_AREA, CONF_MIN_SEGMENT_DURATION, CONF_SEGMENT_ATTRIBUTE
-from .utils import get_room_identity
+from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_SEGMENTS, CONF_DEBUG, CONF_AREA, CONF_MIN_SEGMENT_DURATION, CONF_SEGMENT_ATTRIBUTE, SIGNAL_VACUUM_PROGRESS
+from .const import (
+    CONF_COMMAND_STRATEGIES,
+    CONF_DEFAULT_SEGMENT_DURATION,
+    CONF_PRIORITY,
+    CONF_START_TIMEOUT,
+    CONF_STOP_TIMEOUT,
+    CONF_SWITCH_TIMEOUT,
+    DEFAULT_SEGMENT_DURATION,
+    DEFAULT_START_TIMEOUT,
+    DEFAULT_STOP_TIMEOUT,
+    DEFAULT_SWITCH_TIMEOUT,
+)
+from .utils import get_room_identity, AreaSensorIndex, async_track_state_attribute_change
+from .retry import RetryPolicy, CircuitOpenError
+from .strategies import CommandStrategy, StrategyRegistry
+from .durations import SegmentDurationHistory
+from .planner import select_within_budget, SegmentTransitionGraph
+from .connectivity import DoorGraph
+from .cooldowns import CooldownScheduler
 from collections import Counter
 
 _LOGGER = logging.getLogger(__name__)
 
+# Upper bound for concurrent per-entity service calls when a batched call fails
+MAX_PARALLEL_SERVICE_CALLS = 4
+
+# Service call operations with their own timeout
+OPERATION_START = "start"
+OPERATION_STOP = "stop"
+OPERATION_SWITCH_RESET = "switch_reset"
+
+# Persisted segment duration history
+DURATION_STORAGE_KEY = f"{DOMAIN}.segment_durations"
+DURATION_STORAGE_VERSION = 1
+DURATION_SAVE_DELAY = 30
+
+# Persisted room verdicts and last occupancy, restored before the first evaluation
+ROOM_STATE_STORAGE_KEY = f"{DOMAIN}.room_states"
+ROOM_STATE_STORAGE_VERSION = 1
+ROOM_STATE_SAVE_DELAY = 10
+
+# Checkpointed segment monitors, resumed after a restart mid-clean
+MONITOR_STORAGE_KEY = f"{DOMAIN}.vacuum_monitors"
+MONITOR_STORAGE_VERSION = 1
+MONITOR_SAVE_DELAY = 5
+
+# Vacuum states in which a segment is being worked on
+ACTIVE_VACUUM_STATES = ("cleaning", "returning")
+
+# Gaps between two segments longer than this are not treated as travel between them
+MAX_TRANSITION_SECONDS = 600
+
+# Staleness (days since last cleaned) counted at most when choosing rooms for a time budget
+MAX_STALENESS_DAYS = 14
+
+# Base backoff delays (seconds) for the shared retry policy
+VACUUM_RETRY_DELAY = 2.0
+SERVICE_RETRY_DELAY = 1.0
+
+# Room identity: (area_id, vacuum, sorted_segments_tuple)
+RoomKey = Tuple[str, str, Tuple[int, ...]]
+
+
+class RoomRecord:
+    """Configuration and entity IDs of one configured room."""
+
+    __slots__ = ("key", "slug", "name", "area", "vacuum", "segments", "switch", "disable", "sensor", "priority")
+
+    def __init__(
+        self,
+        key: RoomKey,
+        slug: str,
+        name: str,
+        area: str,
+        vacuum: str,
+        segments: List[int],
+        switch: Optional[str] = None,
+        disable: Optional[str] = None,
+        sensor: Optional[str] = None,
+        priority: int = 1,
+    ) -> None:
+        self.key = key
+        self.slug = slug
+        self.name = name
+        self.area = area
+        self.vacuum = vacuum
+        self.segments = segments
+        self.switch = switch
+        self.disable = disable
+        self.sensor = sensor
+        self.priority = priority
+
+    def entity_ids(self) -> List[str]:
+        """Return the known Veronika entity IDs of this room."""
+        return [e for e in (self.switch, self.disable, self.sensor) if e is not None]
+
+
+class VacuumMonitor:
+    """Segment tracking state of a single vacuum.
+
+    run_segments holds the segments of the last command sent by Veronika while
+    the vacuum works through them; completed_segments those already finished.
+    """
+
+    __slots__ = (
+        "current_segment", "start_time", "completion_task", "run_segments", "completed_segments",
+        "last_segment", "left_at", "last_seen",
+    )
+
+    def __init__(self) -> None:
+        self.current_segment: Optional[int] = None
+        self.start_time: Optional[float] = None
+        self.completion_task: Optional[asyncio.Task] = None
+        self.run_segments: List[int] = []
+        self.completed_segments: Set[int] = set()
+        # Segment the vacuum left last and when, to learn travel times to the next one
+        self.last_segment: Optional[int] = None
+        self.left_at: Optional[float] = None
+        # When a restored monitor was last known to be accurate (checkpoint or shutdown)
+        self.last_seen: Optional[float] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.current_segment is not None or bool(self.run_segments)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize the state worth resuming after a restart."""
+        return {
+            "current_segment": self.current_segment,
+            "start_time": self.start_time,
+            "run_segments": list(self.run_segments),
+            "completed_segments": sorted(self.completed_segments),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VacuumMonitor":
+        monitor = cls()
+        monitor.current_segment = data.get("current_segment")
+        monitor.start_time = data.get("start_time")
+        monitor.run_segments = list(data.get("run_segments", []))
+        monitor.completed_segments = set(data.get("completed_segments", []))
+        monitor.last_seen = data.get("last_seen")
+        return monitor
+
+
+class VacuumCommandQueue:
+    """Command state of a single vacuum: the command in flight and the merged follow-up."""
+
+    __slots__ = ("worker", "active_future", "active_segments", "pending_future", "pending_segments")
+
+    def __init__(self) -> None:
+        self.worker: Optional[asyncio.Task] = None
+        self.active_future: Optional[asyncio.Future] = None
+        self.active_segments: Set[int] = set()
+        self.pending_future: Optional[asyncio.Future] = None
+        self.pending_segments: Set[int] = set()
+
+
 class VeronikaManager:
     def __init__(self, hass: HomeAssistant, config: Dict[str, Any]) -> None:
         self.hass: HomeAssistant = hass
@@ -29,7 +188,23 @@ class VeronikaManager:
         self.rooms: List[Dict[str, Any]] = config[CONF_ROOMS]
         self.debug_mode: bool = config.get(CONF_DEBUG, False)
         self.min_segment_duration: int = config.get(CONF_MIN_SEGMENT_DURATION, 180)
-        self._vacuum_monitors: Dict[str, Dict[str, Any]] = {}  # Structure: {vacuum_id: {current_segment, start_time, completion_task}}
+        self.default_segment_duration: int = config.get(CONF_DEFAULT_SEGMENT_DURATION, DEFAULT_SEGMENT_DURATION)
+        self._vacuum_monitors: Dict[str, VacuumMonitor] = {}
+        # Snapshot of the active monitors written by the store, and vacuums still to resume
+        self._monitor_checkpoint: Dict[str, Dict[str, Any]] = {}
+        self._monitor_store: Store = Store(hass, MONITOR_STORAGE_VERSION, MONITOR_STORAGE_KEY)
+        self._pending_resume: Set[str] = set()
+
+        # Learned segment durations, persisted across restarts
+        self._durations: SegmentDurationHistory = SegmentDurationHistory()
+        self._duration_store: Store = Store(hass, DURATION_STORAGE_VERSION, DURATION_STORAGE_KEY)
+        self._transitions: SegmentTransitionGraph = SegmentTransitionGraph()
+
+        # Structure: {slug: {"last_occupancy": timestamp or None, "status": reason, "is_on": bool}}
+        self._room_states: Dict[str, Dict[str, Any]] = {}
+        self._room_state_store: Store = Store(hass, ROOM_STATE_STORAGE_VERSION, ROOM_STATE_STORAGE_KEY)
+        self._vacuum_events_dropped: int = 0
+        self._vacuum_events_handled: int = 0
         self._unsubscribers: List[Callable[[], None]] = []  # Track listeners for cleanup
         
         # Map vacuum -> segment_attribute_name for different integrations
@@ -44,16 +219,74 @@ class VeronikaManager:
         # Map vacuum -> {segment_id: [switch_entity_id]}
         self._vacuum_segment_map: Dict[str, Dict[int, List[str]]] = {}
         
-        # Cache for entity IDs to avoid repeated registry lookups
-        # Structure: {(area_id, vacuum, segments_tuple): {'switch': id, 'disable': id, 'sensor': id, ...}}
-        self._entity_cache: Dict[Tuple[str, str, Tuple[int, ...]], Dict[str, Any]] = {}
+        # Room records with entity IDs to avoid repeated registry lookups, plus a slug index
+        self._room_records: Dict[RoomKey, RoomRecord] = {}
+        self._records_by_slug: Dict[str, RoomRecord] = {}
         
+        # Shared area -> occupancy/door sensor index used by all room sensors
+        self._sensor_index: AreaSensorIndex = AreaSensorIndex(hass)
+
+        # Central state dispatch for room sensors
+        # Structure: {slug: room_sensor} and reverse index {entity_id: {slug}}
+        self._room_sensors: Dict[str, Any] = {}
+        self._entity_rooms: Dict[str, Set[str]] = {}
+
+        # Active occupancy sensors, kept by delta from state events
+        # Structure: {entity_id} currently on and {slug: number of active sensors}
+        self._active_occupancy: Set[str] = set()
+        self._occupancy_counts: Dict[str, int] = {}
+
+        # One timer for all occupancy cooldowns, expiring rooms in batches
+        self._cooldowns: CooldownScheduler = CooldownScheduler(hass, self._on_cooldowns_expired)
+
+        # Door/area connectivity; rooms are re-evaluated per area when it opens or closes off
+        # Structure: {area_id: {slug}} for target and vacuum areas
+        self._door_graph: DoorGraph = DoorGraph()
+        self._area_rooms: Dict[str, Set[str]] = {}
+        # Vacuum areas the indexes were built with, to notice a vacuum being moved
+        self._indexed_vacuum_areas: Dict[str, Optional[str]] = {}
+        self._dispatch_unsub: Optional[Callable[[], None]] = None
+        self._dispatch_entities: Set[str] = set()
+        self._resubscribe_scheduled: bool = False
+        self._events_dispatched: int = 0
+        self._rooms_evaluated: int = 0
+
+        # Incrementally maintained cleaning plan
+        # Structure: {room_key: room_data}, {vacuum: Counter(segment)} and {entity_id: room_key}
+        self._plan_rooms: Dict[RoomKey, Dict[str, Any]] = {}
+        self._plan_segments: Dict[str, Counter] = {}
+        self._plan_entities: Dict[str, RoomKey] = {}
+        self._vacuum_rooms: Dict[str, List[RoomKey]] = {}
+        self._plan: Dict[str, Dict[str, Any]] = {}
+        self._plan_listeners: List[Callable[[], None]] = []
+
+        # Entities whose write counters are reported in the diagnostics
+        self._write_stats_entities: Set[Any] = set()
+
         # Error tracking
         self._last_error: Optional[str] = None
         self._error_count: int = 0
 
-        # Concurrency guard for start_cleaning
-        self._cleaning_lock: asyncio.Lock = asyncio.Lock()
+        # Per-vacuum command queues for start_cleaning
+        self._command_queues: Dict[str, VacuumCommandQueue] = {}
+        self._coalesced_requests: int = 0
+
+        # Shared retry/backoff policy with a circuit breaker per target entity
+        self._retry_policy: RetryPolicy = RetryPolicy()
+
+        # Per-operation service call timeouts and how often each one was hit
+        self._timeouts: Dict[str, float] = {
+            OPERATION_START: config.get(CONF_START_TIMEOUT, DEFAULT_START_TIMEOUT),
+            OPERATION_STOP: config.get(CONF_STOP_TIMEOUT, DEFAULT_STOP_TIMEOUT),
+            OPERATION_SWITCH_RESET: config.get(CONF_SWITCH_TIMEOUT, DEFAULT_SWITCH_TIMEOUT),
+        }
+        self._timeout_counts: Counter = Counter({operation: 0 for operation in self._timeouts})
+
+        # Command strategies, resolved once per vacuum from its manufacturer
+        self._strategy_registry: StrategyRegistry = StrategyRegistry.from_config(
+            config.get(CONF_COMMAND_STRATEGIES, [])
+        )
+        self._vacuum_strategies: Dict[str, CommandStrategy] = {}
 
         # Unload flag to prevent orphaned operations
         self._is_unloading: bool = False
@@ -65,55 +298,80 @@ class VeronikaManager:
         # We will resolve IDs in async_setup
         pass
 
+    def register_write_stats(self, entity: Any) -> None:
+        """Include an entity's write counters in the diagnostics."""
+        self._write_stats_entities.add(entity)
+
+    def unregister_write_stats(self, entity: Any) -> None:
+        self._write_stats_entities.discard(entity)
+
     def register_entity(self, entity_type: str, slug: str, entity_id: str) -> None:
         """Register an entity with the manager."""
-        # Find the cache entry with matching slug
-        target_key: Optional[Tuple[str, str, Tuple[int, ...]]] = None
-        for key, data in self._entity_cache.items():
-            if data['slug'] == slug:
-                target_key = key
-                break
-        
-        if not target_key:
+        record: Optional[RoomRecord] = self._records_by_slug.get(slug)
+        if record is None:
             _LOGGER.warning(f"Attempted to register {entity_type} for unknown room slug {slug}")
             return
 
-        # Update cache
+        # Update the room record
         if entity_type == 'switch_clean':
-            self._entity_cache[target_key]['switch'] = entity_id
-            self._update_vacuum_segment_map(target_key)
+            record.switch = entity_id
+            self._update_vacuum_segment_map(record)
         elif entity_type == 'switch_disable':
-            self._entity_cache[target_key]['disable'] = entity_id
+            record.disable = entity_id
         elif entity_type == 'binary_sensor':
-            self._entity_cache[target_key]['sensor'] = entity_id
-
-    def _update_vacuum_segment_map(self, cache_key: Tuple[str, str, Tuple[int, ...]]) -> None:
-        """Update the vacuum segment map for a specific cache entry."""
-        data: Dict[str, Any] = self._entity_cache[cache_key]
-        vac: str = data['vacuum']
-        segments: List[int] = data['segments']
-        switch_id: Optional[str] = data['switch']
-        
+            record.sensor = entity_id
+        else:
+            return
+
+        # Watch the entity for plan updates and refresh the room record
+        self._plan_entities[entity_id] = record.key
+        self._schedule_dispatch_resubscribe()
+        self._update_plan_room(record.key)
+
+    def _update_vacuum_segment_map(self, record: RoomRecord) -> None:
+        """Update the vacuum segment map for a specific room record."""
+        switch_id: Optional[str] = record.switch
         if not switch_id:
             return
 
-        if vac not in self._vacuum_segment_map:
-            self._vacuum_segment_map[vac] = {}
-        
-        for seg in segments:
-            if seg not in self._vacuum_segment_map[vac]:
-                self._vacuum_segment_map[vac][seg] = []
-            
+        segment_map = self._vacuum_segment_map.setdefault(record.vacuum, {})
+        for seg in record.segments:
+            switches = segment_map.setdefault(seg, [])
             # Add if not present
-            if switch_id not in self._vacuum_segment_map[vac][seg]:
-                self._vacuum_segment_map[vac][seg].append(switch_id)
+            if switch_id not in switches:
+                switches.append(switch_id)
 
     async def async_setup(self) -> None:
+        # Restore learned segment durations
+        try:
+            stored = await self._duration_store.async_load()
+            if stored:
+                self._durations = SegmentDurationHistory.from_dict(stored)
+                self._transitions = SegmentTransitionGraph.from_dict(stored.get("transitions", {}))
+        except Exception as err:
+            _LOGGER.warning(f"Failed to load segment duration history: {err}")
+
+        # Restore segment monitors of runs interrupted by a restart
+        try:
+            self._monitor_checkpoint = await self._monitor_store.async_load() or {}
+        except Exception as err:
+            _LOGGER.warning(f"Failed to load vacuum monitors: {err}")
+
+        # Restore room verdicts in one pass, before the room sensors are added
+        try:
+            self._room_states = await self._room_state_store.async_load() or {}
+        except Exception as err:
+            _LOGGER.warning(f"Failed to load room states: {err}")
+
         # Build maps now that we can use async methods
         ent_reg: er.EntityRegistry = er.async_get(self.hass)
         area_reg: ar.AreaRegistry = ar.async_get(self.hass)
         
         area_counts: Counter = Counter(r[CONF_AREA] for r in self.rooms)
+
+        # Scan registries once for door/occupancy sensors of all areas and vacuum locations
+        self._sensor_index.track_entities(r[CONF_VACUUM] for r in self.rooms)
+        self._sensor_index.async_build()
         
         for room in self.rooms:
             vac: str = room[CONF_VACUUM]
@@ -123,12 +381,10 @@ class VeronikaManager:
             is_duplicate: bool = area_counts[area_id] > 1
             slug, display_name = get_room_identity(self.hass, room, is_duplicate)
             
-            # Build entity cache for this room using tuple key to avoid collisions
-            # Tuple format: (area_id, vacuum, sorted_segments_tuple)
-            segments_tuple: Tuple[int, ...] = tuple(sorted(segments))
-            cache_key: Tuple[str, str, Tuple[int, ...]] = (area_id, vac, segments_tuple)
+            # Build the room record using tuple key to avoid collisions
+            room_key: RoomKey = (area_id, vac, tuple(sorted(segments)))
             
-            if cache_key not in self._entity_cache:
+            if room_key not in self._room_records:
                 unique_id = f"veronika_clean_{slug}"
                 switch_id = ent_reg.async_get_entity_id("switch", DOMAIN, unique_id)
                 # if not switch_id:
@@ -144,21 +400,28 @@ class VeronikaManager:
                 # if not sensor_id:
                 #     sensor_id = f"binary_sensor.veronika_status_{slug}"
                 
-                self._entity_cache[cache_key] = {
-                    'switch': switch_id,
-                    'disable': disable_id,
-                    'sensor': sensor_id,
-                    'slug': slug,
-                    'name': display_name,
-                    'area': area_id,
-                    'vacuum': vac,
-                    'segments': segments
-                }
+                record = RoomRecord(
+                    room_key, slug, display_name, area_id, vac, segments,
+                    switch=switch_id, disable=disable_id, sensor=sensor_id,
+                    priority=room.get(CONF_PRIORITY, 1),
+                )
+                self._room_records[room_key] = record
+                self._records_by_slug[slug] = record
             
             # Build segment map using cached switch ID
-            switch_id = self._entity_cache[cache_key]['switch']
-            if switch_id:
-                self._update_vacuum_segment_map(cache_key)
+            self._update_vacuum_segment_map(self._room_records[room_key])
+
+        # Forget saved states of rooms that are no longer configured
+        self._room_states = {
+            slug: state for slug, state in self._room_states.items() if slug in self._records_by_slug
+        }
+
+        # Pick the command strategy of every vacuum while the registries are at hand
+        for vac in self._vacuum_segment_attributes:
+            self._resolve_vacuum_strategy(vac)
+
+        # Materialize the cleaning plan once, later kept current by state events
+        self._rebuild_plan()
 
         # Subscribe to vacuum state changes for monitoring segments
         vacuums = list(self._vacuum_segment_map.keys())
@@ -175,9 +438,338 @@ class VeronikaManager:
                     "Veronika will start monitoring them when they become available."
                 )
             
-            unsub = async_track_state_change_event(self.hass, vacuums, self._on_vacuum_state_change)
+            # Only state and segment changes matter, skip battery/fan speed/area telemetry
+            unsub = async_track_state_attribute_change(
+                self.hass,
+                {vac: [self._vacuum_segment_attributes.get(vac, "current_segment")] for vac in vacuums},
+                self._on_vacuum_state_change,
+                self._on_vacuum_event_dropped,
+            )
             self._unsubscribers.append(unsub)
 
+        # Resume the monitors of vacuums that were cleaning when Home Assistant stopped
+        self._unsubscribers.append(self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, self._on_hass_stop))
+        for vac, data in self._monitor_checkpoint.items():
+            if vac in self._vacuum_segment_map:
+                self._vacuum_monitors[vac] = VacuumMonitor.from_dict(data)
+                self._resume_monitor(vac)
+
+        # Keep the sensor index current when entities or devices are added or moved
+        self._unsubscribers.append(
+            self.hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._on_entity_registry_updated)
+        )
+        self._unsubscribers.append(
+            self.hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._on_device_registry_updated)
+        )
+
+    @callback
+    def _on_entity_registry_updated(self, event: Event) -> None:
+        """Re-index a single entity after an entity registry change."""
+        entity_id: Optional[str] = event.data.get("entity_id")
+        if not entity_id:
+            return
+        if entity_id in self._vacuum_segment_attributes and event.data.get("action") != "remove":
+            self._resolve_vacuum_strategy(entity_id)
+        changed_areas = self._sensor_index.async_update_entity(entity_id, event.data.get("old_entity_id"))
+        self._async_sensor_index_changed(changed_areas)
+
+    @callback
+    def _on_device_registry_updated(self, event: Event) -> None:
+        """Re-index the entities of a device whose area changed and re-pick vacuum strategies."""
+        device_id: Optional[str] = event.data.get("device_id")
+        if not device_id:
+            return
+        changes = event.data.get("changes", {})
+        if event.data.get("action") != "update" or "manufacturer" in changes:
+            self._resolve_device_strategies(device_id)
+        if event.data.get("action") == "update" and "area_id" not in changes:
+            return
+        changed_areas = self._sensor_index.async_update_device(device_id)
+        self._async_sensor_index_changed(changed_areas)
+
+    @callback
+    def _resolve_vacuum_strategy(self, vacuum_entity: str) -> CommandStrategy:
+        """Resolve and cache the command strategy of a vacuum."""
+        strategy = self._strategy_registry.resolve(self.hass, vacuum_entity)
+        if self._vacuum_strategies.get(vacuum_entity) is not strategy:
+            _LOGGER.debug(f"Using {strategy.name} command strategy for {vacuum_entity}")
+        self._vacuum_strategies[vacuum_entity] = strategy
+        return strategy
+
+    @callback
+    def _resolve_device_strategies(self, device_id: str) -> None:
+        """Re-resolve the strategies of configured vacuums that belong to a device."""
+        ent_reg: er.EntityRegistry = er.async_get(self.hass)
+        for vac in self._vacuum_segment_attributes:
+            entry = ent_reg.async_get(vac)
+            if entry is not None and entry.device_id == device_id:
+                self._resolve_vacuum_strategy(vac)
+
+    @callback
+    def _async_sensor_index_changed(self, changed_areas: Set[str]) -> None:
+        """Refresh the room sensors that depend on areas whose sensors changed."""
+        if not changed_areas or self._is_unloading:
+            return
+        _LOGGER.debug(f"Sensor index changed for areas: {', '.join(sorted(changed_areas))}")
+
+        # Rooms whose sensor set changed, or whose vacuum moved to another area
+        changed: Dict[str, Any] = {}
+        for sensor in self._room_sensors.values():
+            if not sensor.dependent_areas.isdisjoint(changed_areas) and self._refresh_room_sensors(sensor):
+                changed[sensor.room_slug] = sensor
+            elif self._sensor_index.get_entity_area(sensor.vacuum) != self._indexed_vacuum_areas.get(sensor.vacuum):
+                changed[sensor.room_slug] = sensor
+
+        if changed:
+            self._rebuild_room_dispatch_index()
+        elif not changed_areas.isdisjoint(self._indexed_vacuum_areas.values()):
+            # Doors of a vacuum's own area are tracked even when it is not a room
+            doors = set(self._door_graph.doors)
+            self._rebuild_door_graph()
+            if doors != set(self._door_graph.doors):
+                self._resubscribe_dispatch()
+                for area in changed_areas:
+                    for slug in self._area_rooms.get(area, ()):
+                        changed[slug] = self._room_sensors[slug]
+        for sensor in changed.values():
+            self._evaluate_room(sensor)
+
+    def _refresh_room_sensors(self, sensor: Any) -> bool:
+        """Re-query a room's sensors, returning True if its sensor set changed."""
+        try:
+            return sensor.async_refresh_sensors()
+        except Exception as err:
+            _LOGGER.error(f"Failed to refresh sensors for room {sensor.room_slug}: {err}")
+            return False
+
+    @callback
+    def register_room_sensor(self, sensor: Any) -> None:
+        """Register a room sensor for centrally dispatched state changes."""
+        self._room_sensors[sensor.room_slug] = sensor
+        self._index_room_sensor(sensor)
+        self._rebuild_door_graph()
+        self._schedule_dispatch_resubscribe()
+
+    @callback
+    def unregister_room_sensor(self, slug: str) -> None:
+        """Stop dispatching state changes to a room sensor."""
+        if self._room_sensors.pop(slug, None) is None:
+            return
+        self._rebuild_room_dispatch_index()
+
+    def _index_room_sensor(self, sensor: Any) -> None:
+        """Add the entities and areas that can change a room's verdict to the reverse indexes.
+
+        Occupancy sensors always matter. Doors are handled by the door graph:
+        the room only needs re-evaluating when its own area or the vacuum's
+        area opens or closes off.
+        """
+        slug: str = sensor.room_slug
+        active = 0
+        for entity_id in sensor.occupancy_sensors:
+            self._entity_rooms.setdefault(entity_id, set()).add(slug)
+            if self._is_occupancy_on(entity_id):
+                self._active_occupancy.add(entity_id)
+                active += 1
+            else:
+                self._active_occupancy.discard(entity_id)
+        self._occupancy_counts[slug] = active
+
+        self._area_rooms.setdefault(sensor.room_area, set()).add(slug)
+        vacuum_area: Optional[str] = self._sensor_index.get_entity_area(sensor.vacuum)
+        self._indexed_vacuum_areas[sensor.vacuum] = vacuum_area
+        if vacuum_area is not None:
+            self._area_rooms.setdefault(vacuum_area, set()).add(slug)
+
+    def _rebuild_room_dispatch_index(self) -> None:
+        """Rebuild the reverse indexes and the door graph from all registered room sensors."""
+        self._entity_rooms = {}
+        self._area_rooms = {}
+        self._indexed_vacuum_areas = {}
+        self._active_occupancy = set()
+        self._occupancy_counts = {}
+        for sensor in self._room_sensors.values():
+            self._index_room_sensor(sensor)
+        self._rebuild_door_graph()
+        self._resubscribe_dispatch()
+
+    def _rebuild_door_graph(self) -> None:
+        """Rebuild the door graph from the doors of every room and vacuum area."""
+        areas: Set[str] = set()
+        for sensor in self._room_sensors.values():
+            areas.update(sensor.dependent_areas)
+            vacuum_area = self._sensor_index.get_entity_area(sensor.vacuum)
+            if vacuum_area is not None:
+                areas.add(vacuum_area)
+        door_areas: Dict[str, str] = {}
+        for door in self._sensor_index.get_door_sensors(areas):
+            area = self._sensor_index.get_entity_area(door)
+            if area is not None:
+                door_areas[door] = area
+        self._door_graph.rebuild(door_areas, (door for door in door_areas if self._is_door_closed(door)))
+
+    def _is_occupancy_on(self, entity_id: str) -> bool:
+        state = self.hass.states.get(entity_id)
+        return state is not None and state.state == STATE_ON
+
+    def _apply_occupancy(self, entity_id: str, is_on: bool) -> Set[str]:
+        """Apply an occupancy sensor change to the room counters.
+
+        Returns the rooms that became occupied or unoccupied.
+        """
+        if (entity_id in self._active_occupancy) == is_on:
+            return set()
+        delta = 1 if is_on else -1
+        if is_on:
+            self._active_occupancy.add(entity_id)
+        else:
+            self._active_occupancy.discard(entity_id)
+        flipped: Set[str] = set()
+        for slug in self._entity_rooms.get(entity_id, ()):
+            count = self._occupancy_counts.get(slug, 0) + delta
+            self._occupancy_counts[slug] = count
+            if count == (1 if is_on else 0):
+                flipped.add(slug)
+        return flipped
+
+    def active_occupancy_count(self, slug: str) -> int:
+        """Return how many occupancy sensors of a room currently report occupancy."""
+        return self._occupancy_counts.get(slug, 0)
+
+    def restored_room_state(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Return the verdict and last occupancy (timestamp) saved for a room, if any."""
+        return self._room_states.get(slug)
+
+    def update_room_state(
+        self, slug: str, last_occupancy: Optional[datetime], status: str, is_on: bool
+    ) -> None:
+        """Remember a room's verdict and last occupancy, saved after a quiet period."""
+        state: Dict[str, Any] = {
+            "last_occupancy": last_occupancy.timestamp() if last_occupancy else None,
+            "status": status,
+            "is_on": is_on,
+        }
+        if self._room_states.get(slug) == state:
+            return
+        self._room_states[slug] = state
+        self._room_state_store.async_delay_save(lambda: self._room_states, ROOM_STATE_SAVE_DELAY)
+
+    def schedule_cooldown(self, slug: str, delay: float) -> None:
+        """Re-evaluate a room once its occupancy cooldown has passed."""
+        self._cooldowns.schedule(slug, delay)
+
+    def cancel_cooldown(self, slug: str) -> None:
+        self._cooldowns.cancel(slug)
+
+    @callback
+    def _on_cooldowns_expired(self, slugs: Set[str]) -> None:
+        """Re-evaluate all rooms whose cooldown ended in the same tick."""
+        for slug in slugs:
+            sensor = self._room_sensors.get(slug)
+            if sensor is not None:
+                self._evaluate_room(sensor)
+
+    def _is_door_closed(self, door: str) -> bool:
+        state = self.hass.states.get(door)
+        return state is not None and state.state == STATE_OFF
+
+    @property
+    def door_graph(self) -> DoorGraph:
+        """Return the door/area connectivity graph."""
+        return self._door_graph
+
+    def _schedule_dispatch_resubscribe(self) -> None:
+        """Resubscribe once after a burst of registrations or index changes."""
+        if self._resubscribe_scheduled:
+            return
+        self._resubscribe_scheduled = True
+        self.hass.loop.call_soon(self._run_scheduled_resubscribe)
+
+    @callback
+    def _run_scheduled_resubscribe(self) -> None:
+        self._resubscribe_scheduled = False
+        self._resubscribe_dispatch()
+
+    @callback
+    def _resubscribe_dispatch(self) -> None:
+        """Keep a single state-change subscription over all indexed entities."""
+        if self._is_unloading:
+            return
+        entities: Set[str] = set(self._entity_rooms) | set(self._plan_entities) | set(self._door_graph.doors)
+        if entities == self._dispatch_entities:
+            return
+
+        if self._dispatch_unsub:
+            self._dispatch_unsub()
+            self._dispatch_unsub = None
+        added: Set[str] = entities - self._dispatch_entities
+        self._dispatch_entities = entities
+        if entities:
+            self._dispatch_unsub = async_track_state_change_event(
+                self.hass, list(entities), self._on_dispatched_state_change
+            )
+
+        # Catch up on plan entities that changed before they were subscribed
+        for room_key in {self._plan_entities[e] for e in added if e in self._plan_entities}:
+            self._update_plan_room(room_key)
+
+        # Same for room counters and doors
+        slugs: Set[str] = set()
+        for entity_id in added:
+            if entity_id in self._entity_rooms:
+                slugs |= self._apply_occupancy(entity_id, self._is_occupancy_on(entity_id))
+            if self._door_graph.has_door(entity_id):
+                flipped = self._door_graph.update_door(entity_id, self._is_door_closed(entity_id))
+                if flipped is not None:
+                    slugs |= self._area_rooms.get(flipped, set())
+        for slug in slugs:
+            sensor = self._room_sensors.get(slug)
+            if sensor is not None:
+                self._evaluate_room(sensor)
+
+    @callback
+    def _on_dispatched_state_change(self, event: Event) -> None:
+        """Re-evaluate only the rooms and plan records affected by this entity."""
+        entity_id: Optional[str] = event.data.get("entity_id")
+        if not entity_id:
+            return
+
+        plan_key = self._plan_entities.get(entity_id)
+        if plan_key is not None:
+            self._update_plan_room(plan_key)
+
+        # Only a changed occupancy count or an area opening up or closing off can change verdicts
+        new_state = event.data.get("new_state")
+        slugs: Set[str] = set()
+        if entity_id in self._entity_rooms:
+            slugs = self._apply_occupancy(entity_id, new_state is not None and new_state.state == STATE_ON)
+        if self._door_graph.has_door(entity_id):
+            flipped = self._door_graph.update_door(
+                entity_id, new_state is not None and new_state.state == STATE_OFF
+            )
+            if flipped is not None:
+                slugs = slugs | self._area_rooms.get(flipped, set())
+        if not slugs:
+            return
+
+        self._events_dispatched += 1
+        for slug in slugs:
+            sensor = self._room_sensors.get(slug)
+            if sensor is not None:
+                self._evaluate_room(sensor)
+
+    def _evaluate_room(self, sensor: Any) -> None:
+        self._rooms_evaluated += 1
+        try:
+            sensor.async_evaluate()
+        except Exception as err:
+            _LOGGER.error(f"Failed to evaluate room {sensor.room_slug}: {err}")
+
+    @callback
+    def _on_vacuum_event_dropped(self, event: Event) -> None:
+        """Count vacuum events that only carried telemetry changes."""
+        self._vacuum_events_dropped += 1
+
     @callback
     def _on_vacuum_state_change(self, event: Event) -> None:
         entity_id: Optional[str] = event.data.get("entity_id")
@@ -186,58 +778,170 @@ class VeronikaManager:
         
         if not new_state or not entity_id:
             return
+        self._vacuum_events_handled += 1
+
+        if entity_id in self._pending_resume:
+            if new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                return
+            self._resume_monitor(entity_id)
+            return
 
         # Initialize monitor state if not exists
-        if entity_id not in self._vacuum_monitors:
-            self._vacuum_monitors[entity_id] = {
-                "current_segment": None,
-                "start_time": None,
-                "completion_task": None
-            }
-        
-        monitor = self._vacuum_monitors[entity_id]
+        monitor = self._get_monitor(entity_id)
         
         # Get current segment from attributes using configured attribute name
         segment_attr = self._vacuum_segment_attributes.get(entity_id, "current_segment")
         new_segment = new_state.attributes.get(segment_attr)
         
         # If vacuum is not cleaning/returning, reset monitor
-        if new_state.state not in ["cleaning", "returning"]:
+        if new_state.state not in ACTIVE_VACUUM_STATES:
             # Check if we have a pending segment
-            if monitor["current_segment"] is not None and monitor["start_time"] is not None:
-                duration = dt_util.now().timestamp() - monitor["start_time"]
+            if monitor.current_segment is not None and monitor.start_time is not None:
+                duration = dt_util.now().timestamp() - monitor.start_time
                 
                 # Cancel any pending completion task to avoid duplicate processing
-                if monitor["completion_task"] and not monitor["completion_task"].done():
-                    monitor["completion_task"].cancel()
+                if monitor.completion_task and not monitor.completion_task.done():
+                    monitor.completion_task.cancel()
                 
-                monitor["completion_task"] = self.hass.async_create_task(
-                    self._handle_segment_completion(entity_id, monitor["current_segment"], duration)
+                monitor.completion_task = self.hass.async_create_task(
+                    self._handle_segment_completion(entity_id, monitor.current_segment, duration)
                 )
             
-            monitor["current_segment"] = None
-            monitor["start_time"] = None
+            monitor.current_segment = None
+            monitor.start_time = None
+            monitor.last_segment = None
+            monitor.left_at = None
+            # The run is over once the vacuum leaves cleaning/returning
+            if old_state is not None and old_state.state in ACTIVE_VACUUM_STATES:
+                monitor.run_segments = []
+                monitor.completed_segments = set()
+                async_dispatcher_send(self.hass, SIGNAL_VACUUM_PROGRESS, entity_id)
+            self._schedule_monitor_save()
             return
 
         # If segment changed
-        if new_segment != monitor["current_segment"]:
+        if new_segment != monitor.current_segment:
+            self._learn_transition(entity_id, monitor, new_segment)
+
             # Check if we need to complete the previous segment
-            if monitor["current_segment"] is not None and monitor["start_time"] is not None:
-                duration = dt_util.now().timestamp() - monitor["start_time"]
+            if monitor.current_segment is not None and monitor.start_time is not None:
+                duration = dt_util.now().timestamp() - monitor.start_time
                 
                 # Cancel any pending completion task to avoid race conditions
-                if monitor["completion_task"] and not monitor["completion_task"].done():
-                    monitor["completion_task"].cancel()
+                if monitor.completion_task and not monitor.completion_task.done():
+                    monitor.completion_task.cancel()
                 
-                monitor["completion_task"] = self.hass.async_create_task(
-                    self._handle_segment_completion(entity_id, monitor["current_segment"], duration)
+                monitor.completion_task = self.hass.async_create_task(
+                    self._handle_segment_completion(entity_id, monitor.current_segment, duration)
                 )
+                monitor.completed_segments.add(monitor.current_segment)
             
             # Start tracking new segment
-            monitor["current_segment"] = new_segment
-            monitor["start_time"] = dt_util.now().timestamp()
+            monitor.current_segment = new_segment
+            monitor.start_time = dt_util.now().timestamp()
+            self._schedule_monitor_save()
+            async_dispatcher_send(self.hass, SIGNAL_VACUUM_PROGRESS, entity_id)
 
-    async def _handle_segment_completion(self, vacuum_id: str, segment_id: int, duration: float) -> None:
+    def _resume_monitor(self, vacuum_id: str) -> None:
+        """Reconcile a monitor restored from storage with the vacuum's current state.
+
+        The saved start time is a timestamp, so a segment still in progress
+        keeps its elapsed time across the restart. A segment that ended while
+        Home Assistant was down is completed now. Its true end is unknown, so
+        only the time until the last checkpoint or shutdown counts towards the
+        minimum duration, and no duration is learned from it.
+        """
+        state = self.hass.states.get(vacuum_id)
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            # The vacuum integration is not up yet, resume on its first real state
+            self._pending_resume.add(vacuum_id)
+            return
+        self._pending_resume.discard(vacuum_id)
+
+        monitor = self._get_monitor(vacuum_id)
+        now = dt_util.now().timestamp()
+        segment = state.attributes.get(self._vacuum_segment_attributes.get(vacuum_id, "current_segment"))
+        cleaning = state.state in ACTIVE_VACUUM_STATES
+        if cleaning and segment == monitor.current_segment:
+            if monitor.start_time is not None:
+                _LOGGER.info(
+                    f"Resuming segment {segment} of {vacuum_id}, in progress for {now - monitor.start_time:.0f}s"
+                )
+            return
+
+        if monitor.current_segment is not None and monitor.start_time is not None:
+            last_seen = monitor.last_seen if monitor.last_seen is not None else monitor.start_time
+            monitor.completion_task = self.hass.async_create_task(
+                self._handle_segment_completion(
+                    vacuum_id, monitor.current_segment, min(now, last_seen) - monitor.start_time, learn=False
+                )
+            )
+            monitor.completed_segments.add(monitor.current_segment)
+
+        if cleaning and segment is not None:
+            monitor.current_segment = segment
+            monitor.start_time = now
+        else:
+            monitor.current_segment = None
+            monitor.start_time = None
+        if not cleaning:
+            monitor.run_segments = []
+            monitor.completed_segments = set()
+        self._schedule_monitor_save()
+        async_dispatcher_send(self.hass, SIGNAL_VACUUM_PROGRESS, vacuum_id)
+
+    @callback
+    def _on_hass_stop(self, event: Event) -> None:
+        """Checkpoint the monitors with the shutdown time; the store writes it on the final write."""
+        self._schedule_monitor_save()
+
+    def _schedule_monitor_save(self) -> None:
+        """Checkpoint the active monitors and save them after a short delay."""
+        now = dt_util.now().timestamp()
+        self._monitor_checkpoint = {
+            vac: {**monitor.as_dict(), "last_seen": now}
+            for vac, monitor in self._vacuum_monitors.items()
+            if monitor.is_active
+        }
+        self._monitor_store.async_delay_save(lambda: self._monitor_checkpoint, MONITOR_SAVE_DELAY)
+
+    def _learn_transition(self, vacuum_id: str, monitor: VacuumMonitor, new_segment: Optional[int]) -> None:
+        """Learn a move between two segments and the travel time in between.
+
+        Travel is the time the vacuum reports no segment between leaving one
+        segment and entering the next. A direct change from one segment to
+        another is learned as an adjacent move without travel.
+        """
+        now = dt_util.now().timestamp()
+        if monitor.current_segment is not None:
+            if new_segment is not None:
+                self._transitions.add(vacuum_id, monitor.current_segment, new_segment, 0.0)
+                self._schedule_history_save()
+                return
+            # Left a segment, travelling with no segment reported
+            monitor.last_segment = monitor.current_segment
+            monitor.left_at = now
+            return
+
+        if new_segment is None or monitor.last_segment is None or monitor.left_at is None:
+            return
+        gap = now - monitor.left_at
+        if monitor.last_segment != new_segment and gap <= MAX_TRANSITION_SECONDS:
+            self._transitions.add(vacuum_id, monitor.last_segment, new_segment, gap)
+            self._schedule_history_save()
+        monitor.last_segment = None
+        monitor.left_at = None
+
+    def _get_monitor(self, vacuum_id: str) -> VacuumMonitor:
+        """Return the monitor of a vacuum, creating it if needed."""
+        monitor = self._vacuum_monitors.get(vacuum_id)
+        if monitor is None:
+            monitor = self._vacuum_monitors[vacuum_id] = VacuumMonitor()
+        return monitor
+
+    async def _handle_segment_completion(
+        self, vacuum_id: str, segment_id: int, duration: float, learn: bool = True
+    ) -> None:
         if self._is_unloading:
             return
         _LOGGER.info(f"Vacuum {vacuum_id} finished segment {segment_id} in {duration}s")
@@ -246,6 +950,9 @@ class VeronikaManager:
             _LOGGER.info(f"Segment duration too short (<{self.min_segment_duration}s), not resetting toggles.")
             return
 
+        if learn:
+            self._record_segment_duration(vacuum_id, segment_id, duration)
+
         # Find switches to turn off
         if vacuum_id not in self._vacuum_segment_map:
             _LOGGER.warning(f"Vacuum {vacuum_id} not found in segment map")
@@ -256,31 +963,7 @@ class VeronikaManager:
             _LOGGER.debug(f"No switches configured for vacuum {vacuum_id} segment {segment_id}")
             return
             
-        failed_switches: List[str] = []
-        for switch in switches:
-            _LOGGER.info(f"Resetting switch {switch}")
-            try:
-                # Retry logic for transient failures
-                for attempt in range(3):
-                    try:
-                        await self.hass.services.async_call(
-                            "switch", SERVICE_TURN_OFF, {ATTR_ENTITY_ID: switch}, blocking=True
-                        )
-                        break
-                    except (asyncio.TimeoutError, Exception) as err:
-                        if attempt < 2:
-                            _LOGGER.warning(f"Retry {attempt + 1}/3 resetting switch {switch}: {err}")
-                            await asyncio.sleep(1)
-                        else:
-                            raise
-            except ServiceNotFound as err:
-                _LOGGER.error(f"Switch service not found for {switch}: {err}")
-                failed_switches.append(switch)
-            except Exception as err:
-                _LOGGER.error(f"Failed to reset switch {switch} after 3 attempts: {err}")
-                failed_switches.append(switch)
-                self._error_count += 1
-                self._last_error = f"Failed to reset {switch}: {str(err)}"
+        failed_switches: List[str] = await self._turn_off_switches(switches)
         
         if failed_switches:
             await self._notify_error(
@@ -289,6 +972,180 @@ class VeronikaManager:
                 error_type="switch_reset"
             )
 
+    def _record_segment_duration(self, vacuum_id: str, segment_id: int, duration: float) -> None:
+        """Add a completed segment to the duration history and schedule a save."""
+        self._durations.add(vacuum_id, segment_id, duration, dt_util.now().timestamp())
+        self._schedule_history_save()
+        async_dispatcher_send(self.hass, SIGNAL_VACUUM_PROGRESS, vacuum_id)
+
+    def _schedule_history_save(self) -> None:
+        """Save learned durations and transitions after a quiet period."""
+        self._duration_store.async_delay_save(
+            lambda: {**self._durations.as_dict(), "transitions": self._transitions.as_dict()},
+            DURATION_SAVE_DELAY,
+        )
+
+    def get_vacuum_eta(self, vacuum_id: str) -> Dict[str, Any]:
+        """Estimate cleaning times of a vacuum from its learned segment durations.
+
+        plan: median seconds for the segments of the current plan
+        plan_p90: same using the 90th percentile
+        remaining: seconds left in the run in progress, None if idle
+        Segments without history are listed in unknown_segments and count as 0;
+        plan and plan_p90 are None if no segment of the plan has history.
+        """
+        plan_segments: List[int] = self._plan.get(vacuum_id, {}).get('segments', [])
+        segments: Dict[Any, Optional[Dict[str, Any]]] = {
+            seg: self._durations.stats(vacuum_id, seg) for seg in plan_segments
+        }
+        plan_seconds: Optional[float] = None
+        plan_p90: Optional[float] = None
+        if not segments or any(segments.values()):
+            plan_seconds = sum(s["median"] for s in segments.values() if s)
+            plan_p90 = sum(s["p90"] for s in segments.values() if s)
+
+        remaining: Optional[float] = None
+        monitor = self._vacuum_monitors.get(vacuum_id)
+        if monitor is not None and (monitor.run_segments or monitor.current_segment is not None):
+            remaining = 0.0
+            for seg in monitor.run_segments:
+                if seg not in monitor.completed_segments and seg != monitor.current_segment:
+                    remaining += self._durations.median(vacuum_id, seg) or 0.0
+            current_estimate = (
+                self._durations.median(vacuum_id, monitor.current_segment)
+                if monitor.current_segment is not None else None
+            )
+            if current_estimate is not None and monitor.start_time is not None:
+                elapsed = dt_util.now().timestamp() - monitor.start_time
+                remaining += max(0.0, current_estimate - elapsed)
+
+        return {
+            "plan": plan_seconds,
+            "plan_p90": plan_p90,
+            "remaining": remaining,
+            "current_segment": monitor.current_segment if monitor else None,
+            "segments": segments,
+            "unknown_segments": [seg for seg, s in segments.items() if s is None],
+        }
+
+    async def _turn_off_switches(self, switches: List[str]) -> List[str]:
+        """Turn off switches with one batched call, falling back to per-switch retries.
+
+        Returns the list of switches that could not be turned off.
+        """
+        _LOGGER.info(f"Resetting switches {', '.join(switches)}")
+        results = await self._call_service_batched("switch", SERVICE_TURN_OFF, switches, OPERATION_SWITCH_RESET)
+        return [switch for switch, error in results.items() if error is not None]
+
+    async def _call_service(
+        self, operation: str, domain: str, service: str, data: Dict[str, Any]
+    ) -> None:
+        """Make a blocking service call bounded by the operation's timeout."""
+        try:
+            await asyncio.wait_for(
+                self.hass.services.async_call(domain, service, data, blocking=True),
+                timeout=self._timeouts[operation],
+            )
+        except asyncio.TimeoutError:
+            self._timeout_counts[operation] += 1
+            _LOGGER.warning(
+                f"{domain}.{service} timed out after {self._timeouts[operation]}s ({operation})"
+            )
+            raise
+
+    async def _call_services_grouped(
+        self, calls: Dict[Tuple[str, str], List[str]], operation: str
+    ) -> Dict[str, Optional[str]]:
+        """Run one batched call per (domain, service) group concurrently.
+
+        Returns a mapping of entity_id to error message (None on success).
+        """
+        group_results = await asyncio.gather(
+            *(
+                self._call_service_batched(domain, service, entity_ids, operation)
+                for (domain, service), entity_ids in calls.items()
+            )
+        )
+        results: Dict[str, Optional[str]] = {}
+        for group in group_results:
+            results.update(group)
+        return results
+
+    async def _call_service_batched(
+        self, domain: str, service: str, entity_ids: List[str], operation: str
+    ) -> Dict[str, Optional[str]]:
+        """Call a service for all entities at once, retrying per entity if the batch fails.
+
+        Entities whose circuit breaker is open are failed fast and left out of the call.
+        Returns a mapping of entity_id to error message (None on success).
+        """
+        results: Dict[str, Optional[str]] = {}
+        targets: List[str] = []
+        for entity_id in entity_ids:
+            if self._retry_policy.is_open(entity_id):
+                _LOGGER.warning(f"Skipping {domain}.{service} for {entity_id}: circuit open")
+                results[entity_id] = "circuit open"
+            else:
+                targets.append(entity_id)
+        if not targets:
+            return results
+
+        try:
+            await self._call_service(operation, domain, service, {ATTR_ENTITY_ID: list(targets)})
+            for entity_id in targets:
+                self._retry_policy.record_success(entity_id)
+                results[entity_id] = None
+            return results
+        except ServiceNotFound as err:
+            _LOGGER.error(f"Service {domain}.{service} not found: {err}")
+            results.update({entity_id: str(err) for entity_id in targets})
+            return results
+        except Exception as err:
+            _LOGGER.warning(
+                f"Batched {domain}.{service} for {len(targets)} entities failed, retrying individually: {err}"
+            )
+
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_SERVICE_CALLS)
+
+        async def call_entity(entity_id: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    await self._retry_policy.async_call(
+                        entity_id,
+                        lambda: self._call_service(operation, domain, service, {ATTR_ENTITY_ID: entity_id}),
+                        base_delay=SERVICE_RETRY_DELAY,
+                    )
+                    return None
+                except ServiceNotFound as err:
+                    _LOGGER.error(f"Service {domain}.{service} not found for {entity_id}: {err}")
+                    return str(err)
+                except Exception as err:
+                    _LOGGER.error(f"Failed {domain}.{service} for {entity_id}: {err}")
+                    self._record_error(f"Failed {domain}.{service} for {entity_id}: {str(err)}")
+                    return str(err)
+
+        errors = await asyncio.gather(*(call_entity(entity_id) for entity_id in targets))
+        results.update(zip(targets, errors))
+        return {entity_id: results[entity_id] for entity_id in entity_ids}
+
+    @staticmethod
+    def _service_result(
+        results: Dict[str, Optional[str]], skipped: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Build the per-entity service response payload."""
+        entities: Dict[str, Dict[str, str]] = {}
+        for entity_id, error in results.items():
+            entities[entity_id] = {"status": "ok"} if error is None else {"status": "failed", "error": error}
+        for entity_id, reason in (skipped or {}).items():
+            entities[entity_id] = {"status": "skipped", "reason": reason}
+        failed = sorted(entity_id for entity_id, error in results.items() if error is not None)
+        return {
+            "success": not failed,
+            "succeeded": len(results) - len(failed),
+            "failed": failed,
+            "entities": entities,
+        }
+
     async def _notify_error(self, title: str, message: str, error_type: str = "general") -> None:
         """Create a persistent notification for errors."""
         try:
@@ -301,125 +1158,260 @@ class VeronikaManager:
         except Exception as err:
             _LOGGER.error(f"Failed to create error notification: {err}")
 
-    async def get_cleaning_plan(self, rooms_to_clean: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
-        """Calculate the cleaning plan based on current state.
-        Returns a dict: { vacuum_entity_id: { 'rooms': [room_details], 'segments': [ids] } }
+    def _build_room_data(
+        self, record: RoomRecord, rooms_to_clean: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Build the plan entry of a single room from current states.
+
+        Returns None if the essential entities of the room are not known yet.
         """
-        plan: Dict[str, Dict[str, Any]] = {}  # vacuum -> {'rooms': [], 'segments': []}
+        area_id = record.area
         
-        # Use cached entity IDs instead of querying registry
-        for cache_key, cache_data in self._entity_cache.items():
-            vac = cache_data['vacuum']
-            area_id = cache_data['area']
-            segments = cache_data['segments']
-            
-            # Initialize vacuum entry if missing
-            if vac not in plan:
-                plan[vac] = {'rooms': [], 'segments': []}
-            
-            # Get entity IDs from cache
-            switch_id = cache_data.get('switch')
-            disable_id = cache_data.get('disable')
-            sensor_id = cache_data.get('sensor')
-            display_name = cache_data.get('name', 'Unknown')
-            
-            # Skip if essential entities are missing
-            if not switch_id or not sensor_id:
-                _LOGGER.warning(f"Missing essential entities for area {area_id}, skipping")
+        # Get entity IDs from the room record
+        switch_id = record.switch
+        disable_id = record.disable
+        sensor_id = record.sensor
+        display_name = record.name
+        
+        # Skip if essential entities are missing
+        if not switch_id or not sensor_id:
+            _LOGGER.warning(f"Missing essential entities for area {area_id}, skipping")
+            return None
+
+        # Get States with error handling
+        try:
+            switch_state = self.hass.states.get(switch_id)
+            disable_state = self.hass.states.get(disable_id) if disable_id else None
+            sensor_state = self.hass.states.get(sensor_id)
+        except Exception as err:
+            _LOGGER.error(f"Error accessing states for area {area_id}: {err}")
+            return None
+        
+        # Safe state checks
+        is_enabled = switch_state is not None and switch_state.state == "on"
+        is_disabled_override = disable_state is not None and disable_state.state == "on"
+        is_ready = sensor_state is not None and sensor_state.state == "on"
+        
+        # Safe attribute access
+        reason = "Unknown"
+        if sensor_state:
+            try:
+                reason = sensor_state.attributes.get("status_reason", "Unknown")
+            except (AttributeError, KeyError):
+                reason = "Sensor Error"
+        else:
+            reason = "Sensor Unavailable"
+
+        # Determine if it will be cleaned
+        will_clean = False
+        if rooms_to_clean:
+            if area_id in rooms_to_clean:
+                will_clean = True 
+        else:
+            if is_enabled and is_ready and not is_disabled_override:
+                will_clean = True
+        
+        # Collect all reasons
+        reasons = []
+        if not is_enabled:
+            reasons.append("Not Scheduled")
+        if is_disabled_override:
+            reasons.append("Disabled by Override")
+        if not is_ready:
+            reasons.append(reason)
+        
+        # Override reason for display if disabled (Legacy support, but we use reasons list now)
+        display_reason = ", ".join(reasons) if reasons else "Scheduled"
+
+        return {
+            "name": display_name,
+            "will_clean": will_clean,
+            "enabled": is_enabled,
+            "disabled_override": is_disabled_override,
+            "ready": is_ready,
+            "reason": display_reason,
+            "reasons": reasons,
+            "sensor_reason": reason,
+            "switch_entity_id": switch_id,
+            "disable_entity_id": disable_id,
+            "sensor_entity_id": sensor_id
+        }
+
+    def _rebuild_plan(self) -> None:
+        """Recompute every room record and the materialized plan from scratch."""
+        self._plan_rooms = {}
+        self._plan_segments = {}
+        self._plan_entities = {}
+        self._vacuum_rooms = {}
+        for room_key, record in self._room_records.items():
+            self._plan_segments.setdefault(record.vacuum, Counter())
+            self._vacuum_rooms.setdefault(record.vacuum, []).append(room_key)
+            for entity_id in record.entity_ids():
+                self._plan_entities[entity_id] = room_key
+            room_data = self._build_room_data(record)
+            if room_data is None:
                 continue
+            self._plan_rooms[room_key] = room_data
+            if room_data['will_clean']:
+                self._plan_segments[record.vacuum].update(record.segments)
+
+        self._plan = {vac: self._materialize_vacuum_plan(vac) for vac in self._plan_segments}
+        self._schedule_dispatch_resubscribe()
+        self._notify_plan_listeners()
+
+    def _update_plan_room(self, room_key: RoomKey) -> None:
+        """Recompute one room record and apply the segment delta to its vacuum."""
+        record = self._room_records.get(room_key)
+        if record is None:
+            return
+        vac: str = record.vacuum
+        segments: List[int] = record.segments
+
+        old_data = self._plan_rooms.get(room_key)
+        new_data = self._build_room_data(record)
+        if new_data == old_data:
+            return
+
+        # Records are replaced, never mutated, as they are shared with written states
+        if new_data is None:
+            self._plan_rooms.pop(room_key, None)
+        else:
+            self._plan_rooms[room_key] = new_data
 
-            # Get States with error handling
+        was_cleaning = old_data is not None and old_data['will_clean']
+        will_clean = new_data is not None and new_data['will_clean']
+        vac_segments = self._plan_segments.setdefault(vac, Counter())
+        if was_cleaning and not will_clean:
+            vac_segments.subtract(segments)
+            for seg in segments:
+                if vac_segments[seg] <= 0:
+                    del vac_segments[seg]
+        elif will_clean and not was_cleaning:
+            vac_segments.update(segments)
+
+        self._plan = {**self._plan, vac: self._materialize_vacuum_plan(vac)}
+        self._notify_plan_listeners()
+
+    def _materialize_vacuum_plan(self, vac: str) -> Dict[str, Any]:
+        """Assemble the plan entry of one vacuum from its room records."""
+        rooms: List[Dict[str, Any]] = [
+            self._plan_rooms[room_key]
+            for room_key in self._vacuum_rooms.get(vac, [])
+            if room_key in self._plan_rooms
+        ]
+        return {
+            'rooms': rooms,
+            'segments': sorted(self._plan_segments.get(vac, ())),
+            'count': sum(1 for r in rooms if r['will_clean']),
+        }
+
+    @callback
+    def async_add_plan_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked whenever the materialized plan changes."""
+        self._plan_listeners.append(listener)
+
+        def remove_listener() -> None:
+            if listener in self._plan_listeners:
+                self._plan_listeners.remove(listener)
+
+        return remove_listener
+
+    def _notify_plan_listeners(self) -> None:
+        for listener in list(self._plan_listeners):
             try:
-                switch_state = self.hass.states.get(switch_id)
-                disable_state = self.hass.states.get(disable_id) if disable_id else None
-                sensor_state = self.hass.states.get(sensor_id)
+                listener()
             except Exception as err:
-                _LOGGER.error(f"Error accessing states for area {area_id}: {err}")
-                continue
-            
-            # Safe state checks
-            is_enabled = switch_state is not None and switch_state.state == "on"
-            is_disabled_override = disable_state is not None and disable_state.state == "on"
-            is_ready = sensor_state is not None and sensor_state.state == "on"
-            
-            # Safe attribute access
-            reason = "Unknown"
-            if sensor_state:
-                try:
-                    reason = sensor_state.attributes.get("status_reason", "Unknown")
-                except (AttributeError, KeyError):
-                    reason = "Sensor Error"
-            else:
-                reason = "Sensor Unavailable"
+                _LOGGER.error(f"Error in cleaning plan listener: {err}")
 
-            # Determine if it will be cleaned
-            will_clean = False
-            if rooms_to_clean:
-                if area_id in rooms_to_clean:
-                    will_clean = True 
-            else:
-                if is_enabled and is_ready and not is_disabled_override:
-                    will_clean = True
-            
-            # Collect all reasons
-            reasons = []
-            if not is_enabled:
-                reasons.append("Not Scheduled")
-            if is_disabled_override:
-                reasons.append("Disabled by Override")
-            if not is_ready:
-                reasons.append(reason)
-            
-            # Override reason for display if disabled (Legacy support, but we use reasons list now)
-            display_reason = ", ".join(reasons) if reasons else "Scheduled"
-
-            room_data = {
-                "name": display_name,
-                "will_clean": will_clean,
-                "enabled": is_enabled,
-                "disabled_override": is_disabled_override,
-                "ready": is_ready,
-                "reason": display_reason,
-                "reasons": reasons,
-                "sensor_reason": reason,
-                "switch_entity_id": switch_id,
-                "disable_entity_id": disable_id,
-                "sensor_entity_id": sensor_id
-            }
-            
-            plan[vac]['rooms'].append(room_data)
-            
-            if will_clean and segments:
-                plan[vac]['segments'].extend(segments)
-        
-        # Deduplicate segments and add debug command
-        for vac in plan:
-            plan[vac]['segments'] = sorted(set(plan[vac]['segments']))
-            if self.debug_mode:
-                plan[vac]['debug_command'] = await self._get_vacuum_command_payload(vac, plan[vac]['segments'])
+    def _record_error(self, message: str, count: bool = True) -> None:
+        """Remember the last error and let the plan sensor show it."""
+        self._last_error = message
+        if count:
+            self._error_count += 1
+        self._notify_plan_listeners()
+
+    async def get_cleaning_plan(self, rooms_to_clean: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Calculate the cleaning plan based on current state.
+        Returns a dict: { vacuum_entity_id: { 'rooms': [room_details], 'segments': [ids] } }
+
+        Without rooms_to_clean the incrementally maintained plan is returned as is
+        and must be treated as read-only.
+        """
+        if not rooms_to_clean:
+            plan: Dict[str, Dict[str, Any]] = self._plan
+        else:
+            plan = {}  # vacuum -> {'rooms': [], 'segments': []}
+            for record in self._room_records.values():
+                vac = record.vacuum
+                
+                # Initialize vacuum entry if missing
+                if vac not in plan:
+                    plan[vac] = {'rooms': [], 'segments': []}
+
+                room_data = self._build_room_data(record, rooms_to_clean)
+                if room_data is None:
+                    continue
+                plan[vac]['rooms'].append(room_data)
+                
+                if room_data['will_clean'] and record.segments:
+                    plan[vac]['segments'].extend(record.segments)
+
+            # Deduplicate segments
+            for vac in plan:
+                plan[vac]['segments'] = sorted(set(plan[vac]['segments']))
+                plan[vac]['count'] = sum(1 for r in plan[vac]['rooms'] if r['will_clean'])
+
+        if self.debug_mode:
+            plan = await self._with_debug_commands(plan)
             
         return plan
 
-    async def start_cleaning(self, rooms_to_clean: Optional[List[str]] = None) -> None:
+    async def _with_debug_commands(self, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the plan with the command each vacuum would be sent."""
+        return {
+            vac: {**data, 'debug_command': await self._get_vacuum_command_payload(vac, data['segments'])}
+            for vac, data in plan.items()
+        }
+
+    async def start_cleaning(
+        self, rooms_to_clean: Optional[List[str]] = None, max_duration: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Start cleaning for specific rooms or all enabled rooms.
         rooms_to_clean: list of room names (optional)
+        max_duration: time budget in minutes per vacuum for the enabled rooms (optional)
+
+        Returns the started segments, failures and rooms deferred by the time budget.
         """
-        async with self._cleaning_lock:
-            await self._start_cleaning_inner(rooms_to_clean)
+        return await self._start_cleaning_inner(rooms_to_clean, max_duration)
+
+    async def _start_cleaning_inner(
+        self, rooms_to_clean: Optional[List[str]] = None, max_duration: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Inner implementation of start_cleaning.
 
-    async def _start_cleaning_inner(self, rooms_to_clean: Optional[List[str]] = None) -> None:
-        """Inner implementation of start_cleaning, called under lock."""
+        Commands are serialized per vacuum by the command queues, so requests
+        for different vacuums never wait for each other.
+        """
+        response: Dict[str, Any] = {"started": {}, "failed": {}, "deferred": {}}
         try:
             # 1. Identify what to clean
             plan: Dict[str, Dict[str, Any]] = await self.get_cleaning_plan(rooms_to_clean)
             
             if not plan:
                 _LOGGER.warning("No cleaning plan generated, nothing to clean")
-                return
+                return response
+
+            if max_duration is not None and not rooms_to_clean:
+                plan = self._apply_time_budget(plan, max_duration)
+                if self.debug_mode:
+                    # The budget dropped segments, so the command has to be rebuilt
+                    plan = await self._with_debug_commands(plan)
+                response["deferred"] = {vac: data['deferred'] for vac, data in plan.items() if data['deferred']}
 
-            # 2. Execute Plan
-            failed_vacuums: List[str] = []
+            # 2. Execute Plan, one command per vacuum, all vacuums concurrently
+            failed_vacuums: Dict[str, str] = {}
+            commands: Dict[str, List[int]] = {}
             for vac, data in plan.items():
                 segments = data.get('segments', [])
                 if not segments:
@@ -434,76 +1426,199 @@ class VeronikaManager:
                         f"Please ensure your vacuum integration is loaded and the entity exists."
                     )
                     _LOGGER.error(error_msg)
-                    failed_vacuums.append(vac)
+                    failed_vacuums[vac] = "entity not found"
                     continue
                 
                 _LOGGER.info(f"Starting cleaning for {vac} segments: {segments}")
-                
-                try:
-                    await self._send_vacuum_command(vac, segments)
-                except Exception as err:
-                    _LOGGER.error(f"Failed to send cleaning command to {vac}: {err}")
-                    failed_vacuums.append(vac)
+                commands[vac] = segments
+
+            results = await asyncio.gather(
+                *(self._queue_vacuum_command(vac, segments) for vac, segments in commands.items()),
+                return_exceptions=True
+            )
+            for vac, result in zip(commands, results):
+                if isinstance(result, BaseException):
+                    _LOGGER.error(f"Failed to send cleaning command to {vac}: {result}")
+                    failed_vacuums[vac] = str(result)
+                else:
+                    response["started"][vac] = commands[vac]
+            response["failed"] = failed_vacuums
             
             if failed_vacuums:
                 await self._notify_error(
                     "Cleaning Start Failed",
-                    f"Failed to start cleaning for: {', '.join(failed_vacuums)}",
+                    "Failed to start cleaning for:\n" + "\n".join(
+                        f"- {vac}: {reason}" for vac, reason in failed_vacuums.items()
+                    ),
                     error_type="cleaning_start"
                 )
         except Exception as err:
             _LOGGER.error(f"Unexpected error in start_cleaning: {err}", exc_info=True)
-            self._last_error = str(err)
-            self._error_count += 1
+            self._record_error(str(err))
             await self._notify_error("Cleaning Error", f"Unexpected error: {str(err)}", error_type="cleaning_error")
             raise HomeAssistantError(f"Failed to start cleaning: {err}") from err
+        return response
 
-    async def _get_vacuum_command_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
-        """Generate vacuum command payload based on manufacturer."""
-        if not segments:
-            raise ValueError(f"No segments provided for {vacuum_entity}")
-            
-        # Determine manufacturer
-        try:
-            ent_reg: er.EntityRegistry = er.async_get(self.hass)
-            dev_reg: dr.DeviceRegistry = dr.async_get(self.hass)
-        except Exception as err:
-            _LOGGER.error(f"Failed to access registries: {err}")
-            raise HomeAssistantError(f"Registry access error: {err}") from err
-        
-        manufacturer: str = ""
-        entry: Optional[er.RegistryEntry] = ent_reg.async_get(vacuum_entity)
-        if entry and entry.device_id:
-            device = dev_reg.async_get(entry.device_id)
-            if device and device.manufacturer:
-                manufacturer = device.manufacturer
-            else:
-                _LOGGER.warning(f"No device found for vacuum {vacuum_entity}")
+    def _estimate_room_duration(self, record: RoomRecord, fallback: float) -> float:
+        """Estimate a room's cleaning time in seconds from its segments' median durations.
+
+        Segments without history use fallback.
+        """
+        total = 0.0
+        for seg in record.segments:
+            estimate = self._durations.median(record.vacuum, seg)
+            total += fallback if estimate is None else estimate
+        return total
+
+    def _room_value(self, record: RoomRecord, now: float) -> float:
+        """Value of cleaning a room now: its priority weighted by days since it was last cleaned."""
+        cleaned = [self._durations.last_cleaned(record.vacuum, seg) for seg in record.segments]
+        if not cleaned or None in cleaned:
+            staleness = MAX_STALENESS_DAYS
         else:
-            _LOGGER.warning(f"No registry entry found for vacuum {vacuum_entity}")
-
-        if manufacturer == "Roborock":
-            return {
-                "service": "vacuum.send_command",
-                "data": {
-                    ATTR_ENTITY_ID: vacuum_entity,
-                    "command": "app_segment_clean",
-                    "params": [{"segments": segments, "repeat": 1}]
-                }
-            }
-        elif "Dreame" in manufacturer:
-            return {
-                "service": "dreame_vacuum.vacuum_clean_segment",
-                "data": {
-                    ATTR_ENTITY_ID: vacuum_entity,
-                    "segments": segments
-                }
+            staleness = min(MAX_STALENESS_DAYS, (now - min(cleaned)) / 86400)
+        return record.priority * (1 + staleness)
+
+    def _apply_time_budget(self, plan: Dict[str, Dict[str, Any]], max_duration: float) -> Dict[str, Dict[str, Any]]:
+        """Restrict every vacuum to the scheduled rooms worth most that fit in max_duration minutes.
+
+        Each vacuum gets the whole budget since vacuums clean in parallel. Returns a
+        new plan whose entries carry 'deferred': [{'room', 'reason'}] and 'estimated_minutes'.
+        """
+        # Room estimates are whole minutes, so flooring a fractional budget drops nothing that fits
+        budget = math.floor(max_duration)
+        now = dt_util.now().timestamp()
+        budgeted: Dict[str, Dict[str, Any]] = {}
+        for vac, data in plan.items():
+            records = [
+                self._room_records[key]
+                for key in self._vacuum_rooms.get(vac, [])
+                if key in self._room_records and self._plan_rooms.get(key, {}).get('will_clean')
+            ]
+            # Segments never cleaned yet are assumed to take as long as an average known one
+            known = self._durations.known_medians(vac)
+            if known:
+                fallback = sum(known) / len(known)
+            else:
+                fallback = self.default_segment_duration
+                _LOGGER.info(
+                    f"No cleaning durations learned for {vac} yet, assuming {fallback}s per segment"
+                )
+
+            deferred: List[Dict[str, str]] = []
+            items: List[Tuple[RoomKey, int, float]] = []
+            for record in records:
+                estimate = self._estimate_room_duration(record, fallback)
+                items.append((record.key, max(1, math.ceil(estimate / 60)), self._room_value(record, now)))
+
+            chosen = select_within_budget(items, budget)
+            segments: Set[int] = set()
+            used = 0
+            for key, minutes, _ in items:
+                record = self._room_records[key]
+                if key in chosen:
+                    segments.update(record.segments)
+                    used += minutes
+                elif minutes > budget:
+                    deferred.append({
+                        "room": record.name,
+                        "reason": f"Needs about {minutes} min, more than the {budget} min budget",
+                    })
+                else:
+                    deferred.append({
+                        "room": record.name,
+                        "reason": f"Did not fit in {budget} min; higher priority or staler rooms went first",
+                    })
+
+            for entry in deferred:
+                _LOGGER.info(f"Deferring {entry['room']} for {vac}: {entry['reason']}")
+            budgeted[vac] = {
+                **data,
+                'segments': sorted(segments),
+                'count': len(chosen),
+                'estimated_minutes': used,
+                'deferred': deferred,
             }
+        return budgeted
+
+    async def _queue_vacuum_command(self, vacuum_entity: str, segments: List[int]) -> None:
+        """Queue a cleaning command for a vacuum and wait until it has been sent.
+
+        While a command is in flight, further requests are merged into a single
+        follow-up command carrying the union of all requested segments. Requests
+        already covered by the in-flight command just wait for it.
+        """
+        queue = self._command_queues.setdefault(vacuum_entity, VacuumCommandQueue())
+        requested: Set[int] = set(segments)
+
+        if queue.active_future is not None and queue.pending_future is None and requested <= queue.active_segments:
+            _LOGGER.debug(f"Command for {vacuum_entity} already in flight, coalescing request")
+            self._coalesced_requests += 1
+            future = queue.active_future
         else:
-            return {
-                "service": "vacuum.start",
-                "data": {ATTR_ENTITY_ID: vacuum_entity}
-            }
+            if queue.pending_future is None:
+                queue.pending_future = self.hass.loop.create_future()
+                # The follow-up replaces the running job, so it has to include it
+                queue.pending_segments = set(queue.active_segments)
+            else:
+                self._coalesced_requests += 1
+            queue.pending_segments |= requested
+            future = queue.pending_future
+
+            if queue.worker is None:
+                queue.worker = self.hass.async_create_task(self._run_command_queue(vacuum_entity, queue))
+
+        await asyncio.shield(future)
+
+    async def _run_command_queue(self, vacuum_entity: str, queue: "VacuumCommandQueue") -> None:
+        """Send queued commands for one vacuum until its queue is drained."""
+        try:
+            while queue.pending_future is not None:
+                future = queue.pending_future
+                segments: List[int] = sorted(queue.pending_segments)
+                queue.pending_future = None
+                queue.pending_segments = set()
+                queue.active_future = future
+                queue.active_segments = set(segments)
+
+                try:
+                    await self._send_vacuum_command(vacuum_entity, segments)
+                except Exception as err:
+                    future.set_exception(err)
+                else:
+                    # Remember the run so the remaining time can be estimated
+                    monitor = self._get_monitor(vacuum_entity)
+                    monitor.run_segments = segments
+                    monitor.completed_segments = set()
+                    self._schedule_monitor_save()
+                    async_dispatcher_send(self.hass, SIGNAL_VACUUM_PROGRESS, vacuum_entity)
+                    future.set_result(None)
+        except asyncio.CancelledError:
+            # Nothing else resolves these futures, so their waiters would hang forever
+            for future in (queue.active_future, queue.pending_future):
+                if future is not None and not future.done():
+                    future.set_exception(HomeAssistantError(f"Command for {vacuum_entity} was cancelled"))
+            queue.pending_future = None
+            queue.pending_segments = set()
+            raise
+        finally:
+            queue.worker = None
+            queue.active_future = None
+            queue.active_segments = set()
+
+    async def _get_vacuum_command_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
+        """Generate vacuum command payload using the vacuum's cached strategy."""
+        if not segments:
+            raise ValueError(f"No segments provided for {vacuum_entity}")
+
+        strategy: Optional[CommandStrategy] = self._vacuum_strategies.get(vacuum_entity)
+        if strategy is None:
+            # Vacuum not known at setup, resolve once and keep it
+            strategy = self._resolve_vacuum_strategy(vacuum_entity)
+        if strategy.honors_order:
+            # Visit segments along the shortest learned path instead of by ID
+            segments = self._transitions.order(vacuum_entity, segments)
+        return strategy.build_payload(vacuum_entity, segments)
 
     async def _send_vacuum_command(self, vacuum_entity: str, segments: List[int]) -> None:
         """Send cleaning command to vacuum with retry logic."""
@@ -528,101 +1643,121 @@ class VeronikaManager:
             _LOGGER.error(f"Invalid service in payload: {err}")
             raise HomeAssistantError(f"Service parsing error: {err}") from err
         
-        # Retry logic for service calls
-        last_error: Optional[Exception] = None
-        for attempt in range(3):
-            try:
-                await self.hass.services.async_call(
-                    domain, service, payload["data"], blocking=True
-                )
-                _LOGGER.info(f"Successfully sent command to {vacuum_entity} for segments {segments}")
-                return
-            except ServiceNotFound as err:
-                _LOGGER.error(f"Service {domain}.{service} not found for {vacuum_entity}: {err}")
-                raise HomeAssistantError(f"Service not available: {domain}.{service}") from err
-            except asyncio.TimeoutError as err:
-                last_error = err
-                if attempt < 2:
-                    _LOGGER.warning(f"Timeout on attempt {attempt + 1}/3 for {vacuum_entity}, retrying...")
-                    await asyncio.sleep(2)
-                else:
-                    _LOGGER.error(f"Service call timed out after 3 attempts for {vacuum_entity}")
-            except Exception as err:
-                last_error = err
-                if attempt < 2:
-                    _LOGGER.warning(f"Error on attempt {attempt + 1}/3 for {vacuum_entity}: {err}, retrying...")
-                    await asyncio.sleep(2)
-                else:
-                    _LOGGER.error(f"Failed to send command to {vacuum_entity} after 3 attempts: {err}")
-        
-        # If we get here, all retries failed
-        self._error_count += 1
-        self._last_error = f"Failed to command {vacuum_entity}: {str(last_error)}"
-        raise HomeAssistantError(f"Failed to send command after 3 attempts: {last_error}") from last_error
-
-    async def reset_all_toggles(self) -> None:
-        """Reset all cleaning toggles to ON."""
-        failed_switches: List[str] = []
-        
-        for cache_data in self._entity_cache.values():
-            switch_id: Optional[str] = cache_data.get('switch')
+        try:
+            await self._retry_policy.async_call(
+                vacuum_entity,
+                lambda: self._call_service(OPERATION_START, domain, service, payload["data"]),
+                base_delay=VACUUM_RETRY_DELAY,
+            )
+        except ServiceNotFound as err:
+            _LOGGER.error(f"Service {domain}.{service} not found for {vacuum_entity}: {err}")
+            raise HomeAssistantError(f"Service not available: {domain}.{service}") from err
+        except CircuitOpenError as err:
+            _LOGGER.warning(f"Not commanding {vacuum_entity}: {err}")
+            self._record_error(f"Failed to command {vacuum_entity}: {str(err)}", count=False)
+            raise
+        except Exception as err:
+            _LOGGER.error(f"Failed to send command to {vacuum_entity}: {err}")
+            self._record_error(f"Failed to command {vacuum_entity}: {str(err)}")
+            raise HomeAssistantError(f"Failed to send command: {err}") from err
+        _LOGGER.info(f"Successfully sent command to {vacuum_entity} for segments {segments}")
+
+    async def reset_all_toggles(self) -> Dict[str, Any]:
+        """Reset all cleaning toggles to ON.
+
+        Returns a per-entity result suitable for a service response.
+        """
+        calls: Dict[Tuple[str, str], List[str]] = {}
+        for record in self._room_records.values():
+            switch_id: Optional[str] = record.switch
             if not switch_id:
                 continue
-                
-            try:
-                await self.hass.services.async_call(
-                    "switch", SERVICE_TURN_ON, {ATTR_ENTITY_ID: switch_id}, blocking=True
-                )
-            except Exception as err:
-                _LOGGER.error(f"Failed to reset toggle {switch_id}: {err}")
-                failed_switches.append(switch_id)
-        
+            entity_ids = calls.setdefault((split_entity_id(switch_id)[0], SERVICE_TURN_ON), [])
+            if switch_id not in entity_ids:
+                entity_ids.append(switch_id)
+
+        results = await self._call_services_grouped(calls, OPERATION_SWITCH_RESET)
+        response = self._service_result(results)
+        failed_switches: List[str] = response["failed"]
+
         if failed_switches:
             await self._notify_error(
                 "Toggle Reset Failed",
                 f"Failed to reset {len(failed_switches)} toggle(s): {', '.join(failed_switches)}",
                 error_type="toggle_reset"
             )
+        return response
+
+    async def stop_cleaning(self) -> Dict[str, Any]:
+        """Stop all active vacuums and return them to base.
+
+        Returns a per-entity result suitable for a service response.
+        """
+        vacuums: List[str] = sorted(set(r[CONF_VACUUM] for r in self.rooms))
+        active: List[str] = []
+        skipped: Dict[str, str] = {}
 
-    async def stop_cleaning(self) -> None:
-        """Stop all active vacuums and return them to base."""
-        vacuums: Set[str] = set(r[CONF_VACUUM] for r in self.rooms)
-        failed_vacuums: List[str] = []
-        
         for vac in vacuums:
-            try:
-                state = self.hass.states.get(vac)
-                if not state:
-                    _LOGGER.warning(f"Vacuum {vac} state not found")
-                    continue
-                    
-                if state.state == "cleaning":
-                    await self.hass.services.async_call(
-                        "vacuum", "return_to_base",
-                        {ATTR_ENTITY_ID: vac},
-                        blocking=True
-                    )
-                    _LOGGER.info(f"Sent return to base command to {vac}")
-            except Exception as err:
-                _LOGGER.error(f"Failed to stop vacuum {vac}: {err}")
-                failed_vacuums.append(vac)
-        
+            state = self.hass.states.get(vac)
+            if not state:
+                _LOGGER.warning(f"Vacuum {vac} state not found")
+                skipped[vac] = "state not found"
+            elif state.state != "cleaning":
+                skipped[vac] = f"not cleaning ({state.state})"
+            else:
+                active.append(vac)
+
+        results: Dict[str, Optional[str]] = {}
+        if active:
+            results = await self._call_services_grouped({("vacuum", "return_to_base"): active}, OPERATION_STOP)
+            _LOGGER.info(f"Sent return to base command to {', '.join(active)}")
+        response = self._service_result(results, skipped)
+        failed_vacuums: List[str] = response["failed"]
+
         if failed_vacuums:
             await self._notify_error(
                 "Stop Cleaning Failed",
                 f"Failed to stop {len(failed_vacuums)} vacuum(s): {', '.join(failed_vacuums)}",
                 error_type="stop_cleaning"
             )
+        return response
 
-    def get_entity_watch_list(self) -> Set[str]:
-        """Return the set of entity IDs that should be watched for state changes."""
-        entities: Set[str] = set()
-        for cache_data in self._entity_cache.values():
-            for key in ('switch', 'disable', 'sensor'):
-                entity_id = cache_data.get(key)
-                if entity_id is not None:
-                    entities.add(entity_id)
-        return entities
+    @property
+    def sensor_index(self) -> AreaSensorIndex:
+        """Return the shared area sensor index."""
+        return self._sensor_index
+
+    @property
+    def dispatch_stats(self) -> Dict[str, int]:
+        """Return counters of dispatched state events vs. room evaluations."""
+        return {
+            "events_dispatched": self._events_dispatched,
+            "rooms_evaluated": self._rooms_evaluated,
+        }
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """Return runtime counters for the state dispatcher, command queues and retries."""
+        return {
+            "dispatch": self.dispatch_stats,
+            "doors": self._door_graph.diagnostics,
+            "cooldowns": self._cooldowns.diagnostics,
+            "vacuum_events": {
+                "handled": self._vacuum_events_handled,
+                "dropped": self._vacuum_events_dropped,
+            },
+            "commands": {
+                "coalesced_requests": self._coalesced_requests,
+                "in_flight": sorted(v for v, q in self._command_queues.items() if q.worker is not None),
+            },
+            "retry": self._retry_policy.diagnostics,
+            "timeouts": dict(self._timeout_counts),
+            "strategies": {vac: strategy.name for vac, strategy in sorted(self._vacuum_strategies.items())},
+            "entities": {
+                entity.entity_id: entity.write_stats
+                for entity in sorted(self._write_stats_entities, key=lambda e: e.entity_id or "")
+            },
+        }
 
     @property
     def last_error(self) -> Optional[str]:
@@ -640,19 +1775,32 @@ class VeronikaManager:
 
         # Cancel any pending completion tasks
         for monitor in self._vacuum_monitors.values():
-            if monitor.get("completion_task") and not monitor["completion_task"].done():
-                monitor["completion_task"].cancel()
+            if monitor.completion_task and not monitor.completion_task.done():
+                monitor.completion_task.cancel()
         
         # Unsubscribe from all state change listeners
         for unsub in self._unsubscribers:
             unsub()
         self._unsubscribers.clear()
+        if self._dispatch_unsub:
+            self._dispatch_unsub()
+            self._dispatch_unsub = None
         
         # Clear caches and monitors
         self._vacuum_monitors.clear()
+        self._pending_resume.clear()
         self._vacuum_segment_map.clear()
         self._vacuum_segment_attributes.clear()
-        self._entity_cache.clear()
+        self._room_records.clear()
+        self._records_by_slug.clear()
+        self._room_sensors.clear()
+        self._entity_rooms.clear()
+        self._active_occupancy.clear()
+        self._cooldowns.cancel_all()
+        self._occupancy_counts.clear()
+        self._area_rooms.clear()
+        self._plan_listeners.clear()
+        self._vacuum_strategies.clear()
         
         _LOGGER.info("Veronika manager unloaded successfully")
 
@@ -0,0 +1,133 @@
+"""Cleaning plan optimization helpers."""
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Sequence, Set, Tuple
+
+
+def select_within_budget(items: Sequence[Tuple[Hashable, int, float]], capacity: int) -> Set[Hashable]:
+    """Pick the items with the highest total value whose total weight fits in capacity.
+
+    items are (key, weight, value) with integer weights, e.g. minutes. This is
+    the classic 0/1 knapsack, O(len(items) * capacity), which is tiny for a
+    household's rooms and a cleaning window in minutes.
+    """
+    if capacity <= 0 or not items:
+        return set()
+
+    # best[w]: best value using weight w; taken[i][w]: item i improved best[w]
+    best: List[float] = [0.0] * (capacity + 1)
+    taken: List[List[bool]] = []
+    for _, weight, value in items:
+        row = [False] * (capacity + 1)
+        for w in range(capacity, weight - 1, -1):
+            candidate = best[w - weight] + value
+            if candidate > best[w]:
+                best[w] = candidate
+                row[w] = True
+        taken.append(row)
+
+    # Walk back through the decisions to recover the chosen items
+    chosen: Set[Hashable] = set()
+    w = capacity
+    for i in range(len(items) - 1, -1, -1):
+        if taken[i][w]:
+            key, weight, _ = items[i]
+            chosen.add(key)
+            w -= weight
+    return chosen
+
+
+class SegmentTransitionGraph:
+    """Learned travel times between the segments of each vacuum.
+
+    Every observed move from one segment to another updates an exponential
+    moving average of the time spent in between (0 when the vacuum reports the
+    next segment right away). Times are treated as symmetric.
+    """
+
+    def __init__(self, alpha: float = 0.3) -> None:
+        self.alpha = alpha
+        self._edges: Dict[str, Dict[FrozenSet[Hashable], float]] = {}
+
+    def add(self, vacuum: str, from_segment: Hashable, to_segment: Hashable, seconds: float) -> None:
+        """Record one observed transition."""
+        if from_segment == to_segment:
+            return
+        edges = self._edges.setdefault(vacuum, {})
+        key = frozenset((from_segment, to_segment))
+        previous = edges.get(key)
+        edges[key] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def cost(self, vacuum: str, a: Hashable, b: Hashable) -> Optional[float]:
+        """Return the learned travel time between two segments, or None if never observed."""
+        return self._edges.get(vacuum, {}).get(frozenset((a, b)))
+
+    def order(self, vacuum: str, segments: Sequence[Hashable]) -> List[Hashable]:
+        """Order segments to minimize the learned travel between consecutive ones.
+
+        Pairs never observed cost twice the slowest known transition, so known
+        neighbours are preferred. Without any learned transition the input order
+        is kept.
+        """
+        edges = self._edges.get(vacuum)
+        if not edges or len(segments) < 3:
+            return list(segments)
+        unknown = 2 * max(max(edges.values()), 1.0)
+
+        def cost(a: Hashable, b: Hashable) -> float:
+            known = edges.get(frozenset((a, b)))
+            return unknown if known is None else known
+
+        return order_path(list(segments), cost)
+
+    def as_dict(self) -> Dict[str, List[List[Any]]]:
+        """Serialize as {vacuum: [[a, b, seconds], ...]} for storage."""
+        return {
+            vacuum: [[*sorted(pair, key=str), seconds] for pair, seconds in edges.items()]
+            for vacuum, edges in self._edges.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[List[Any]]]) -> "SegmentTransitionGraph":
+        """Restore a graph saved with as_dict."""
+        graph = cls()
+        for vacuum, edges in data.items():
+            for a, b, seconds in edges:
+                graph._edges.setdefault(vacuum, {})[frozenset((a, b))] = seconds
+        return graph
+
+
+def order_path(nodes: List[Hashable], cost: Callable[[Hashable, Hashable], float]) -> List[Hashable]:
+    """Open-path TSP heuristic: nearest neighbour from every start, improved with 2-opt."""
+
+    def length(path: List[Hashable]) -> float:
+        return sum(cost(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+    best: List[Hashable] = list(nodes)
+    best_length = length(best)
+    for start in nodes:
+        path = [start]
+        remaining = [n for n in nodes if n != start]
+        while remaining:
+            nearest = min(remaining, key=lambda n: cost(path[-1], n))
+            path.append(nearest)
+            remaining.remove(nearest)
+        path = _two_opt(path, cost)
+        path_length = length(path)
+        if path_length < best_length:
+            best, best_length = path, path_length
+    return best
+
+
+def _two_opt(path: List[Hashable], cost: Callable[[Hashable, Hashable], float]) -> List[Hashable]:
+    """Reverse sub-paths while that shortens the open path."""
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(path) - 1):
+            for j in range(i + 2, len(path) + 1):
+                # Reversing path[i:j] changes the edges at both ends of the slice
+                before = (cost(path[i - 1], path[i]) if i > 0 else 0) + (cost(path[j - 1], path[j]) if j < len(path) else 0)
+                after = (cost(path[i - 1], path[j - 1]) if i > 0 else 0) + (cost(path[i], path[j]) if j < len(path) else 0)
+                if after < before - 1e-9:
+                    path[i:j] = reversed(path[i:j])
+                    improved = True
+    return path
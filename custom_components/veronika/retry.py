@@ -0,0 +1,182 @@
+"""Retry policy with exponential backoff, jitter and per-target circuit breakers."""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from homeassistant.exceptions import HomeAssistantError, ServiceNotFound
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HomeAssistantError):
+    """Raised when a call is rejected because the target's circuit is open."""
+
+
+class CircuitBreaker:
+    """Track consecutive failures of one target and fail fast while it is known-dead.
+
+    After `failure_threshold` consecutive failed attempts the breaker opens and
+    rejects calls for `reset_timeout` seconds. The first call after that is let
+    through as a trial (half-open): success closes the breaker, failure re-opens it.
+    """
+
+    __slots__ = ("failure_threshold", "reset_timeout", "_clock", "state", "failures", "opened_at", "trips")
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state: str = BREAKER_CLOSED
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+        self.trips: int = 0
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now."""
+        if self.state == BREAKER_OPEN:
+            if self.opened_at is not None and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = BREAKER_HALF_OPEN
+                return True
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.trips += 1
+            self.state = BREAKER_OPEN
+            self.opened_at = self._clock()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
+
+
+class RetryPolicy:
+    """Shared retry engine used by every service-call path of the manager.
+
+    Delays grow exponentially from `base_delay` up to `max_delay`; `jitter` is the
+    fraction of each delay that is randomised so that retries against several
+    targets do not line up. Each target (usually an entity_id) gets its own
+    circuit breaker.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        jitter: float = 0.5,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        non_retryable: Tuple[Type[BaseException], ...] = (ServiceNotFound,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.non_retryable = non_retryable
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries: int = 0
+        self.failures: int = 0
+        self.short_circuits: int = 0
+
+    def breaker(self, target: str) -> CircuitBreaker:
+        """Return (creating if needed) the circuit breaker for a target."""
+        breaker = self._breakers.get(target)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self._clock)
+            self._breakers[target] = breaker
+        return breaker
+
+    def is_open(self, target: str) -> bool:
+        """Return True if calls to the target are currently rejected."""
+        breaker = self._breakers.get(target)
+        return breaker is not None and not breaker.allow()
+
+    def record_success(self, target: str) -> None:
+        """Record a success obtained outside `async_call` (e.g. a batched call)."""
+        breaker = self._breakers.get(target)
+        if breaker is not None:
+            breaker.record_success()
+
+    def backoff(self, attempt: int, base_delay: Optional[float] = None) -> float:
+        """Return the jittered delay before retry number `attempt` (0-based)."""
+        base = self.base_delay if base_delay is None else base_delay
+        delay = min(self.max_delay, base * (2 ** attempt))
+        return delay * (1 - self.jitter * random.random())
+
+    async def async_call(
+        self,
+        target: str,
+        func: Callable[[], Awaitable[T]],
+        base_delay: Optional[float] = None,
+    ) -> T:
+        """Run `func` with retries, raising the last error if every attempt fails.
+
+        Raises CircuitOpenError without calling `func` while the target's
+        circuit is open.
+        """
+        breaker = self.breaker(target)
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.attempts):
+            if not breaker.allow():
+                self.short_circuits += 1
+                if last_error is not None:
+                    break
+                raise CircuitOpenError(f"Circuit open for {target}, skipping call")
+            try:
+                result = await func()
+            except self.non_retryable:
+                raise
+            except Exception as err:
+                last_error = err
+                breaker.record_failure()
+                if attempt < self.attempts - 1 and breaker.state != BREAKER_OPEN:
+                    delay = self.backoff(attempt, base_delay)
+                    self.retries += 1
+                    _LOGGER.warning(
+                        f"Attempt {attempt + 1}/{self.attempts} for {target} failed: {err}, retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                break
+            else:
+                breaker.record_success()
+                return result
+
+        self.failures += 1
+        assert last_error is not None
+        raise last_error
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """Return retry counters and the state of every known breaker."""
+        return {
+            "retries": self.retries,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            "breakers": {target: breaker.as_dict() for target, breaker in sorted(self._breakers.items())},
+        }
@@ -1,14 +1,15 @@
 import logging
-from typing import Any, Dict, List, Optional, Set
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant, callback, Event
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.helpers import entity_registry as er
+from typing import Any, Callable, Dict, List, Optional
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, CONF_ROOMS, CONF_AREA
-from .utils import get_room_identity
-from collections import Counter
+from .const import DOMAIN, CONF_ROOMS, CONF_VACUUM, CONF_PLAN_UPDATE_DELAY, SIGNAL_VACUUM_PROGRESS
+from homeassistant.util import slugify
+from .entity import VeronikaEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,40 +27,68 @@ async def async_setup_platform(
     if not manager:
         _LOGGER.error("Veronika manager not initialized, skipping sensor platform setup")
         return
-    async_add_entities([VeronikaPlanSensor(hass, manager)], True)
+    update_delay: float = hass.data[DOMAIN].get(CONF_PLAN_UPDATE_DELAY, 1.0)
+    entities: List[SensorEntity] = [VeronikaPlanSensor(hass, manager, update_delay)]
 
-class VeronikaPlanSensor(SensorEntity):
+    # One cleaning time estimate per vacuum
+    vacuums: List[str] = list(dict.fromkeys(room[CONF_VACUUM] for room in hass.data[DOMAIN][CONF_ROOMS]))
+    entities.extend(VeronikaEtaSensor(hass, manager, vac) for vac in vacuums)
+    async_add_entities(entities, True)
+
+class VeronikaPlanSensor(VeronikaEntity, SensorEntity):
     """Representation of a Veronika Cleaning Plan Sensor."""
 
-    def __init__(self, hass: HomeAssistant, manager: Any) -> None:
+    # The nested plan is only useful live; history keeps the compact summary
+    _unrecorded_attributes = VeronikaEntity._unrecorded_attributes | frozenset({"plan"})
+
+    def __init__(self, hass: HomeAssistant, manager: Any, update_delay: float = 0) -> None:
         """Initialize the sensor."""
         self.hass: HomeAssistant = hass
         self._manager: Any = manager
+        # Plan changes within this window are folded into a single update
+        self._update_delay: float = update_delay
+        self._update_timer: Optional[Callable[[], None]] = None
+        self._suppressed_updates: int = 0
         self._attr_name: str = "Veronika Cleaning Plan"
         self._attr_unique_id: str = "veronika_cleaning_plan"
         self._attr_icon: str = "mdi:robot-vacuum"
         self._state: str = "Ready"
         self._attributes: Dict[str, Any] = {}
-        self._entities_to_watch: Optional[Set[str]] = None  # Cache will be built in async_added_to_hass
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-        # Build watch list from manager's entity cache (only once)
-        if self._entities_to_watch is None:
-            self._entities_to_watch = set()
-            self._entities_to_watch = self._manager.get_entity_watch_list()
-
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, list(self._entities_to_watch), self._on_state_change
-            )
-        )
+        await super().async_added_to_hass()
+        # The manager keeps the plan current and tells us when it changed
+        self.async_on_remove(self._manager.async_add_plan_listener(self._on_plan_change))
         self.async_schedule_update_ha_state(True)
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending coalesced update."""
+        if self._update_timer:
+            self._update_timer()
+            self._update_timer = None
+
     @callback
-    def _on_state_change(self, event: Event) -> None:
-        """Handle state changes."""
-        self.async_schedule_update_ha_state(True)
+    def _on_plan_change(self) -> None:
+        """Handle cleaning plan changes, coalescing bursts into one update."""
+        if self._update_delay <= 0:
+            self.hass.async_create_task(self._async_refresh())
+            return
+
+        if self._update_timer:
+            self._suppressed_updates += 1
+            return
+        self._update_timer = async_call_later(self.hass, self._update_delay, self._flush_update)
+
+    @callback
+    def _flush_update(self, _: Any) -> None:
+        self._update_timer = None
+        self.hass.async_create_task(self._async_refresh())
+
+    async def _async_refresh(self) -> None:
+        """Recompute the attributes and write them only if they changed."""
+        await self.async_update()
+        self.async_write_ha_state_if_changed()
 
     async def async_update(self) -> None:
         """Update the sensor state."""
@@ -73,14 +102,15 @@ class VeronikaPlanSensor(SensorEntity):
         
         total_cleaning: int = 0
         vacuums_data: Dict[str, Dict[str, Any]] = {}
+        summary: Dict[str, List[str]] = {}
         
         for vac, data in plan.items():
-            rooms = data['rooms']
-            cleaning_count = sum(1 for r in rooms if r['will_clean'])
+            cleaning_count = data['count']
             total_cleaning += cleaning_count
+            summary[vac] = [r['name'] for r in data['rooms'] if r['will_clean']]
             
             vacuums_data[vac] = {
-                "rooms": rooms,
+                "rooms": data['rooms'],
                 "count": cleaning_count,
                 "debug_command": data.get('debug_command')
             }
@@ -88,11 +118,16 @@ class VeronikaPlanSensor(SensorEntity):
         self._state = f"{total_cleaning} Rooms Scheduled"
         self._attributes = {
             "plan": vacuums_data,
+            "scheduled_rooms": summary,
             "total_cleaning": total_cleaning,
             "last_error": self._manager.last_error,
-            "error_count": self._manager.error_count
+            "error_count": self._manager.error_count,
         }
 
+    @property
+    def write_stats(self) -> Dict[str, Any]:
+        return {**super().write_stats, "suppressed_updates": self._suppressed_updates}
+
     @property
     def state(self) -> str:
         """Return the state of the sensor."""
@@ -102,3 +137,81 @@ class VeronikaPlanSensor(SensorEntity):
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return the state attributes."""
         return self._attributes
+
+
+def _minutes(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds / 60, 1) if seconds is not None else None
+
+
+class VeronikaEtaSensor(VeronikaEntity, SensorEntity):
+    """Estimated cleaning time of one vacuum, learned from past segment durations.
+
+    The state is the median estimate for the current plan; remaining_minutes
+    estimates what is left of the run in progress and updates on each
+    segment transition.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_icon = "mdi:timer-outline"
+    # Per-segment statistics are only useful live
+    _unrecorded_attributes = VeronikaEntity._unrecorded_attributes | frozenset({"veronika_vacuum", "segments"})
+
+    def __init__(self, hass: HomeAssistant, manager: Any, vacuum: str) -> None:
+        """Initialize the sensor."""
+        self.hass: HomeAssistant = hass
+        self._manager: Any = manager
+        self._vacuum: str = vacuum
+        object_id = vacuum.split(".", 1)[-1]
+        self._attr_name: str = f"Veronika {object_id.replace('_', ' ').title()} ETA"
+        self._attr_unique_id: str = f"veronika_eta_{slugify(object_id)}"
+        self._attr_native_value: Optional[float] = None
+        self._attributes: Dict[str, Any] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._manager.async_add_plan_listener(self._on_change))
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_VACUUM_PROGRESS, self._on_progress)
+        )
+
+    @callback
+    def _on_progress(self, vacuum: str) -> None:
+        if vacuum == self._vacuum:
+            self._on_change()
+
+    @callback
+    def _on_change(self) -> None:
+        self._refresh()
+        self.async_write_ha_state_if_changed()
+
+    async def async_update(self) -> None:
+        """Update the estimate."""
+        self._refresh()
+
+    @callback
+    def _refresh(self) -> None:
+        eta: Dict[str, Any] = self._manager.get_vacuum_eta(self._vacuum)
+        self._attr_native_value = _minutes(eta["plan"])
+        self._attributes = {
+            "veronika_vacuum": self._vacuum,
+            "plan_p90_minutes": _minutes(eta["plan_p90"]),
+            "remaining_minutes": _minutes(eta["remaining"]),
+            "current_segment": eta["current_segment"],
+            "unknown_segments": eta["unknown_segments"],
+            "segments": {
+                str(seg): {
+                    "median_minutes": _minutes(stats["median"]),
+                    "p90_minutes": _minutes(stats["p90"]),
+                    "samples": stats["samples"],
+                }
+                for seg, stats in eta["segments"].items()
+                if stats is not None
+            },
+        }
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes."""
+        return self._attributes
@@ -0,0 +1,156 @@
+"""Vacuum command strategies that build the segment cleaning service call."""
+import logging
+from typing import Any, Dict, List, Optional
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import (
+    CONF_HONORS_ORDER,
+    CONF_MANUFACTURER,
+    CONF_SEGMENTS_KEY,
+    CONF_SERVICE,
+    CONF_SERVICE_DATA,
+    CONF_STRATEGY_NAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandStrategy:
+    """Base strategy: start the vacuum without segment support."""
+
+    name: str = "generic"
+    # True if the vacuum cleans the segments in the order they are sent
+    honors_order: bool = False
+
+    def matches(self, manufacturer: str) -> bool:
+        """Return True if this strategy handles vacuums of the manufacturer."""
+        return True
+
+    def build_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
+        """Return the service call as {'service': 'domain.service', 'data': {...}}."""
+        return {
+            "service": "vacuum.start",
+            "data": {ATTR_ENTITY_ID: vacuum_entity}
+        }
+
+
+class RoborockStrategy(CommandStrategy):
+    """Roborock: app_segment_clean through vacuum.send_command."""
+
+    name = "roborock"
+    honors_order = True
+
+    def matches(self, manufacturer: str) -> bool:
+        return manufacturer == "Roborock"
+
+    def build_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
+        return {
+            "service": "vacuum.send_command",
+            "data": {
+                ATTR_ENTITY_ID: vacuum_entity,
+                "command": "app_segment_clean",
+                "params": [{"segments": segments, "repeat": 1}]
+            }
+        }
+
+
+class DreameStrategy(CommandStrategy):
+    """Dreame: the dreame_vacuum segment cleaning service."""
+
+    name = "dreame"
+
+    def matches(self, manufacturer: str) -> bool:
+        return "Dreame" in manufacturer
+
+    def build_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
+        return {
+            "service": "dreame_vacuum.vacuum_clean_segment",
+            "data": {
+                ATTR_ENTITY_ID: vacuum_entity,
+                "segments": segments
+            }
+        }
+
+
+class ConfiguredStrategy(CommandStrategy):
+    """Strategy defined in YAML: a service with fixed data plus the segment list."""
+
+    def __init__(
+        self,
+        name: str,
+        manufacturer: str,
+        service: str,
+        segments_key: str = "segments",
+        data: Optional[Dict[str, Any]] = None,
+        honors_order: bool = False,
+    ) -> None:
+        self.name = name
+        self.honors_order = honors_order
+        self.manufacturer = manufacturer
+        self.service = service
+        self.segments_key = segments_key
+        self.data: Dict[str, Any] = data or {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ConfiguredStrategy":
+        return cls(
+            config[CONF_STRATEGY_NAME],
+            config[CONF_MANUFACTURER],
+            config[CONF_SERVICE],
+            config.get(CONF_SEGMENTS_KEY, "segments"),
+            config.get(CONF_SERVICE_DATA),
+            config.get(CONF_HONORS_ORDER, False),
+        )
+
+    def matches(self, manufacturer: str) -> bool:
+        return self.manufacturer.lower() in manufacturer.lower()
+
+    def build_payload(self, vacuum_entity: str, segments: List[int]) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "data": {
+                **self.data,
+                ATTR_ENTITY_ID: vacuum_entity,
+                self.segments_key: segments
+            }
+        }
+
+
+class StrategyRegistry:
+    """Ordered strategy lookup: configured strategies first, then built-ins, then generic."""
+
+    def __init__(self, custom: Optional[List[CommandStrategy]] = None) -> None:
+        self._generic = CommandStrategy()
+        self.strategies: List[CommandStrategy] = [
+            *(custom or []),
+            RoborockStrategy(),
+            DreameStrategy(),
+        ]
+
+    @classmethod
+    def from_config(cls, strategies: List[Dict[str, Any]]) -> "StrategyRegistry":
+        return cls([ConfiguredStrategy.from_config(conf) for conf in strategies])
+
+    def get(self, manufacturer: str) -> CommandStrategy:
+        """Return the first strategy matching the manufacturer."""
+        for strategy in self.strategies:
+            if strategy.matches(manufacturer):
+                return strategy
+        return self._generic
+
+    def resolve(self, hass: HomeAssistant, vacuum_entity: str) -> CommandStrategy:
+        """Look up the vacuum's manufacturer in the registries and return its strategy."""
+        manufacturer: str = ""
+        entry: Optional[er.RegistryEntry] = er.async_get(hass).async_get(vacuum_entity)
+        if entry and entry.device_id:
+            device = dr.async_get(hass).async_get(entry.device_id)
+            if device and device.manufacturer:
+                manufacturer = device.manufacturer
+            else:
+                _LOGGER.warning(f"No device found for vacuum {vacuum_entity}")
+        else:
+            _LOGGER.warning(f"No registry entry found for vacuum {vacuum_entity}")
+        return self.get(manufacturer)
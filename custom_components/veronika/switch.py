@@ -2,15 +2,13 @@ import logging
 from typing import Any, Dict, List, Optional
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.util import slugify
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN, CONF_ROOMS, CONF_AREA, CONF_VACUUM, CONF_SEGMENTS
+from .const import DOMAIN, CONF_ROOMS, CONF_AREA
 from .utils import get_room_identity
+from .entity import VeronikaEntity
 from collections import Counter
-from homeassistant.helpers import area_registry as ar
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,7 +38,7 @@ async def async_setup_platform(
 
     async_add_entities(entities)
 
-class VeronikaSwitch(SwitchEntity, RestoreEntity):
+class VeronikaSwitch(VeronikaEntity, SwitchEntity, RestoreEntity):
     def __init__(self, room_name: str, room_slug: str, switch_type: str, icon: str) -> None:
         self._room_name: str = room_name
         self._room_slug: str = room_slug
@@ -56,11 +54,11 @@ class VeronikaSwitch(SwitchEntity, RestoreEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         self._is_on = True
-        self.async_write_ha_state()
+        self.async_write_ha_state_if_changed()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         self._is_on = False
-        self.async_write_ha_state()
+        self.async_write_ha_state_if_changed()
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
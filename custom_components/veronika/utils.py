@@ -1,120 +1,210 @@
 import logging
-from typing import Any, Dict, List, Optional, Set, Tuple
-from homeassistant.core import HomeAssistant
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from homeassistant.core import HomeAssistant, Event, callback
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.util import slugify
 from homeassistant.helpers import area_registry as ar, device_registry as dr, entity_registry as er
 from .const import CONF_AREA, CONF_VACUUM, CONF_SEGMENTS
 
 _LOGGER = logging.getLogger(__name__)
 
-def get_area_entities(hass: HomeAssistant, area_id: str) -> List[str]:
-    """Get all entity IDs in an area (direct and via devices)."""
-    ent_reg: er.EntityRegistry = er.async_get(hass)
-    dev_reg: dr.DeviceRegistry = dr.async_get(hass)
-    
-    entities: Set[str] = set()
-    # Entities directly in area
-    for entry in er.async_entries_for_area(ent_reg, area_id):
-        entities.add(entry.entity_id)
-    
-    # Entities in devices in area
-    for device in dr.async_entries_for_area(dev_reg, area_id):
-        for entry in er.async_entries_for_device(ent_reg, device.id):
-            if entry.area_id is None:
-                entities.add(entry.entity_id)
-    return list(entities)
-
-def get_entity_device_class(hass: HomeAssistant, entity_id: str) -> Optional[str]:
-    """Get device class for an entity, preferring state attributes over registry."""
-    try:
-        ent_reg: er.EntityRegistry = er.async_get(hass)
-        state = hass.states.get(entity_id)
-        entry: Optional[er.RegistryEntry] = ent_reg.async_get(entity_id)
-    except Exception as err:
-        _LOGGER.warning(f"Error accessing registry for {entity_id}: {err}")
-        return None
-    
-    # Prefer state attributes (allows runtime overrides)
-    if state:
-        try:
-            device_class = state.attributes.get("device_class")
-            if device_class:
-                return device_class
-        except (AttributeError, KeyError) as err:
-            _LOGGER.debug(f"Error getting device_class from state for {entity_id}: {err}")
-    
-    # Fallback to registry
-    if entry:
-        return entry.device_class or entry.original_device_class
-    
-    return None
+class AreaSensorIndex:
+    """Index of occupancy and door sensors per area.
 
-def discover_occupancy_sensors(hass: HomeAssistant, area_id: str, platform_filter: Optional[str] = None) -> List[str]:
-    """Discover occupancy sensors in an area.
-    
-    Args:
-        hass: HomeAssistant instance
-        area_id: Area ID to search
-        platform_filter: Platform to filter by (None to accept all)
-    
-    Returns:
-        List of entity IDs with occupancy device class
+    Built from a single pass over the entity registry so that every room
+    sensor can look up its sensors without re-scanning the registries.
+    Registry updates are applied per entity and report the areas they touched.
+    Structure: {area_id: {'occupancy': [entity_id], 'door': [entity_id]}}
+
+    The resolved area of every indexed sensor and of explicitly tracked
+    entities (the vacuums) is kept as well, so readiness checks never need
+    to touch the registries.
     """
-    try:
-        ent_reg: er.EntityRegistry = er.async_get(hass)
-        area_entities: List[str] = get_area_entities(hass, area_id)
-    except Exception as err:
-        _LOGGER.error(f"Failed to get area entities for {area_id}: {err}")
-        return []
-        
-    occupancy_sensors: List[str] = []
-    
-    for entity_id in area_entities:
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass: HomeAssistant = hass
+        self._areas: Dict[str, Dict[str, List[str]]] = {}
+        # entity_id -> (area_id, device_class, platform) for every indexed sensor
+        self._entries: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        # entity_id -> area_id for tracked non-sensor entities (vacuums)
+        self._tracked_areas: Dict[str, Optional[str]] = {}
+
+    def track_entities(self, entity_ids: Iterable[str]) -> None:
+        """Also resolve and keep the area of these entities on build and update."""
+        for entity_id in entity_ids:
+            self._tracked_areas.setdefault(entity_id, None)
+
+    def async_build(self) -> None:
+        """Scan the entity and device registries once and rebuild the index."""
+        self._areas = {}
+        self._entries = {}
+        for entity_id in self._tracked_areas:
+            self._tracked_areas[entity_id] = None
+
         try:
-            entry = ent_reg.async_get(entity_id)
-            
-            # Check platform filter
-            if platform_filter and (not entry or entry.platform != platform_filter):
+            ent_reg: er.EntityRegistry = er.async_get(self.hass)
+            dev_reg: dr.DeviceRegistry = dr.async_get(self.hass)
+        except Exception as err:
+            _LOGGER.error(f"Failed to access registries while building sensor index: {err}")
+            return
+
+        for entry in list(ent_reg.entities.values()):
+            try:
+                if entry.entity_id in self._tracked_areas:
+                    self._tracked_areas[entry.entity_id] = self._resolve_area(dev_reg, entry)
+                resolved = self._resolve_entry(dev_reg, entry)
+            except Exception as err:
+                _LOGGER.debug(f"Error indexing entity {entry.entity_id}: {err}")
                 continue
-            
-            # Check device class
-            device_class = get_entity_device_class(hass, entity_id)
-            if device_class == "occupancy":
-                occupancy_sensors.append(entity_id)
+            if resolved:
+                self._add(entry.entity_id, resolved)
+
+    def async_update_entity(self, entity_id: str, old_entity_id: Optional[str] = None) -> Set[str]:
+        """Re-index a single entity after a registry change.
+
+        Returns the set of area IDs whose sensor lists changed.
+        """
+        changed: Set[str] = set()
+        if old_entity_id and old_entity_id != entity_id:
+            changed |= self._remove(old_entity_id)
+
+        try:
+            ent_reg: er.EntityRegistry = er.async_get(self.hass)
+            dev_reg: dr.DeviceRegistry = dr.async_get(self.hass)
+            entry: Optional[er.RegistryEntry] = ent_reg.async_get(entity_id)
+            resolved = self._resolve_entry(dev_reg, entry) if entry else None
+            if entity_id in self._tracked_areas:
+                old_area = self._tracked_areas[entity_id]
+                new_area = self._resolve_area(dev_reg, entry) if entry else None
+                if new_area != old_area:
+                    self._tracked_areas[entity_id] = new_area
+                    changed |= {a for a in (old_area, new_area) if a is not None}
         except Exception as err:
-            _LOGGER.debug(f"Error processing entity {entity_id}: {err}")
-            continue
-    
-    return occupancy_sensors
+            _LOGGER.warning(f"Error re-indexing entity {entity_id}: {err}")
+            return changed
 
-def discover_door_sensors(hass: HomeAssistant, area_ids: List[str]) -> List[str]:
-    """Discover door sensors across multiple areas.
-    
-    Args:
-        hass: HomeAssistant instance
-        area_ids: List of area IDs to search
-    
-    Returns:
-        List of entity IDs with door device class
-    """
-    door_sensors: List[str] = []
-    
-    for area_id in area_ids:
+        if self._entries.get(entity_id) == resolved:
+            return changed
+
+        changed |= self._remove(entity_id)
+        if resolved:
+            self._add(entity_id, resolved)
+            changed.add(resolved[0])
+        return changed
+
+    def async_update_device(self, device_id: str) -> Set[str]:
+        """Re-index all entities of a device, e.g. after it moved to another area.
+
+        Returns the set of area IDs whose sensor lists changed.
+        """
+        changed: Set[str] = set()
         try:
-            area_entities: List[str] = get_area_entities(hass, area_id)
-            for entity_id in area_entities:
-                try:
-                    device_class = get_entity_device_class(hass, entity_id)
-                    if device_class == "door":
-                        door_sensors.append(entity_id)
-                except Exception as err:
-                    _LOGGER.debug(f"Error checking device class for {entity_id}: {err}")
-                    continue
+            ent_reg: er.EntityRegistry = er.async_get(self.hass)
+            entries = er.async_entries_for_device(ent_reg, device_id, include_disabled_entities=True)
         except Exception as err:
-            _LOGGER.warning(f"Error discovering door sensors in area {area_id}: {err}")
-            continue
-    
-    return door_sensors
+            _LOGGER.warning(f"Error looking up entities for device {device_id}: {err}")
+            return changed
+
+        for entry in entries:
+            changed |= self.async_update_entity(entry.entity_id)
+        return changed
+
+    @staticmethod
+    def _resolve_area(dev_reg: dr.DeviceRegistry, entry: er.RegistryEntry) -> Optional[str]:
+        """Return the entity area, falling back to the area of its device."""
+        if entry.area_id:
+            return entry.area_id
+        if entry.device_id:
+            device = dev_reg.async_get(entry.device_id)
+            if device:
+                return device.area_id
+        return None
+
+    def _resolve_entry(
+        self, dev_reg: dr.DeviceRegistry, entry: er.RegistryEntry
+    ) -> Optional[Tuple[str, str, Optional[str]]]:
+        """Return (area_id, device_class, platform) if the entry is a door or occupancy sensor."""
+        area_id: Optional[str] = self._resolve_area(dev_reg, entry)
+        if area_id is None:
+            return None
+
+        # The state attribute allows runtime overrides, then the registry
+        device_class: Optional[str] = None
+        state = self.hass.states.get(entry.entity_id)
+        if state:
+            device_class = state.attributes.get("device_class")
+        if not device_class:
+            device_class = entry.device_class or entry.original_device_class
+
+        if device_class not in ("occupancy", "door"):
+            return None
+        return area_id, device_class, entry.platform
+
+    def _add(self, entity_id: str, resolved: Tuple[str, str, Optional[str]]) -> None:
+        area_id, device_class, _ = resolved
+        area = self._areas.setdefault(area_id, {"occupancy": [], "door": []})
+        area[device_class].append(entity_id)
+        self._entries[entity_id] = resolved
+
+    def _remove(self, entity_id: str) -> Set[str]:
+        resolved = self._entries.pop(entity_id, None)
+        if resolved is None:
+            return set()
+        area_id, device_class, _ = resolved
+        sensors: List[str] = self._areas.get(area_id, {}).get(device_class, [])
+        if entity_id in sensors:
+            sensors.remove(entity_id)
+        return {area_id}
+
+    def get_occupancy_sensors(self, area_id: str, platform_filter: Optional[str] = None) -> List[str]:
+        """Return occupancy sensors in an area, optionally filtered by platform."""
+        sensors: List[str] = self._areas.get(area_id, {}).get("occupancy", [])
+        if platform_filter:
+            return [s for s in sensors if self._entries[s][2] == platform_filter]
+        return list(sensors)
+
+    def get_entity_area(self, entity_id: str) -> Optional[str]:
+        """Return the precomputed area of an indexed sensor or tracked entity."""
+        resolved = self._entries.get(entity_id)
+        if resolved is not None:
+            return resolved[0]
+        return self._tracked_areas.get(entity_id)
+
+    def get_door_sensors(self, area_ids: Iterable[str]) -> List[str]:
+        """Return door sensors across multiple areas."""
+        door_sensors: List[str] = []
+        for area_id in area_ids:
+            door_sensors.extend(self._areas.get(area_id, {}).get("door", []))
+        return door_sensors
+
+def async_track_state_attribute_change(
+    hass: HomeAssistant,
+    attributes: Dict[str, Iterable[str]],
+    action: Callable[[Event], None],
+    on_dropped: Optional[Callable[[Event], None]] = None,
+) -> Callable[[], None]:
+    """Track state changes of entities, but only run action when the state or a watched attribute changed.
+
+    attributes maps each entity_id to the attribute names worth reacting to. Events
+    where only other attributes changed (battery, fan speed, ...) are passed to
+    on_dropped instead.
+    """
+    watched: Dict[str, Tuple[str, ...]] = {entity_id: tuple(attrs) for entity_id, attrs in attributes.items()}
+
+    @callback
+    def _filter(event: Event) -> None:
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is not None and new_state is not None and old_state.state == new_state.state:
+            old_attrs = old_state.attributes
+            new_attrs = new_state.attributes
+            if all(old_attrs.get(attr) == new_attrs.get(attr) for attr in watched.get(event.data["entity_id"], ())):
+                if on_dropped is not None:
+                    on_dropped(event)
+                return
+        action(event)
+
+    return async_track_state_change_event(hass, list(watched), _filter)
 
 def get_room_identity(hass: HomeAssistant, room: Dict[str, Any], is_duplicate: bool) -> Tuple[str, str]:
     """
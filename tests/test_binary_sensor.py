@@ -0,0 +1,225 @@
+"""Tests for the Veronika room status binary sensor."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar, entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+    async_fire_time_changed,
+)
+
+from custom_components.veronika.binary_sensor import async_setup_platform
+from custom_components.veronika.const import (
+    CONF_AREA,
+    CONF_OCCUPANCY_COOLDOWN,
+    CONF_ROOMS,
+    CONF_SEGMENTS,
+    CONF_VACUUM,
+    DOMAIN,
+)
+from custom_components.veronika.manager import VeronikaManager
+
+STATUS = "binary_sensor.veronika_status_living_room"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _room_config(cooldown: int = 0) -> dict:
+    return {
+        CONF_ROOMS: [
+            {
+                CONF_AREA: "living_room",
+                CONF_VACUUM: "vacuum.robot",
+                CONF_SEGMENTS: [1],
+                CONF_OCCUPANCY_COOLDOWN: cooldown,
+            }
+        ]
+    }
+
+
+def _add_sensor(
+    entity_registry: er.EntityRegistry,
+    config_entry: MockConfigEntry,
+    object_id: str,
+    device_class: str,
+    area: ar.AreaEntry,
+) -> str:
+    entity_registry.async_get_or_create(
+        domain="binary_sensor",
+        platform="test",
+        unique_id=object_id,
+        config_entry=config_entry,
+        original_device_class=device_class,
+        suggested_object_id=object_id,
+    )
+    entity_id = f"binary_sensor.{object_id}"
+    entity_registry.async_update_entity(entity_id, area_id=area.id)
+    return entity_id
+
+
+async def _setup_platform(hass: HomeAssistant, config: dict) -> VeronikaManager:
+    """Set up the manager and the binary_sensor platform the way async_setup does."""
+    hass.data[DOMAIN] = config
+    manager = VeronikaManager(hass, config)
+    await manager.async_setup()
+    hass.data[f"{DOMAIN}_manager"] = manager
+
+    entities: list = []
+    await async_setup_platform(hass, {}, entities.extend, discovery_info={})
+    platform = MockEntityPlatform(hass, domain="binary_sensor", platform_name=DOMAIN)
+    await platform.async_add_entities(entities)
+    await hass.async_block_till_done()
+    return manager
+
+
+def _advance(hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: int) -> None:
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass, dt_util.utcnow())
+
+
+def _reason(hass: HomeAssistant) -> str:
+    return hass.states.get(STATUS).attributes["status_reason"]
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+async def test_restored_room_restarts_its_cooldown(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    freezer: FrozenDateTimeFactory,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """A room occupied at shutdown comes back in cooldown, counted from startup."""
+    living = area_registry.async_get_or_create("living_room")
+    entity_registry.async_update_entity("vacuum.robot", area_id=living.id)
+    occupancy = _add_sensor(entity_registry, mock_config_entry, "living_occ", "occupancy", living)
+    hass.states.async_set(occupancy, "off")
+    hass_storage["veronika.room_states"] = {
+        "version": 1,
+        "key": "veronika.room_states",
+        "data": {
+            "living_room": {
+                "last_occupancy": dt_util.utcnow().timestamp() - 3600,
+                "status": "Occupied",
+                "is_on": False,
+            },
+        },
+    }
+    writes: list = []
+    hass.bus.async_listen(
+        EVENT_STATE_CHANGED,
+        lambda event: writes.append(event.data["new_state"])
+        if event.data["entity_id"] == STATUS else None,
+    )
+
+    manager = await _setup_platform(hass, _room_config(cooldown=300))
+    started = dt_util.utcnow()
+
+    # The saved verdict is written once, without an intermediate Ready
+    assert [(state.state, state.attributes["status_reason"]) for state in writes] == [
+        ("off", "Occupied (Cooldown)")
+    ]
+    assert manager.restored_room_state("living_room") == {
+        "last_occupancy": started.timestamp(),
+        "status": "Occupied (Cooldown)",
+        "is_on": False,
+    }
+
+    _advance(hass, freezer, 250)
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Occupied (Cooldown)"
+
+    _advance(hass, freezer, 60)
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Ready"
+    assert manager.restored_room_state("living_room")["status"] == "Ready"
+
+    await manager.async_unload()
+
+
+async def test_cooldown_starts_when_occupancy_clears(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """The cooldown runs from the moment the room was left, not from when it was entered."""
+    living = area_registry.async_get_or_create("living_room")
+    entity_registry.async_update_entity("vacuum.robot", area_id=living.id)
+    occupancy = _add_sensor(entity_registry, mock_config_entry, "living_occ", "occupancy", living)
+    hass.states.async_set(occupancy, "off")
+    manager = await _setup_platform(hass, _room_config(cooldown=300))
+    assert _reason(hass) == "Ready"
+
+    hass.states.async_set(occupancy, "on")
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Occupied"
+
+    # Someone stays in the room for longer than the cooldown
+    _advance(hass, freezer, 400)
+    hass.states.async_set(occupancy, "off")
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Occupied (Cooldown)"
+    assert hass.states.get(STATUS).state == "off"
+
+    _advance(hass, freezer, 250)
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Occupied (Cooldown)"
+
+    _advance(hass, freezer, 60)
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Ready"
+    assert hass.states.get(STATUS).state == "on"
+
+    await manager.async_unload()
+
+
+async def test_doors_block_the_room_or_trap_the_vacuum(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """A closed door of the room closes it off; one of the vacuum's area traps the vacuum."""
+    living = area_registry.async_get_or_create("living_room")
+    hallway = area_registry.async_get_or_create("hallway")
+    entity_registry.async_update_entity("vacuum.robot", area_id=hallway.id)
+    living_door = _add_sensor(entity_registry, mock_config_entry, "living_door", "door", living)
+    hall_door = _add_sensor(entity_registry, mock_config_entry, "hall_door", "door", hallway)
+    hass.states.async_set(living_door, "on")
+    hass.states.async_set(hall_door, "on")
+    manager = await _setup_platform(hass, _room_config())
+    assert _reason(hass) == "Ready"
+
+    hass.states.async_set(living_door, "off")
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Door Closed"
+    assert hass.states.get(STATUS).state == "off"
+
+    hass.states.async_set(living_door, "on")
+    hass.states.async_set(hall_door, "off")
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Trapped"
+
+    hass.states.async_set(hall_door, "on")
+    await hass.async_block_till_done()
+    assert _reason(hass) == "Ready"
+    assert hass.states.get(STATUS).state == "on"
+
+    await manager.async_unload()
@@ -0,0 +1,51 @@
+"""Tests for the Veronika door/area connectivity graph."""
+from custom_components.veronika.connectivity import (
+    REASON_DOOR_CLOSED,
+    REASON_TRAPPED,
+    DoorGraph,
+)
+
+
+def _graph(closed: list[str]) -> DoorGraph:
+    graph = DoorGraph()
+    graph.rebuild(
+        {
+            "binary_sensor.kitchen_door": "kitchen",
+            "binary_sensor.bedroom_door": "bedroom",
+            "binary_sensor.bedroom_balcony_door": "bedroom",
+        },
+        closed,
+    )
+    return graph
+
+
+def test_reachability_matches_door_rules() -> None:
+    """Test that closed target doors and closed vacuum-room doors block the vacuum."""
+    graph = _graph(["binary_sensor.kitchen_door"])
+
+    assert graph.blocked_reason("hallway", "kitchen") == REASON_DOOR_CLOSED
+    assert graph.blocked_reason("hallway", "bedroom") is None
+    assert graph.blocked_reason("kitchen", "bedroom") == REASON_TRAPPED
+    assert graph.blocked_reason("kitchen", "kitchen") is None
+    # Unknown vacuum area is treated as the rest of the home
+    assert graph.blocked_reason(None, "kitchen") == REASON_DOOR_CLOSED
+    assert graph.blocked_reason(None, "living_room") is None
+
+
+def test_components_only_recomputed_on_flips() -> None:
+    """Test that only a change of an area's connectivity triggers a recompute."""
+    graph = _graph([])
+    assert graph.recomputes == 1
+
+    assert graph.update_door("binary_sensor.bedroom_door", True) == "bedroom"
+    assert graph.update_door("binary_sensor.bedroom_balcony_door", True) is None
+    assert graph.update_door("binary_sensor.bedroom_door", False) is None
+    assert graph.is_isolated("bedroom")
+    assert graph.update_door("binary_sensor.bedroom_balcony_door", False) == "bedroom"
+    assert not graph.is_isolated("bedroom")
+    assert graph.update_door("binary_sensor.unknown_door", True) is None
+    assert graph.has_door("binary_sensor.bedroom_door")
+    assert not graph.has_door("binary_sensor.unknown_door")
+
+    assert graph.recomputes == 3
+    assert graph.diagnostics == {"doors": 3, "closed_off_areas": [], "recomputes": 3}
@@ -0,0 +1,65 @@
+"""Tests for the Veronika shared cooldown scheduler."""
+import math
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.veronika.cooldowns import CooldownScheduler
+
+
+def _fire_in(hass: HomeAssistant, seconds: float) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+
+
+async def test_rooms_expiring_in_the_same_tick_fire_once(hass: HomeAssistant) -> None:
+    """Test that one timer serves all rooms and same-tick expiries are batched."""
+    batches: list[set[str]] = []
+    scheduler = CooldownScheduler(hass, batches.append)
+
+    # Two expiries within the same second
+    offset = math.ceil(hass.loop.time()) - hass.loop.time()
+    scheduler.schedule("kitchen", offset + 10.2)
+    scheduler.schedule("bedroom", offset + 10.7)
+    scheduler.schedule("office", 30)
+    assert scheduler.timers_armed == 1
+
+    _fire_in(hass, 12)
+    await hass.async_block_till_done()
+    assert batches == [{"kitchen", "bedroom"}]
+
+    _fire_in(hass, 32)
+    await hass.async_block_till_done()
+    assert batches == [{"kitchen", "bedroom"}, {"office"}]
+    assert scheduler.diagnostics == {"pending": 0, "timers_armed": 2, "batches": 2, "expired": 3}
+
+
+async def test_flapping_rooms_do_not_rearm_the_timer(hass: HomeAssistant) -> None:
+    """Test that cancelled and rescheduled rooms reuse the armed timer."""
+    batches: list[set[str]] = []
+    scheduler = CooldownScheduler(hass, batches.append)
+
+    scheduler.schedule("kitchen", 5)
+    for _ in range(10):
+        scheduler.cancel("kitchen")
+        scheduler.schedule("kitchen", 20)
+    scheduler.schedule("bedroom", 5)
+    scheduler.cancel("bedroom")
+    assert scheduler.timers_armed == 1
+
+    # The early timer finds only stale entries and re-arms for the live one
+    _fire_in(hass, 6)
+    await hass.async_block_till_done()
+    assert batches == []
+
+    _fire_in(hass, 22)
+    await hass.async_block_till_done()
+    assert batches == [{"kitchen"}]
+    assert scheduler.timers_armed == 2
+
+    scheduler.schedule("kitchen", 5)
+    scheduler.cancel_all()
+    _fire_in(hass, 30)
+    await hass.async_block_till_done()
+    assert batches == [{"kitchen"}]
@@ -0,0 +1,26 @@
+"""Tests for the Veronika segment duration history."""
+from custom_components.veronika.durations import SegmentDurationHistory
+
+
+def test_history_is_bounded_and_robust() -> None:
+    """Test that only recent samples are kept and outliers barely move the median."""
+    history = SegmentDurationHistory(max_samples=5)
+    for duration in (100, 900, 300, 200, 400, 500, 120):
+        history.add("vacuum.robot", 1, duration)
+
+    assert history.samples("vacuum.robot", 1) == [300, 200, 400, 500, 120]
+    assert history.median("vacuum.robot", 1) == 300
+    assert history.p90("vacuum.robot", 1) == 500
+    assert history.stats("vacuum.robot", 2) is None
+
+
+def test_history_round_trip() -> None:
+    """Test that a saved history restores with numeric segment IDs."""
+    history = SegmentDurationHistory()
+    history.add("vacuum.robot", 16, 240)
+    history.add("vacuum.robot", "kitchen", 300)
+
+    restored = SegmentDurationHistory.from_dict(history.as_dict())
+
+    assert restored.samples("vacuum.robot", 16) == [240]
+    assert restored.samples("vacuum.robot", "kitchen") == [300]
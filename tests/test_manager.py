@@ -1,8 +1,13 @@
 """Tests for the Veronika Vacuum Manager."""
 import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import (
     area_registry as ar,
     device_registry as dr,
@@ -10,9 +15,13 @@ from homeassistant.helpers import (
 )
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
+    async_fire_time_changed,
     async_mock_service,
 )
 
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
 from custom_components.veronika.const import (
     CONF_AREA,
     CONF_ROOMS,
@@ -20,7 +29,8 @@ from custom_components.veronika.const import (
     CONF_VACUUM,
     DOMAIN,
 )
-from custom_components.veronika.manager import VeronikaManager
+from custom_components.veronika.manager import RoomRecord, VacuumMonitor, VeronikaManager
+from custom_components.veronika.strategies import DreameStrategy, RoborockStrategy
 
 
 # ---------------------------------------------------------------------------
@@ -80,10 +90,12 @@ async def test_reset_all_toggles_success(
     calls = async_mock_service(hass, "switch", "turn_on")
 
     manager = await _create_manager(hass, single_room_config)
-    await manager.reset_all_toggles()
+    result = await manager.reset_all_toggles()
 
     assert len(calls) == 1
-    assert calls[0].data["entity_id"] == setup_switch_entities["clean"]
+    assert calls[0].data["entity_id"] == [setup_switch_entities["clean"]]
+    assert result["success"] is True
+    assert result["entities"] == {setup_switch_entities["clean"]: {"status": "ok"}}
 
 
 async def test_stop_cleaning(
@@ -97,10 +109,64 @@ async def test_stop_cleaning(
     calls = async_mock_service(hass, "vacuum", "return_to_base")
 
     manager = await _create_manager(hass, single_room_config, run_setup=False)
-    await manager.stop_cleaning()
+    result = await manager.stop_cleaning()
 
     assert len(calls) == 1
-    assert calls[0].data["entity_id"] == "vacuum.robot"
+    assert calls[0].data["entity_id"] == ["vacuum.robot"]
+    assert result["entities"] == {"vacuum.robot": {"status": "ok"}}
+
+
+async def test_stop_cleaning_batches_vacuums_and_reports_results(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that all cleaning vacuums are stopped in one call with per-entity results."""
+    for vac, state in (("vacuum.a", "cleaning"), ("vacuum.b", "cleaning"), ("vacuum.c", "docked")):
+        hass.states.async_set(vac, state)
+    calls = async_mock_service(hass, "vacuum", "return_to_base")
+
+    config = dict(single_room_config)
+    config["rooms"] = [
+        {"vacuum": vac, "area": "living_room", "segments": [1]}
+        for vac in ("vacuum.a", "vacuum.b", "vacuum.c", "vacuum.missing")
+    ]
+    manager = VeronikaManager(hass, config)
+    result = await manager.stop_cleaning()
+
+    assert len(calls) == 1
+    assert calls[0].data["entity_id"] == ["vacuum.a", "vacuum.b"]
+    assert result["success"] is True
+    assert result["succeeded"] == 2
+    assert result["entities"]["vacuum.c"] == {"status": "skipped", "reason": "not cleaning (docked)"}
+    assert result["entities"]["vacuum.missing"]["status"] == "skipped"
+
+
+async def test_stop_cleaning_reports_failed_vacuum(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that a vacuum failing the per-entity fallback is reported as failed."""
+    hass.states.async_set("vacuum.a", "cleaning")
+    hass.states.async_set("vacuum.b", "cleaning")
+
+    async def return_to_base(call):
+        if call.data["entity_id"] != "vacuum.a":
+            raise HomeAssistantError("offline")
+
+    hass.services.async_register("vacuum", "return_to_base", return_to_base)
+
+    config = dict(single_room_config)
+    config["rooms"] = [
+        {"vacuum": vac, "area": "living_room", "segments": [1]} for vac in ("vacuum.a", "vacuum.b")
+    ]
+    manager = VeronikaManager(hass, config)
+    with patch("custom_components.veronika.manager.asyncio.sleep", AsyncMock()):
+        result = await manager.stop_cleaning()
+
+    assert result["success"] is False
+    assert result["failed"] == ["vacuum.b"]
+    assert result["entities"]["vacuum.a"] == {"status": "ok"}
+    assert result["entities"]["vacuum.b"] == {"status": "failed", "error": "offline"}
 
 
 async def test_start_cleaning(
@@ -217,7 +283,7 @@ async def test_handle_segment_completion(
     await manager._handle_segment_completion("vacuum.robot", 1, 200)
 
     assert len(calls) == 1
-    assert calls[0].data["entity_id"] == "switch.veronika_clean_living_room"
+    assert calls[0].data["entity_id"] == ["switch.veronika_clean_living_room"]
 
 
 async def test_get_cleaning_plan_structure(
@@ -255,7 +321,7 @@ async def test_start_cleaning_concurrent_prevention(
     setup_vacuum_entity: er.RegistryEntry,
     setup_switch_entities: dict[str, str],
 ) -> None:
-    """Test that concurrent start_cleaning calls are serialized by the lock."""
+    """Test that identical concurrent start_cleaning calls send a single command."""
     _set_room_states(hass, setup_switch_entities)
 
     call_count = 0
@@ -274,7 +340,8 @@ async def test_start_cleaning_concurrent_prevention(
     task2 = asyncio.create_task(manager.start_cleaning())
     await asyncio.gather(task1, task2)
 
-    assert call_count == 2
+    assert call_count == 1
+    assert manager.diagnostics["commands"]["coalesced_requests"] == 1
 
 
 async def test_get_cleaning_plan_with_disabled_rooms(
@@ -314,24 +381,6 @@ async def test_public_accessors(
     assert manager.error_count == 3
 
 
-async def test_get_entity_watch_list(
-    hass: HomeAssistant,
-    area_registry: ar.AreaRegistry,
-    entity_registry: er.EntityRegistry,
-    single_room_config: dict,
-    setup_area: ar.AreaEntry,
-    setup_switch_entities: dict[str, str],
-) -> None:
-    """Test that get_entity_watch_list returns non-None entity IDs."""
-    manager = await _create_manager(hass, single_room_config)
-    watch_list = manager.get_entity_watch_list()
-
-    assert setup_switch_entities["clean"] in watch_list
-    assert setup_switch_entities["disable"] in watch_list
-    assert setup_switch_entities["sensor"] in watch_list
-    assert None not in watch_list
-
-
 async def test_unload_sets_flag(
     hass: HomeAssistant,
     single_room_config: dict,
@@ -360,3 +409,940 @@ async def test_handle_segment_completion_skips_when_unloading(
     await manager._handle_segment_completion("vacuum.robot", 1, 200)
 
     assert len(calls) == 0
+
+
+async def test_registry_update_reindexes_area(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    single_room_config: dict,
+    mock_config_entry: MockConfigEntry,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that a door added at runtime is indexed for its area."""
+    manager = await _create_manager(hass, single_room_config)
+
+    entity_registry.async_get_or_create(
+        domain="binary_sensor",
+        platform="test",
+        unique_id="new_door",
+        config_entry=mock_config_entry,
+        original_device_class="door",
+        suggested_object_id="new_door",
+    )
+    entity_registry.async_update_entity("binary_sensor.new_door", area_id=setup_area.id)
+    await hass.async_block_till_done()
+
+    assert manager.sensor_index.get_door_sensors([setup_area.id]) == ["binary_sensor.new_door"]
+
+
+class _FakeRoomSensor:
+    """Minimal room sensor double for the central state dispatcher."""
+
+    def __init__(self, slug: str, area: str, doors: list[str], occupancy: list[str]) -> None:
+        self.room_slug = slug
+        self.room_area = area
+        self.vacuum = "vacuum.robot"
+        self.door_sensors = doors
+        self.occupancy_sensors = occupancy
+        self.dependent_areas = {area}
+        self.evaluations = 0
+        self.sensors_changed = False
+
+    def async_evaluate(self) -> None:
+        self.evaluations += 1
+
+    def async_refresh_sensors(self) -> bool:
+        return self.sensors_changed
+
+
+async def test_dispatcher_only_evaluates_affected_rooms(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """Test that a door flip only re-evaluates rooms whose verdict it can change."""
+    living = area_registry.async_get_or_create("living_room")
+    kitchen = area_registry.async_get_or_create("kitchen")
+    hallway = area_registry.async_get_or_create("hallway")
+    entity_registry.async_update_entity("vacuum.robot", area_id=hallway.id)
+    for object_id, area in (("living_door", living), ("kitchen_door", kitchen)):
+        entity_registry.async_get_or_create(
+            domain="binary_sensor",
+            platform="test",
+            unique_id=object_id,
+            config_entry=mock_config_entry,
+            original_device_class="door",
+            suggested_object_id=object_id,
+        )
+        entity_registry.async_update_entity(f"binary_sensor.{object_id}", area_id=area.id)
+
+    config = {
+        CONF_ROOMS: [
+            {CONF_AREA: "living_room", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [1]},
+            {CONF_AREA: "kitchen", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [2]},
+        ]
+    }
+    manager = await _create_manager(hass, config)
+    doors = ["binary_sensor.living_door", "binary_sensor.kitchen_door"]
+    living_room = _FakeRoomSensor("living_room", living.id, doors, ["binary_sensor.living_occ"])
+    kitchen_room = _FakeRoomSensor("kitchen", kitchen.id, doors, [])
+    manager.register_room_sensor(living_room)
+    manager.register_room_sensor(kitchen_room)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("binary_sensor.living_door", "off")
+    hass.states.async_set("binary_sensor.living_occ", "on")
+    await hass.async_block_till_done()
+
+    assert living_room.evaluations == 2
+    assert kitchen_room.evaluations == 0
+    assert manager.dispatch_stats == {"events_dispatched": 2, "rooms_evaluated": 2}
+
+    manager.unregister_room_sensor("living_room")
+    await hass.async_block_till_done()
+    hass.states.async_set("binary_sensor.living_door", "on")
+    await hass.async_block_till_done()
+
+    assert living_room.evaluations == 2
+    assert manager.dispatch_stats["events_dispatched"] == 2
+
+
+async def test_sensor_index_changes_only_evaluate_changed_rooms(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """Test that an area change only re-evaluates rooms whose sensors or vacuum area changed."""
+    living = area_registry.async_get_or_create("living_room")
+    kitchen = area_registry.async_get_or_create("kitchen")
+    hallway = area_registry.async_get_or_create("hallway")
+    entity_registry.async_update_entity("vacuum.robot", area_id=hallway.id)
+    config = {
+        CONF_ROOMS: [
+            {CONF_AREA: "living_room", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [1]},
+            {CONF_AREA: "kitchen", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [2]},
+        ]
+    }
+    manager = await _create_manager(hass, config)
+    living_room = _FakeRoomSensor("living_room", living.id, [], [])
+    kitchen_room = _FakeRoomSensor("kitchen", kitchen.id, [], [])
+    manager.register_room_sensor(living_room)
+    manager.register_room_sensor(kitchen_room)
+    await hass.async_block_till_done()
+
+    # Nothing the rooms watch changed
+    manager._async_sensor_index_changed({living.id, kitchen.id})
+    assert (living_room.evaluations, kitchen_room.evaluations) == (0, 0)
+
+    living_room.sensors_changed = True
+    manager._async_sensor_index_changed({living.id, kitchen.id})
+    assert (living_room.evaluations, kitchen_room.evaluations) == (1, 0)
+
+    # Moving the vacuum changes where every room it serves is reached from
+    living_room.sensors_changed = False
+    entity_registry.async_update_entity("vacuum.robot", area_id=kitchen.id)
+    await hass.async_block_till_done()
+    assert (living_room.evaluations, kitchen_room.evaluations) == (2, 1)
+
+
+async def test_door_flips_evaluate_rooms_of_the_area(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """Test that rooms are only re-evaluated when a door changes an area's connectivity."""
+    living = area_registry.async_get_or_create("living_room")
+    kitchen = area_registry.async_get_or_create("kitchen")
+    hallway = area_registry.async_get_or_create("hallway")
+    entity_registry.async_update_entity("vacuum.robot", area_id=hallway.id)
+    for object_id, area in (("hall_door", hallway), ("hall_door_2", hallway), ("kitchen_door", kitchen)):
+        entity_registry.async_get_or_create(
+            domain="binary_sensor",
+            platform="test",
+            unique_id=object_id,
+            config_entry=mock_config_entry,
+            original_device_class="door",
+            suggested_object_id=object_id,
+        )
+        entity_registry.async_update_entity(f"binary_sensor.{object_id}", area_id=area.id)
+
+    config = {
+        CONF_ROOMS: [
+            {CONF_AREA: "living_room", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [1]},
+            {CONF_AREA: "kitchen", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [2]},
+        ]
+    }
+    manager = await _create_manager(hass, config)
+    living_room = _FakeRoomSensor("living_room", living.id, ["binary_sensor.kitchen_door"], [])
+    kitchen_room = _FakeRoomSensor("kitchen", kitchen.id, ["binary_sensor.kitchen_door"], [])
+    manager.register_room_sensor(living_room)
+    manager.register_room_sensor(kitchen_room)
+    await hass.async_block_till_done()
+
+    # Doors of the vacuum's area are tracked even though it is not a configured room
+    assert set(manager.door_graph.doors) == {
+        "binary_sensor.hall_door", "binary_sensor.hall_door_2", "binary_sensor.kitchen_door"
+    }
+    recomputes = manager.door_graph.recomputes
+
+    # Closing the vacuum in affects every room it serves
+    hass.states.async_set("binary_sensor.hall_door", "off")
+    await hass.async_block_till_done()
+    assert (living_room.evaluations, kitchen_room.evaluations) == (1, 1)
+    assert manager.door_graph.blocked_reason(hallway.id, living.id) == "Trapped"
+
+    # A second closed door of the same area changes nothing
+    hass.states.async_set("binary_sensor.hall_door_2", "off")
+    hass.states.async_set("binary_sensor.hall_door", "on")
+    await hass.async_block_till_done()
+    assert (living_room.evaluations, kitchen_room.evaluations) == (1, 1)
+
+    hass.states.async_set("binary_sensor.kitchen_door", "off")
+    await hass.async_block_till_done()
+    assert (living_room.evaluations, kitchen_room.evaluations) == (1, 2)
+    assert manager.door_graph.recomputes == recomputes + 2
+    assert manager.diagnostics["doors"]["closed_off_areas"] == sorted([hallway.id, kitchen.id])
+
+
+async def test_occupancy_counters_only_evaluate_on_room_flips(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    mock_config_entry: MockConfigEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """Test that occupancy is counted by delta and rooms are evaluated when it crosses zero."""
+    living = area_registry.async_get_or_create("living_room")
+    config = {CONF_ROOMS: [{CONF_AREA: "living_room", CONF_VACUUM: "vacuum.robot", CONF_SEGMENTS: [1]}]}
+    sensors = [f"binary_sensor.presence_{i}" for i in range(8)]
+    hass.states.async_set(sensors[0], "on")
+    manager = await _create_manager(hass, config)
+    room = _FakeRoomSensor("living_room", living.id, [], sensors)
+    manager.register_room_sensor(room)
+    await hass.async_block_till_done()
+    assert manager.active_occupancy_count("living_room") == 1
+
+    for entity_id in sensors[1:]:
+        hass.states.async_set(entity_id, "on")
+    hass.states.async_set(sensors[0], "on", {"distance": 2})
+    await hass.async_block_till_done()
+    assert manager.active_occupancy_count("living_room") == 8
+    assert room.evaluations == 0
+
+    for entity_id in sensors[:-1]:
+        hass.states.async_set(entity_id, "off")
+    await hass.async_block_till_done()
+    assert room.evaluations == 0
+
+    hass.states.async_set(sensors[-1], "unavailable")
+    await hass.async_block_till_done()
+    assert manager.active_occupancy_count("living_room") == 0
+    assert room.evaluations == 1
+
+
+async def test_cooldown_expiries_evaluate_rooms_in_one_batch(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that rooms whose cooldown ends together are evaluated by one timer."""
+    manager = await _create_manager(hass, single_room_config)
+    kitchen = _FakeRoomSensor("kitchen", "kitchen", [], [])
+    bedroom = _FakeRoomSensor("bedroom", "bedroom", [], [])
+    manager.register_room_sensor(kitchen)
+    manager.register_room_sensor(bedroom)
+    await hass.async_block_till_done()
+
+    manager.schedule_cooldown("kitchen", 60)
+    manager.schedule_cooldown("bedroom", 60)
+    manager.cancel_cooldown("bedroom")
+    manager.schedule_cooldown("bedroom", 60)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+
+    assert (kitchen.evaluations, bedroom.evaluations) == (1, 1)
+    assert manager.diagnostics["cooldowns"]["timers_armed"] == 1
+    assert manager.diagnostics["cooldowns"]["batches"] == 1
+
+
+async def test_cleaning_plan_updates_incrementally(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that the materialized plan follows switch changes and notifies listeners."""
+    _set_room_states(hass, setup_switch_entities, clean_on=False)
+
+    manager = await _create_manager(hass, single_room_config)
+    await hass.async_block_till_done()
+    notifications: list[None] = []
+    manager.async_add_plan_listener(lambda: notifications.append(None))
+
+    plan = await manager.get_cleaning_plan()
+    assert plan["vacuum.robot"]["segments"] == []
+    assert plan["vacuum.robot"]["count"] == 0
+
+    hass.states.async_set(setup_switch_entities["clean"], "on")
+    await hass.async_block_till_done()
+
+    plan = await manager.get_cleaning_plan()
+    assert plan["vacuum.robot"]["segments"] == [1]
+    assert plan["vacuum.robot"]["count"] == 1
+    assert plan["vacuum.robot"]["rooms"][0]["will_clean"] is True
+    assert len(notifications) == 1
+
+    # Unrelated attribute churn on the same entity does not touch the plan
+    hass.states.async_set(setup_switch_entities["clean"], "on", {"friendly_name": "Clean"})
+    await hass.async_block_till_done()
+    assert len(notifications) == 1
+    assert await manager.get_cleaning_plan() is plan
+
+
+async def test_handle_segment_completion_batches_switches(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that all switches of a segment are reset with one service call."""
+    calls = async_mock_service(hass, "switch", "turn_off")
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager._vacuum_segment_map = {
+        "vacuum.robot": {1: ["switch.veronika_clean_a", "switch.veronika_clean_b"]}
+    }
+
+    await manager._handle_segment_completion("vacuum.robot", 1, 200)
+
+    assert len(calls) == 1
+    assert calls[0].data["entity_id"] == ["switch.veronika_clean_a", "switch.veronika_clean_b"]
+
+
+async def test_handle_segment_completion_falls_back_per_switch(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that a failed batch is retried per switch and only real failures remain."""
+    reset: list[str] = []
+
+    async def turn_off(call):
+        entity_ids = call.data["entity_id"]
+        if isinstance(entity_ids, list) or entity_ids == "switch.veronika_clean_b":
+            raise HomeAssistantError("unavailable")
+        reset.append(entity_ids)
+
+    hass.services.async_register("switch", "turn_off", turn_off)
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager._vacuum_segment_map = {
+        "vacuum.robot": {1: ["switch.veronika_clean_a", "switch.veronika_clean_b"]}
+    }
+    plan_updates: list[None] = []
+    manager.async_add_plan_listener(lambda: plan_updates.append(None))
+
+    with patch("custom_components.veronika.manager.asyncio.sleep", AsyncMock()):
+        failed = await manager._turn_off_switches(["switch.veronika_clean_a", "switch.veronika_clean_b"])
+
+    assert reset == ["switch.veronika_clean_a"]
+    assert failed == ["switch.veronika_clean_b"]
+    assert manager.error_count == 1
+    # The plan sensor shows errors, so it has to hear about them
+    assert len(plan_updates) == 1
+
+
+async def test_start_cleaning_dispatches_vacuums_concurrently(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that vacuums are commanded concurrently and failures are aggregated."""
+    hass.states.async_set("vacuum.upstairs", "docked")
+    hass.states.async_set("vacuum.downstairs", "docked")
+    plan = {
+        "vacuum.upstairs": {"rooms": [], "segments": [1]},
+        "vacuum.downstairs": {"rooms": [], "segments": [2]},
+    }
+    started: list[str] = []
+    both_started = asyncio.Event()
+
+    async def send_command(vac: str, segments: list[int]) -> None:
+        started.append(vac)
+        if len(started) == 2:
+            both_started.set()
+        # Each command waits for the other one, which deadlocks if run sequentially
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        if vac == "vacuum.upstairs":
+            raise HomeAssistantError("offline")
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager.get_cleaning_plan = AsyncMock(return_value=plan)
+    manager._send_vacuum_command = send_command
+    manager._notify_error = AsyncMock()
+
+    await manager.start_cleaning()
+
+    assert sorted(started) == ["vacuum.downstairs", "vacuum.upstairs"]
+    manager._notify_error.assert_awaited_once()
+    message = manager._notify_error.await_args.args[1]
+    assert "vacuum.upstairs: offline" in message
+    assert "vacuum.downstairs" not in message
+
+
+async def test_queued_commands_merge_into_union(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that requests arriving during an in-flight command are merged into one follow-up."""
+    sent: list[tuple[str, list[int]]] = []
+    release = asyncio.Event()
+
+    async def send_command(vac: str, segments: list[int]) -> None:
+        sent.append((vac, segments))
+        if len(sent) == 1:
+            await release.wait()
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager._send_vacuum_command = send_command
+
+    first = asyncio.create_task(manager._queue_vacuum_command("vacuum.robot", [1]))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert sent == [("vacuum.robot", [1])]
+
+    # Another vacuum is not blocked by the busy one
+    await manager._queue_vacuum_command("vacuum.other", [5])
+
+    second = asyncio.create_task(manager._queue_vacuum_command("vacuum.robot", [2]))
+    third = asyncio.create_task(manager._queue_vacuum_command("vacuum.robot", [3]))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, second, third)
+
+    assert sent == [
+        ("vacuum.robot", [1]),
+        ("vacuum.other", [5]),
+        ("vacuum.robot", [1, 2, 3]),
+    ]
+
+
+async def test_cancelled_command_queue_fails_waiting_requests(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that requests waiting on a cancelled queue worker fail instead of hanging."""
+    hang = asyncio.Event()
+
+    async def send_command(vac: str, segments: list[int]) -> None:
+        await hang.wait()
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager._send_vacuum_command = send_command
+
+    first = asyncio.create_task(manager._queue_vacuum_command("vacuum.robot", [1]))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    second = asyncio.create_task(manager._queue_vacuum_command("vacuum.robot", [2]))
+    await asyncio.sleep(0)
+
+    queue = manager._command_queues["vacuum.robot"]
+    assert queue.active_future is not None and queue.pending_future is not None
+    queue.worker.cancel()
+    results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), 1)
+
+    assert all(isinstance(result, HomeAssistantError) for result in results)
+    assert queue.worker is None
+    assert queue.pending_future is None
+
+
+async def test_offline_vacuum_trips_circuit_breaker(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that repeated failures open the breaker and later commands fail fast."""
+    hass.states.async_set("vacuum.robot", "docked")
+    attempts: list[str] = []
+
+    async def start(call):
+        attempts.append(call.data["entity_id"])
+        raise HomeAssistantError("offline")
+
+    hass.services.async_register("vacuum", "start", start)
+
+    manager = VeronikaManager(hass, single_room_config)
+    manager._get_vacuum_command_payload = AsyncMock(
+        return_value={"service": "vacuum.start", "data": {"entity_id": "vacuum.robot"}}
+    )
+
+    with patch("custom_components.veronika.retry.asyncio.sleep", AsyncMock()):
+        for _ in range(3):
+            with pytest.raises(HomeAssistantError):
+                await manager._send_vacuum_command("vacuum.robot", [1])
+
+    # Default threshold is five failed attempts: 3 + 2, then fail fast
+    assert len(attempts) == 5
+    retry = manager.diagnostics["retry"]
+    assert retry["breakers"]["vacuum.robot"]["state"] == "open"
+    assert retry["short_circuits"] == 1
+
+
+async def test_stop_cleaning_times_out_hung_service(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that a hanging service call is bounded by the stop timeout and counted."""
+    hass.states.async_set("vacuum.robot", "cleaning")
+    never = asyncio.Event()
+
+    async def return_to_base(call):
+        await never.wait()
+
+    hass.services.async_register("vacuum", "return_to_base", return_to_base)
+
+    manager = VeronikaManager(hass, {**single_room_config, "stop_timeout": 0.01})
+    with patch("custom_components.veronika.retry.asyncio.sleep", AsyncMock()):
+        result = await manager.stop_cleaning()
+
+    assert result["failed"] == ["vacuum.robot"]
+    # One batched call plus three per-entity attempts, all timed out
+    assert manager.diagnostics["timeouts"] == {"start": 0, "stop": 4, "switch_reset": 0}
+    assert manager.diagnostics["retry"]["retries"] == 2
+
+
+async def test_register_entity_uses_slug_index(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+) -> None:
+    """Test that entities are attached to slotted room records through the slug index."""
+    manager = await _create_manager(hass, single_room_config)
+
+    record = next(iter(manager._room_records.values()))
+    assert isinstance(record, RoomRecord)
+    assert manager._records_by_slug[record.slug] is record
+    assert not hasattr(record, "__dict__")
+
+    manager.register_entity("switch_clean", record.slug, "switch.custom_clean")
+    manager.register_entity("binary_sensor", record.slug, "binary_sensor.custom_status")
+    manager.register_entity("switch_clean", "unknown_slug", "switch.other")
+
+    assert record.switch == "switch.custom_clean"
+    assert record.sensor == "binary_sensor.custom_status"
+    assert manager._vacuum_segment_map["vacuum.robot"][1] == ["switch.custom_clean"]
+    assert manager._plan_entities["binary_sensor.custom_status"] == record.key
+
+
+async def test_vacuum_monitor_tracks_segments(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that segment changes are tracked on a slotted vacuum monitor."""
+    manager = VeronikaManager(hass, single_room_config)
+    manager._handle_segment_completion = AsyncMock()
+    manager._unsubscribers.append(
+        async_track_state_change_event(hass, ["vacuum.robot"], manager._on_vacuum_state_change)
+    )
+
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 1})
+    await hass.async_block_till_done()
+    monitor = manager._vacuum_monitors["vacuum.robot"]
+    assert isinstance(monitor, VacuumMonitor)
+    assert monitor.current_segment == 1
+
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 2})
+    await hass.async_block_till_done()
+    assert monitor.current_segment == 2
+    assert manager._handle_segment_completion.await_args.args[:2] == ("vacuum.robot", 1)
+
+    await manager.async_unload()
+
+
+async def test_command_strategy_cached_and_refreshed_on_device_update(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    device_registry: dr.DeviceRegistry,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_vacuum_device: dr.DeviceEntry,
+    setup_vacuum_entity: er.RegistryEntry,
+) -> None:
+    """Test that payloads use the cached strategy and manufacturer changes re-resolve it."""
+    manager = await _create_manager(hass, single_room_config)
+    assert manager.diagnostics["strategies"] == {"vacuum.robot": "generic"}
+
+    with patch(
+        "custom_components.veronika.strategies.er.async_get", side_effect=AssertionError("registry access")
+    ):
+        payload = await manager._get_vacuum_command_payload("vacuum.robot", [1])
+    assert payload["service"] == "vacuum.start"
+
+    device_registry.async_update_device(setup_vacuum_device.id, manufacturer="Roborock")
+    await hass.async_block_till_done()
+
+    payload = await manager._get_vacuum_command_payload("vacuum.robot", [1])
+    assert payload["service"] == "vacuum.send_command"
+    assert manager.diagnostics["strategies"] == {"vacuum.robot": "roborock"}
+
+    await manager.async_unload()
+
+
+async def test_vacuum_telemetry_events_are_filtered(
+    hass: HomeAssistant,
+    area_registry: ar.AreaRegistry,
+    entity_registry: er.EntityRegistry,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that only state or segment changes reach the vacuum handler."""
+    hass.states.async_set("vacuum.robot", "docked", {"battery_level": 100})
+    manager = await _create_manager(hass, single_room_config)
+
+    hass.states.async_set("vacuum.robot", "cleaning", {"battery_level": 100, "current_segment": 1})
+    for battery in (99, 98, 97):
+        hass.states.async_set("vacuum.robot", "cleaning", {"battery_level": battery, "current_segment": 1})
+    hass.states.async_set("vacuum.robot", "cleaning", {"battery_level": 97, "current_segment": 2})
+    await hass.async_block_till_done()
+
+    assert manager.diagnostics["vacuum_events"] == {"handled": 2, "dropped": 3}
+    assert manager._vacuum_monitors["vacuum.robot"].current_segment == 2
+
+    await manager.async_unload()
+
+
+async def test_segment_durations_drive_eta_and_are_persisted(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    single_room_config: dict,
+) -> None:
+    """Test that completed segments feed the ETA and are saved to storage."""
+    hass_storage["veronika.segment_durations"] = {
+        "version": 1,
+        "key": "veronika.segment_durations",
+        "data": {"vacuum.robot": {"1": [600, 660, 540], "2": [300]}},
+    }
+    manager = VeronikaManager(hass, single_room_config)
+    await manager.async_setup()
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [1, 2, 3], "count": 1}}
+
+    eta = manager.get_vacuum_eta("vacuum.robot")
+    assert eta["plan"] == 900
+    assert eta["plan_p90"] == 960
+    assert eta["unknown_segments"] == [3]
+    assert eta["remaining"] is None
+
+    # A run of segments 1 and 2 with segment 1 in progress for 100 s
+    monitor = manager._get_monitor("vacuum.robot")
+    monitor.run_segments = [1, 2]
+    monitor.current_segment = 1
+    monitor.start_time = dt_util.now().timestamp() - 100
+    assert manager.get_vacuum_eta("vacuum.robot")["remaining"] == pytest.approx(800, abs=2)
+
+    manager._vacuum_segment_map = {"vacuum.robot": {}}
+    await manager._handle_segment_completion("vacuum.robot", 2, 420)
+    assert manager._durations.samples("vacuum.robot", 2) == [300, 420]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+    await hass.async_block_till_done()
+    stored = hass_storage["veronika.segment_durations"]["data"]
+    assert stored["durations"]["vacuum.robot"]["2"] == [300, 420]
+    assert "2" in stored["last_cleaned"]["vacuum.robot"]
+
+    await manager.async_unload()
+
+
+async def test_clean_all_with_time_budget_defers_rooms(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that a time budget keeps the most valuable rooms and reports the rest."""
+    hass.states.async_set("vacuum.robot", "docked")
+    config = dict(single_room_config)
+    config["debug"] = True
+    config["rooms"] = [
+        {"vacuum": "vacuum.robot", "area": "kitchen", "segments": [1], "priority": 10},
+        {"vacuum": "vacuum.robot", "area": "hall", "segments": [2]},
+        {"vacuum": "vacuum.robot", "area": "garage", "segments": [3]},
+        {"vacuum": "vacuum.robot", "area": "living_room", "segments": [4]},
+    ]
+    manager = VeronikaManager(hass, config)
+    now = dt_util.now().timestamp()
+    manager._durations.add("vacuum.robot", 1, 20 * 60, now - 86400)
+    manager._durations.add("vacuum.robot", 2, 20 * 60, now - 86400)
+    manager._durations.add("vacuum.robot", 3, 90 * 60, now - 86400)
+    for room in config["rooms"]:
+        key = (room["area"], "vacuum.robot", tuple(room["segments"]))
+        manager._room_records[key] = RoomRecord(
+            key, room["area"], room["area"].title(), room["area"], "vacuum.robot",
+            room["segments"], priority=room.get("priority", 1),
+        )
+        manager._vacuum_rooms.setdefault("vacuum.robot", []).append(key)
+        manager._plan_rooms[key] = {"will_clean": True}
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [1, 2, 3, 4], "count": 4}}
+    sent: dict[str, list[int]] = {}
+
+    async def send_command(vac: str, segments: list[int]) -> None:
+        sent[vac] = segments
+
+    manager._send_vacuum_command = send_command
+    manager._get_vacuum_command_payload = AsyncMock(return_value={})
+
+    result = await manager.start_cleaning(max_duration=45.9)
+
+    # Living room was never cleaned (most stale) and is estimated at the average of
+    # 20, 20 and 90 min, but the high priority kitchen plus the hall are worth more
+    assert sent == {"vacuum.robot": [1, 2]}
+    assert result["started"] == {"vacuum.robot": [1, 2]}
+    deferred = {entry["room"]: entry["reason"] for entry in result["deferred"]["vacuum.robot"]}
+    assert set(deferred) == {"Garage", "Living_Room"}
+    assert "more than the 45 min budget" in deferred["Garage"]
+    # The debug command describes what was actually sent
+    manager._get_vacuum_command_payload.assert_awaited_with("vacuum.robot", [1, 2])
+
+
+async def test_time_budget_without_history_uses_default_duration(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Test that a vacuum without learned durations still cleans what fits the budget."""
+    hass.states.async_set("vacuum.robot", "docked")
+    config = dict(single_room_config)
+    config["default_segment_duration"] = 15 * 60
+    config["rooms"] = [
+        {"vacuum": "vacuum.robot", "area": area, "segments": [segment]}
+        for segment, area in enumerate(("kitchen", "hall", "garage", "living_room"), start=1)
+    ]
+    manager = VeronikaManager(hass, config)
+    for room in config["rooms"]:
+        key = (room["area"], "vacuum.robot", tuple(room["segments"]))
+        manager._room_records[key] = RoomRecord(
+            key, room["area"], room["area"].title(), room["area"], "vacuum.robot", room["segments"],
+        )
+        manager._vacuum_rooms.setdefault("vacuum.robot", []).append(key)
+        manager._plan_rooms[key] = {"will_clean": True}
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [1, 2, 3, 4], "count": 4}}
+    manager._send_vacuum_command = AsyncMock()
+
+    result = await manager.start_cleaning(max_duration=45)
+
+    assert len(result["started"]["vacuum.robot"]) == 3
+    assert len(result["deferred"]["vacuum.robot"]) == 1
+
+
+async def test_segment_order_learned_from_transitions(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    single_room_config: dict,
+) -> None:
+    """Test that observed segment moves order the command for order-honoring vacuums."""
+    manager = VeronikaManager(hass, single_room_config)
+    manager._handle_segment_completion = AsyncMock()
+    manager._unsubscribers.append(
+        async_track_state_change_event(hass, ["vacuum.robot"], manager._on_vacuum_state_change)
+    )
+
+    # The robot moves 1 -> 3 directly, then travels 40 s without segment to 2
+    for segment in (1, 3, None):
+        hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": segment})
+        await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=40))
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 2})
+    await hass.async_block_till_done()
+    hass.states.async_set("vacuum.robot", "docked")
+    await hass.async_block_till_done()
+
+    assert manager._transitions.cost("vacuum.robot", 1, 3) == 0
+    assert manager._transitions.cost("vacuum.robot", 3, 2) == pytest.approx(40, abs=1)
+    assert manager._transitions.cost("vacuum.robot", 1, 2) is None
+
+    manager._vacuum_strategies["vacuum.robot"] = RoborockStrategy()
+    payload = await manager._get_vacuum_command_payload("vacuum.robot", [1, 2, 3])
+    assert payload["data"]["params"][0]["segments"] in ([1, 3, 2], [2, 3, 1])
+
+    # Integrations that ignore the order get the segments unchanged
+    manager._vacuum_strategies["vacuum.robot"] = DreameStrategy()
+    payload = await manager._get_vacuum_command_payload("vacuum.robot", [1, 2, 3])
+    assert payload["data"]["segments"] == [1, 2, 3]
+
+    await manager.async_unload()
+
+
+async def test_room_states_are_restored_and_saved_debounced(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    single_room_config: dict,
+) -> None:
+    """Test that room verdicts survive a restart and are saved once per quiet period."""
+    last_occupancy = dt_util.utcnow().timestamp() - 60
+    hass_storage["veronika.room_states"] = {
+        "version": 1,
+        "key": "veronika.room_states",
+        "data": {
+            "living_room": {"last_occupancy": last_occupancy, "status": "Occupied (Cooldown)", "is_on": False},
+            "removed_room": {"last_occupancy": None, "status": "Ready", "is_on": True},
+        },
+    }
+    manager = await _create_manager(hass, single_room_config)
+
+    assert manager.restored_room_state("living_room") == {
+        "last_occupancy": last_occupancy, "status": "Occupied (Cooldown)", "is_on": False
+    }
+    assert manager.restored_room_state("removed_room") is None
+
+    now = dt_util.now()
+    manager.update_room_state("living_room", now, "Occupied (Cooldown)", False)
+    pending = manager._room_state_store._delay_handle
+    # Unchanged states do not touch the pending save
+    manager.update_room_state("living_room", now, "Occupied (Cooldown)", False)
+    assert manager._room_state_store._delay_handle is pending
+    assert hass_storage["veronika.room_states"]["data"]["living_room"]["status"] == "Occupied (Cooldown)"
+    assert "removed_room" in hass_storage["veronika.room_states"]["data"]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    stored = hass_storage["veronika.room_states"]["data"]
+    assert stored == {
+        "living_room": {"last_occupancy": now.timestamp(), "status": "Occupied (Cooldown)", "is_on": False}
+    }
+
+    await manager.async_unload()
+
+
+def _store_monitor(hass_storage: dict, **monitor) -> None:
+    hass_storage["veronika.vacuum_monitors"] = {
+        "version": 1,
+        "key": "veronika.vacuum_monitors",
+        "data": {"vacuum.robot": monitor},
+    }
+
+
+async def test_vacuum_monitor_is_checkpointed(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that the segment in progress is saved shortly after it starts."""
+    hass.states.async_set("vacuum.robot", "docked")
+    manager = await _create_manager(hass, single_room_config)
+
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 1})
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+
+    stored = hass_storage["veronika.vacuum_monitors"]["data"]["vacuum.robot"]
+    assert stored["current_segment"] == 1
+    assert stored["start_time"] == manager._vacuum_monitors["vacuum.robot"].start_time
+
+    await manager.async_unload()
+
+
+async def test_vacuum_monitor_resumes_segment_in_progress(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that a segment still being cleaned after a restart completes with its full duration."""
+    started = dt_util.now().timestamp() - 400
+    _store_monitor(hass_storage, current_segment=1, start_time=started, run_segments=[1, 2], completed_segments=[])
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 1})
+
+    with patch.object(VeronikaManager, "_handle_segment_completion", AsyncMock()) as completion:
+        manager = await _create_manager(hass, single_room_config)
+        monitor = manager._vacuum_monitors["vacuum.robot"]
+        assert (monitor.current_segment, monitor.start_time) == (1, started)
+        assert monitor.run_segments == [1, 2]
+
+        hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 2})
+        await hass.async_block_till_done()
+
+    vacuum, segment, duration = completion.await_args.args
+    assert (vacuum, segment) == ("vacuum.robot", 1)
+    assert duration == pytest.approx(400, abs=2)
+    assert monitor.completed_segments == {1}
+
+    await manager.async_unload()
+
+
+async def test_vacuum_monitor_completes_segment_finished_while_down(
+    hass: HomeAssistant,
+    hass_storage: dict,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that a segment that ended during the restart is completed up to the shutdown, without learning."""
+    started = dt_util.now().timestamp() - 900
+    _store_monitor(
+        hass_storage,
+        current_segment=1,
+        start_time=started,
+        run_segments=[1],
+        completed_segments=[],
+        last_seen=started + 600,
+    )
+    # Not up yet when Veronika starts
+    hass.states.async_set("vacuum.robot", "unavailable")
+
+    with patch.object(VeronikaManager, "_handle_segment_completion", AsyncMock()) as completion:
+        manager = await _create_manager(hass, single_room_config)
+        hass.states.async_set("vacuum.robot", "unknown")
+        await hass.async_block_till_done()
+        assert not completion.called
+
+        hass.states.async_set("vacuum.robot", "docked")
+        await hass.async_block_till_done()
+
+    assert completion.await_args.args[:2] == ("vacuum.robot", 1)
+    # The downtime after the shutdown does not count as cleaning time
+    assert completion.await_args.args[2] == pytest.approx(600, abs=2)
+    assert completion.await_args.kwargs == {"learn": False}
+    monitor = manager._vacuum_monitors["vacuum.robot"]
+    assert monitor.current_segment is None
+    assert monitor.run_segments == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert hass_storage["veronika.vacuum_monitors"]["data"] == {}
+
+    await manager.async_unload()
+
+
+async def test_vacuum_monitor_checkpointed_at_shutdown(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    single_room_config: dict,
+    setup_area: ar.AreaEntry,
+    setup_switch_entities: dict[str, str],
+) -> None:
+    """Test that stopping Home Assistant records when the segment was last seen in progress."""
+    hass.states.async_set("vacuum.robot", "docked")
+    manager = await _create_manager(hass, single_room_config)
+    hass.states.async_set("vacuum.robot", "cleaning", {"current_segment": 1})
+    await hass.async_block_till_done()
+    started = manager._vacuum_monitors["vacuum.robot"].start_time
+
+    freezer.tick(timedelta(seconds=5))
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    # The checkpoint is what the store writes on its final write
+    stored = manager._monitor_checkpoint["vacuum.robot"]
+    assert stored["last_seen"] == pytest.approx(started + 5, abs=1)
+
+    # Aborted right after the start: too short to count as cleaned after the restart
+    restored = VacuumMonitor.from_dict(stored)
+    assert restored.last_seen - restored.start_time < manager.min_segment_duration
+
+    await manager.async_unload()
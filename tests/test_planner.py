@@ -0,0 +1,36 @@
+"""Tests for the Veronika plan optimization helpers."""
+from custom_components.veronika.planner import SegmentTransitionGraph, order_path, select_within_budget
+
+
+def test_select_within_budget_maximizes_value() -> None:
+    """Test that the best combination is picked, not the greedy one."""
+    items = [("a", 30, 10.0), ("b", 20, 7.0), ("c", 20, 7.0), ("d", 50, 1.0)]
+
+    # Greedy by value would take a (30) and then only one of b/c
+    assert select_within_budget(items, 45) == {"b", "c"}
+    assert select_within_budget(items, 70) == {"a", "b", "c"}
+    assert select_within_budget(items, 10) == set()
+    assert select_within_budget([], 10) == set()
+
+
+def test_order_path_finds_short_route() -> None:
+    """Test that the heuristic follows a line of neighbours instead of the ID order."""
+    position = {1: 0, 7: 1, 3: 2, 9: 3, 2: 4}
+
+    route = order_path([1, 2, 3, 7, 9], lambda a, b: abs(position[a] - position[b]))
+
+    assert route in ([1, 7, 3, 9, 2], [2, 9, 3, 7, 1])
+
+
+def test_transition_graph_learns_and_round_trips() -> None:
+    """Test that observed transitions drive the order and survive serialization."""
+    graph = SegmentTransitionGraph(alpha=0.5)
+    assert graph.order("vacuum.robot", [3, 1, 2]) == [3, 1, 2]
+
+    graph.add("vacuum.robot", 1, 3, 10)
+    graph.add("vacuum.robot", 3, 2, 10)
+    graph.add("vacuum.robot", 3, 1, 30)
+    assert graph.cost("vacuum.robot", 1, 3) == 20
+
+    restored = SegmentTransitionGraph.from_dict(graph.as_dict())
+    assert restored.order("vacuum.robot", [1, 2, 3]) in ([1, 3, 2], [2, 3, 1])
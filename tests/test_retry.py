@@ -0,0 +1,134 @@
+"""Tests for the Veronika retry policy and circuit breaker."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError, ServiceNotFound
+
+from custom_components.veronika.retry import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _failing(errors: list):
+    """Return an async callable that raises the queued errors, then returns 'ok'."""
+    calls = []
+
+    async def func():
+        calls.append(None)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    func.calls = calls
+    return func
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_backoff_grows_exponentially_within_jitter() -> None:
+    """Test that delays double per attempt, are capped and only jittered downward."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.5)
+
+    for attempt, nominal in ((0, 1.0), (1, 2.0), (2, 4.0), (5, 5.0)):
+        for _ in range(20):
+            delay = policy.backoff(attempt)
+            assert nominal * 0.5 <= delay <= nominal
+
+
+async def test_retry_succeeds_after_transient_failures() -> None:
+    """Test that transient errors are retried and the breaker is reset on success."""
+    policy = RetryPolicy(attempts=3)
+    func = _failing([HomeAssistantError("busy"), HomeAssistantError("busy")])
+
+    with patch("custom_components.veronika.retry.asyncio.sleep", AsyncMock()) as sleep:
+        assert await policy.async_call("vacuum.robot", func) == "ok"
+
+    assert len(func.calls) == 3
+    assert sleep.await_count == 2
+    assert policy.diagnostics["retries"] == 2
+    assert policy.diagnostics["breakers"]["vacuum.robot"]["state"] == BREAKER_CLOSED
+
+
+async def test_non_retryable_errors_are_raised_immediately() -> None:
+    """Test that a missing service is not retried."""
+    policy = RetryPolicy(attempts=3)
+    func = _failing([ServiceNotFound("vacuum", "start")])
+
+    with pytest.raises(ServiceNotFound):
+        await policy.async_call("vacuum.robot", func)
+
+    assert len(func.calls) == 1
+
+
+async def test_breaker_opens_and_fails_fast() -> None:
+    """Test that a dead target stops being called until the reset timeout passes."""
+    clock = _Clock()
+    policy = RetryPolicy(attempts=3, failure_threshold=3, reset_timeout=60, clock=clock)
+    func = _failing([HomeAssistantError("offline")] * 4)
+
+    with patch("custom_components.veronika.retry.asyncio.sleep", AsyncMock()):
+        with pytest.raises(HomeAssistantError, match="offline"):
+            await policy.async_call("vacuum.robot", func)
+        assert policy.breaker("vacuum.robot").state == BREAKER_OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await policy.async_call("vacuum.robot", func)
+        assert len(func.calls) == 3
+        assert policy.diagnostics["short_circuits"] == 1
+
+        # Half-open trial fails and re-opens the breaker without further retries
+        clock.now = 61
+        with pytest.raises(HomeAssistantError, match="offline"):
+            await policy.async_call("vacuum.robot", func)
+        assert len(func.calls) == 4
+        assert policy.breaker("vacuum.robot").state == BREAKER_OPEN
+
+        # Next trial succeeds and closes the breaker
+        clock.now = 122
+        assert await policy.async_call("vacuum.robot", func) == "ok"
+
+    breaker = policy.diagnostics["breakers"]["vacuum.robot"]
+    assert breaker["state"] == BREAKER_CLOSED
+    assert breaker["trips"] == 2
+
+
+def test_breaker_half_open_after_timeout() -> None:
+    """Test the breaker state transitions directly."""
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == BREAKER_HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.failures == 0
@@ -0,0 +1,172 @@
+"""Tests for the Veronika cleaning plan sensor."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.veronika.const import SIGNAL_VACUUM_PROGRESS
+from custom_components.veronika.manager import VeronikaManager
+from custom_components.veronika.sensor import VeronikaEtaSensor, VeronikaPlanSensor
+from custom_components.veronika.switch import VeronikaSwitch
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _create_sensor(
+    hass: HomeAssistant, config: dict, update_delay: float
+) -> VeronikaPlanSensor:
+    """Create a plan sensor with its refresh mocked out."""
+    sensor = VeronikaPlanSensor(hass, VeronikaManager(hass, config), update_delay)
+    sensor._async_refresh = AsyncMock()
+    return sensor
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+async def test_plan_changes_are_coalesced(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """A burst of plan changes within the window results in one update."""
+    sensor = _create_sensor(hass, single_room_config, update_delay=2)
+
+    for _ in range(5):
+        sensor._on_plan_change()
+
+    sensor._async_refresh.assert_not_called()
+    assert sensor.write_stats["suppressed_updates"] == 4
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+
+    sensor._async_refresh.assert_awaited_once()
+
+
+async def test_plan_changes_without_delay_update_immediately(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """A zero window disables coalescing."""
+    sensor = _create_sensor(hass, single_room_config, update_delay=0)
+
+    sensor._on_plan_change()
+    sensor._on_plan_change()
+    await hass.async_block_till_done()
+
+    assert sensor._async_refresh.await_count == 2
+    assert sensor._suppressed_updates == 0
+
+
+async def test_identical_plan_is_not_rewritten(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Refreshing an unchanged plan skips the state write and counts it."""
+    sensor = VeronikaPlanSensor(hass, VeronikaManager(hass, single_room_config), 0)
+    sensor.async_write_ha_state = MagicMock()
+
+    await sensor._async_refresh()
+    await sensor._async_refresh()
+
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.skipped_writes == 1
+    assert "skipped_writes" not in sensor.extra_state_attributes
+    assert not sensor.should_poll
+
+
+async def test_bulky_attributes_are_not_recorded(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """The nested plan is excluded from the recorder and diagnostics are not attributes."""
+    sensor = VeronikaPlanSensor(hass, VeronikaManager(hass, single_room_config), 0)
+    await sensor.async_update()
+
+    unrecorded = sensor._unrecorded_attributes
+    assert "plan" in unrecorded
+    assert "scheduled_rooms" not in unrecorded
+    assert "total_cleaning" not in unrecorded
+    assert sensor.extra_state_attributes["scheduled_rooms"] == {}
+    assert not {"diagnostics", "suppressed_updates"} & set(sensor.extra_state_attributes)
+
+
+async def test_eta_sensor_reports_minutes_and_follows_progress(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """The ETA sensor shows plan and remaining time and updates on progress signals."""
+    manager = VeronikaManager(hass, single_room_config)
+    manager._durations.add("vacuum.robot", 1, 600)
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [1], "count": 1}}
+    sensor = VeronikaEtaSensor(hass, manager, "vacuum.robot")
+    sensor.async_write_ha_state = MagicMock()
+    await sensor.async_added_to_hass()
+
+    sensor._on_change()
+    assert sensor.native_value == 10.0
+    assert sensor.extra_state_attributes["remaining_minutes"] is None
+    assert sensor.extra_state_attributes["segments"] == {
+        "1": {"median_minutes": 10.0, "p90_minutes": 10.0, "samples": 1}
+    }
+
+    monitor = manager._get_monitor("vacuum.robot")
+    monitor.run_segments = [1]
+    monitor.current_segment = 1
+    monitor.start_time = dt_util.now().timestamp() - 300
+    async_dispatcher_send(hass, SIGNAL_VACUUM_PROGRESS, "vacuum.other")
+    assert sensor.extra_state_attributes["remaining_minutes"] is None
+    async_dispatcher_send(hass, SIGNAL_VACUUM_PROGRESS, "vacuum.robot")
+    assert sensor.extra_state_attributes["remaining_minutes"] == 5.0
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+async def test_eta_sensor_is_unknown_without_history(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """A plan of segments never cleaned before has no estimate rather than zero minutes."""
+    manager = VeronikaManager(hass, single_room_config)
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [1, 2], "count": 1}}
+    sensor = VeronikaEtaSensor(hass, manager, "vacuum.robot")
+
+    sensor._refresh()
+    assert sensor.native_value is None
+    assert sensor.extra_state_attributes["plan_p90_minutes"] is None
+    assert sensor.extra_state_attributes["unknown_segments"] == [1, 2]
+
+    # Nothing planned takes no time at all
+    manager._plan = {"vacuum.robot": {"rooms": [], "segments": [], "count": 0}}
+    sensor._refresh()
+    assert sensor.native_value == 0.0
+
+
+async def test_repeated_switch_commands_do_not_write_state(
+    hass: HomeAssistant,
+    single_room_config: dict,
+) -> None:
+    """Turning on a switch that is already on neither writes nor changes attributes."""
+    manager = VeronikaManager(hass, single_room_config)
+    switch = VeronikaSwitch("Living Room", "living_room", "clean", "mdi:broom")
+    switch.hass = hass
+    switch.entity_id = "switch.veronika_clean_living_room"
+    switch.async_write_ha_state = MagicMock()
+    manager.register_write_stats(switch)
+
+    for _ in range(3):
+        await switch.async_turn_on()
+
+    switch.async_write_ha_state.assert_called_once()
+    assert not switch.should_poll
+    assert switch.extra_state_attributes is None
+    assert manager.diagnostics["entities"] == {
+        "switch.veronika_clean_living_room": {"skipped_writes": 2}
+    }
@@ -0,0 +1,49 @@
+"""Tests for the Veronika vacuum command strategies."""
+from custom_components.veronika.strategies import (
+    CommandStrategy,
+    ConfiguredStrategy,
+    DreameStrategy,
+    RoborockStrategy,
+    StrategyRegistry,
+)
+
+
+def test_builtin_strategies_by_manufacturer() -> None:
+    """Test that manufacturers map to the built-in strategies with a generic fallback."""
+    registry = StrategyRegistry()
+
+    assert isinstance(registry.get("Roborock"), RoborockStrategy)
+    assert isinstance(registry.get("Dreame Technology"), DreameStrategy)
+    generic = registry.get("Unknown Brand")
+    assert type(generic) is CommandStrategy
+    assert generic.build_payload("vacuum.robot", [1]) == {
+        "service": "vacuum.start",
+        "data": {"entity_id": "vacuum.robot"},
+    }
+
+
+def test_configured_strategy_takes_precedence() -> None:
+    """Test that strategies from the configuration are checked before the built-ins."""
+    registry = StrategyRegistry.from_config([
+        {
+            "name": "ecovacs",
+            "manufacturer": "ecovacs",
+            "service": "ecovacs.clean_rooms",
+            "segments_key": "rooms",
+            "data": {"cleanings": 2},
+        },
+        {
+            "name": "custom_roborock",
+            "manufacturer": "Roborock",
+            "service": "roborock.clean",
+        },
+    ])
+
+    strategy = registry.get("ECOVACS Robotics")
+    assert isinstance(strategy, ConfiguredStrategy)
+    assert strategy.build_payload("vacuum.deebot", [3, 4]) == {
+        "service": "ecovacs.clean_rooms",
+        "data": {"cleanings": 2, "entity_id": "vacuum.deebot", "rooms": [3, 4]},
+    }
+    assert registry.get("Roborock").name == "custom_roborock"
+    assert isinstance(registry.get("Dreame"), DreameStrategy)
@@ -1,6 +1,4 @@
 """Tests for Veronika utility functions."""
-import pytest
-from unittest.mock import patch
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import (
@@ -12,11 +10,8 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.veronika.const import CONF_AREA, CONF_VACUUM, CONF_SEGMENTS
 from custom_components.veronika.utils import (
-    get_area_entities,
-    get_entity_device_class,
-    discover_occupancy_sensors,
-    discover_door_sensors,
     get_room_identity,
+    AreaSensorIndex,
 )
 
 
@@ -35,192 +30,54 @@ def _make_room(area="kitchen", vacuum="vacuum.robot", segments=None):
 
 
 # ---------------------------------------------------------------------------
-# TestGetAreaEntities
+# TestAreaSensorIndex
 # ---------------------------------------------------------------------------
 
 
-class TestGetAreaEntities:
-    """Tests for get_area_entities."""
+class TestAreaSensorIndex:
+    """Tests for AreaSensorIndex."""
 
-    async def test_empty_area(
+    async def test_indexes_doors_and_occupancy_per_area(
         self,
         hass: HomeAssistant,
         area_registry: ar.AreaRegistry,
-    ) -> None:
-        """Area with no entities and no devices returns empty list."""
-        area_registry.async_get_or_create("kitchen")
-        result = get_area_entities(hass, "kitchen")
-        assert result == []
-
-    async def test_direct_entities_only(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Returns entities directly assigned to the area."""
-        area = area_registry.async_get_or_create("kitchen")
-        entity_registry.async_get_or_create(
-            domain="light",
-            platform="test",
-            unique_id="kitchen_main",
-            config_entry=mock_config_entry,
-            suggested_object_id="kitchen_main",
-        )
-        entity_registry.async_update_entity(
-            "light.kitchen_main", area_id=area.id,
-        )
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="kitchen_temp",
-            config_entry=mock_config_entry,
-            suggested_object_id="kitchen_temp",
-        )
-        entity_registry.async_update_entity(
-            "sensor.kitchen_temp", area_id=area.id,
-        )
-
-        result = get_area_entities(hass, area.id)
-        assert sorted(result) == ["light.kitchen_main", "sensor.kitchen_temp"]
-
-    async def test_device_entities_with_no_area(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        device_registry: dr.DeviceRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Includes device entities where area_id is None (inheriting from device)."""
-        area = area_registry.async_get_or_create("kitchen")
-        device = device_registry.async_get_or_create(
-            config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "device_1")},
-            name="Kitchen Device",
-        )
-        device_registry.async_update_device(device.id, area_id=area.id)
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="device_sensor",
-            config_entry=mock_config_entry,
-            device_id=device.id,
-            suggested_object_id="device_sensor",
-        )
-        # Entity has no explicit area_id, inherits from device
-
-        result = get_area_entities(hass, area.id)
-        assert "sensor.device_sensor" in result
-
-    async def test_device_entities_with_own_area_excluded(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        device_registry: dr.DeviceRegistry,
         entity_registry: er.EntityRegistry,
         mock_config_entry: MockConfigEntry,
     ) -> None:
-        """Excludes device entities that have their own area_id set."""
+        """A single build maps each area to its door and occupancy sensors."""
         kitchen = area_registry.async_get_or_create("kitchen")
-        living = area_registry.async_get_or_create("living_room")
-        device = device_registry.async_get_or_create(
-            config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "device_1")},
-            name="Kitchen Device",
-        )
-        device_registry.async_update_device(device.id, area_id=kitchen.id)
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="device_sensor",
-            config_entry=mock_config_entry,
-            device_id=device.id,
-            suggested_object_id="device_sensor",
-        )
-        # Override entity to a different area
-        entity_registry.async_update_entity(
-            "sensor.device_sensor", area_id=living.id,
-        )
-
-        result = get_area_entities(hass, kitchen.id)
-        assert "sensor.device_sensor" not in result
-
-    async def test_deduplication(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        device_registry: dr.DeviceRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Same entity from direct and device lookup appears only once."""
-        area = area_registry.async_get_or_create("kitchen")
-        device = device_registry.async_get_or_create(
-            config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "device_1")},
-            name="Kitchen Device",
-        )
-        device_registry.async_update_device(device.id, area_id=area.id)
-        # Entity directly assigned to area AND on device in same area
-        entity_registry.async_get_or_create(
-            domain="light",
-            platform="test",
-            unique_id="kitchen_light",
-            config_entry=mock_config_entry,
-            device_id=device.id,
-            suggested_object_id="kitchen",
-        )
-        entity_registry.async_update_entity(
-            "light.kitchen", area_id=area.id,
-        )
+        hallway = area_registry.async_get_or_create("hallway")
+        for object_id, area, device_class in (
+            ("kitchen_occ", kitchen, "occupancy"),
+            ("kitchen_door", kitchen, "door"),
+            ("hallway_door", hallway, "door"),
+            ("hallway_window", hallway, "window"),
+        ):
+            entity_registry.async_get_or_create(
+                domain="binary_sensor",
+                platform="test",
+                unique_id=object_id,
+                config_entry=mock_config_entry,
+                suggested_object_id=object_id,
+            )
+            entity_registry.async_update_entity(
+                f"binary_sensor.{object_id}", area_id=area.id,
+            )
+            hass.states.async_set(
+                f"binary_sensor.{object_id}", "off", {"device_class": device_class}
+            )
 
-        result = get_area_entities(hass, area.id)
-        assert result.count("light.kitchen") == 1
+        index = AreaSensorIndex(hass)
+        index.async_build()
 
-    async def test_multiple_devices(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        device_registry: dr.DeviceRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Aggregates entities from multiple devices in the area."""
-        area = area_registry.async_get_or_create("kitchen")
-        dev1 = device_registry.async_get_or_create(
-            config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "dev1")},
-        )
-        dev2 = device_registry.async_get_or_create(
-            config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "dev2")},
-        )
-        device_registry.async_update_device(dev1.id, area_id=area.id)
-        device_registry.async_update_device(dev2.id, area_id=area.id)
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="dev1_temp",
-            config_entry=mock_config_entry,
-            device_id=dev1.id,
-            suggested_object_id="dev1_temp",
-        )
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="dev2_humidity",
-            config_entry=mock_config_entry,
-            device_id=dev2.id,
-            suggested_object_id="dev2_humidity",
-        )
-
-        result = get_area_entities(hass, area.id)
-        assert "sensor.dev1_temp" in result
-        assert "sensor.dev2_humidity" in result
+        assert index.get_occupancy_sensors(kitchen.id) == ["binary_sensor.kitchen_occ"]
+        assert index.get_occupancy_sensors(hallway.id) == []
+        assert sorted(index.get_door_sensors([kitchen.id, hallway.id])) == [
+            "binary_sensor.hallway_door",
+            "binary_sensor.kitchen_door",
+        ]
 
-    async def test_mixed_direct_and_device_entities(
+    async def test_device_area_and_registry_device_class(
         self,
         hass: HomeAssistant,
         area_registry: ar.AreaRegistry,
@@ -228,407 +85,145 @@ class TestGetAreaEntities:
         entity_registry: er.EntityRegistry,
         mock_config_entry: MockConfigEntry,
     ) -> None:
-        """Returns both direct and device-inherited entities."""
+        """Entities inherit the device area and fall back to the registry class."""
         area = area_registry.async_get_or_create("kitchen")
         device = device_registry.async_get_or_create(
             config_entry_id=mock_config_entry.entry_id,
-            identifiers={("test", "dev1")},
+            identifiers={("test", "contact_1")},
         )
         device_registry.async_update_device(device.id, area_id=area.id)
-        entity_registry.async_get_or_create(
-            domain="light",
-            platform="test",
-            unique_id="kitchen_light",
-            config_entry=mock_config_entry,
-            suggested_object_id="kitchen",
-        )
-        entity_registry.async_update_entity("light.kitchen", area_id=area.id)
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="kitchen_temp",
-            config_entry=mock_config_entry,
-            device_id=device.id,
-            suggested_object_id="kitchen_temp",
-        )
-
-        result = get_area_entities(hass, area.id)
-        assert sorted(result) == ["light.kitchen", "sensor.kitchen_temp"]
-
-
-# ---------------------------------------------------------------------------
-# TestGetEntityDeviceClass
-# ---------------------------------------------------------------------------
-
-
-class TestGetEntityDeviceClass:
-    """Tests for get_entity_device_class."""
-
-    async def test_prefers_state_attribute(
-        self,
-        hass: HomeAssistant,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Returns device_class from state attributes over registry."""
         entity_registry.async_get_or_create(
             domain="binary_sensor",
             platform="test",
-            unique_id="kitchen_occ",
-            config_entry=mock_config_entry,
-            original_device_class="motion",
-            suggested_object_id="kitchen",
-        )
-        hass.states.async_set(
-            "binary_sensor.kitchen", "on", {"device_class": "occupancy"}
-        )
-
-        result = get_entity_device_class(hass, "binary_sensor.kitchen")
-        assert result == "occupancy"
-
-    async def test_fallback_to_registry_device_class(
-        self,
-        hass: HomeAssistant,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Falls back to registry device_class when state has none."""
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="door_1",
+            unique_id="contact_1",
             config_entry=mock_config_entry,
+            device_id=device.id,
             original_device_class="door",
-            suggested_object_id="door",
-        )
-        hass.states.async_set("binary_sensor.door", "on", {})
-
-        result = get_entity_device_class(hass, "binary_sensor.door")
-        assert result == "door"
-
-    async def test_fallback_to_original_device_class(
-        self,
-        hass: HomeAssistant,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Falls back to original_device_class when device_class is falsy."""
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="motion_1",
-            config_entry=mock_config_entry,
-            original_device_class="motion",
-            suggested_object_id="motion",
-        )
-        hass.states.async_set("binary_sensor.motion", "on", {})
-
-        result = get_entity_device_class(hass, "binary_sensor.motion")
-        assert result == "motion"
-
-    async def test_no_state_returns_registry_class(
-        self,
-        hass: HomeAssistant,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Returns registry device_class when entity has no state."""
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="humidity_1",
-            config_entry=mock_config_entry,
-            original_device_class="humidity",
-            suggested_object_id="humidity",
-        )
-        # No state set
-
-        result = get_entity_device_class(hass, "sensor.humidity")
-        assert result == "humidity"
-
-    async def test_no_state_no_entry_returns_none(
-        self, hass: HomeAssistant,
-    ) -> None:
-        """Returns None when entity has neither state nor registry entry."""
-        result = get_entity_device_class(hass, "binary_sensor.ghost")
-        assert result is None
-
-    async def test_state_attribute_error_falls_through_to_registry(
-        self,
-        hass: HomeAssistant,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Falls through to registry when state attributes have no device_class."""
-        entity_registry.async_get_or_create(
-            domain="sensor",
-            platform="test",
-            unique_id="temp_1",
-            config_entry=mock_config_entry,
-            original_device_class="temperature",
-            suggested_object_id="temp",
-        )
-        # State with no device_class attribute
-        hass.states.async_set("sensor.temp", "22.5", {"unit": "°C"})
-
-        result = get_entity_device_class(hass, "sensor.temp")
-        assert result == "temperature"
-
-
-# ---------------------------------------------------------------------------
-# TestDiscoverOccupancySensors
-# ---------------------------------------------------------------------------
-
-
-class TestDiscoverOccupancySensors:
-    """Tests for discover_occupancy_sensors."""
-
-    async def test_finds_occupancy_sensor(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Discovers an occupancy sensor in the area."""
-        area = area_registry.async_get_or_create("kitchen")
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="kitchen_occ",
-            config_entry=mock_config_entry,
-            suggested_object_id="kitchen_occ",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.kitchen_occ", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.kitchen_occ", "off", {"device_class": "occupancy"}
+            suggested_object_id="contact",
         )
 
-        result = discover_occupancy_sensors(hass, area.id)
-        assert result == ["binary_sensor.kitchen_occ"]
+        index = AreaSensorIndex(hass)
+        index.async_build()
 
-    async def test_ignores_non_occupancy_sensor(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Excludes entities that are not occupancy class."""
-        area = area_registry.async_get_or_create("kitchen")
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="kitchen_door",
-            config_entry=mock_config_entry,
-            suggested_object_id="kitchen_door",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.kitchen_door", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.kitchen_door", "off", {"device_class": "door"}
-        )
+        assert index.get_door_sensors([area.id]) == ["binary_sensor.contact"]
 
-        result = discover_occupancy_sensors(hass, area.id)
-        assert result == []
-
-    async def test_finds_multiple_sensors(
+    async def test_platform_filter(
         self,
         hass: HomeAssistant,
         area_registry: ar.AreaRegistry,
         entity_registry: er.EntityRegistry,
         mock_config_entry: MockConfigEntry,
     ) -> None:
-        """Discovers all occupancy sensors in the area."""
+        """Occupancy lookups honour the platform filter."""
         area = area_registry.async_get_or_create("kitchen")
-        for idx in (1, 2):
+        for platform in ("mqtt", "zwave"):
             entity_registry.async_get_or_create(
                 domain="binary_sensor",
-                platform="test",
-                unique_id=f"occ_{idx}",
+                platform=platform,
+                unique_id=f"occ_{platform}",
                 config_entry=mock_config_entry,
-                suggested_object_id=f"occ_{idx}",
+                suggested_object_id=f"occ_{platform}",
             )
             entity_registry.async_update_entity(
-                f"binary_sensor.occ_{idx}", area_id=area.id,
+                f"binary_sensor.occ_{platform}", area_id=area.id,
             )
             hass.states.async_set(
-                f"binary_sensor.occ_{idx}", "off", {"device_class": "occupancy"}
+                f"binary_sensor.occ_{platform}", "off", {"device_class": "occupancy"}
             )
 
-        result = discover_occupancy_sensors(hass, area.id)
-        assert sorted(result) == ["binary_sensor.occ_1", "binary_sensor.occ_2"]
+        index = AreaSensorIndex(hass)
+        index.async_build()
 
-    async def test_platform_filter_matching(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Includes sensor when platform matches filter."""
-        area = area_registry.async_get_or_create("kitchen")
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="mqtt",
-            unique_id="occ_mqtt",
-            config_entry=mock_config_entry,
-            suggested_object_id="occ",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.occ", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.occ", "off", {"device_class": "occupancy"}
-        )
-
-        result = discover_occupancy_sensors(hass, area.id, platform_filter="mqtt")
-        assert result == ["binary_sensor.occ"]
+        assert index.get_occupancy_sensors(area.id, platform_filter="mqtt") == [
+            "binary_sensor.occ_mqtt"
+        ]
+        assert len(index.get_occupancy_sensors(area.id)) == 2
 
-    async def test_platform_filter_not_matching(
+    async def test_update_entity_moves_between_areas(
         self,
         hass: HomeAssistant,
         area_registry: ar.AreaRegistry,
         entity_registry: er.EntityRegistry,
         mock_config_entry: MockConfigEntry,
     ) -> None:
-        """Excludes sensor when platform doesn't match filter."""
-        area = area_registry.async_get_or_create("kitchen")
+        """Re-indexing an entity reports both the old and the new area."""
+        kitchen = area_registry.async_get_or_create("kitchen")
+        hallway = area_registry.async_get_or_create("hallway")
         entity_registry.async_get_or_create(
             domain="binary_sensor",
-            platform="zwave",
-            unique_id="occ_zwave",
+            platform="test",
+            unique_id="door",
             config_entry=mock_config_entry,
-            suggested_object_id="occ",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.occ", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.occ", "off", {"device_class": "occupancy"}
+            original_device_class="door",
+            suggested_object_id="door",
         )
+        entity_registry.async_update_entity("binary_sensor.door", area_id=kitchen.id)
 
-        result = discover_occupancy_sensors(hass, area.id, platform_filter="mqtt")
-        assert result == []
-
-    async def test_empty_area_returns_empty(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-    ) -> None:
-        """Returns empty list for area with no entities."""
-        area_registry.async_get_or_create("empty_room")
-        result = discover_occupancy_sensors(hass, "empty_room")
-        assert result == []
-
-
-# ---------------------------------------------------------------------------
-# TestDiscoverDoorSensors
-# ---------------------------------------------------------------------------
+        index = AreaSensorIndex(hass)
+        index.async_build()
+        assert index.get_door_sensors([kitchen.id]) == ["binary_sensor.door"]
 
+        entity_registry.async_update_entity("binary_sensor.door", area_id=hallway.id)
+        changed = index.async_update_entity("binary_sensor.door")
 
-class TestDiscoverDoorSensors:
-    """Tests for discover_door_sensors."""
+        assert changed == {kitchen.id, hallway.id}
+        assert index.get_door_sensors([kitchen.id]) == []
+        assert index.get_door_sensors([hallway.id]) == ["binary_sensor.door"]
+        assert index.async_update_entity("binary_sensor.door") == set()
 
-    async def test_finds_door_sensor(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Discovers a door sensor in the area."""
-        area = area_registry.async_get_or_create("hallway")
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="front_door",
-            config_entry=mock_config_entry,
-            suggested_object_id="front_door",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.front_door", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.front_door", "on", {"device_class": "door"}
-        )
-
-        result = discover_door_sensors(hass, [area.id])
-        assert result == ["binary_sensor.front_door"]
-
-    async def test_multiple_areas(
+    async def test_entity_area_for_sensors_and_tracked_vacuum(
         self,
         hass: HomeAssistant,
         area_registry: ar.AreaRegistry,
+        device_registry: dr.DeviceRegistry,
         entity_registry: er.EntityRegistry,
         mock_config_entry: MockConfigEntry,
     ) -> None:
-        """Discovers door sensors across multiple areas."""
-        area1 = area_registry.async_get_or_create("area_1")
-        area2 = area_registry.async_get_or_create("area_2")
+        """Areas of sensors and tracked vacuums are precomputed and follow device moves."""
+        kitchen = area_registry.async_get_or_create("kitchen")
+        hallway = area_registry.async_get_or_create("hallway")
         entity_registry.async_get_or_create(
             domain="binary_sensor",
             platform="test",
-            unique_id="door_1",
+            unique_id="door",
             config_entry=mock_config_entry,
-            suggested_object_id="door_1",
+            original_device_class="door",
+            suggested_object_id="door",
         )
-        entity_registry.async_update_entity(
-            "binary_sensor.door_1", area_id=area1.id,
+        entity_registry.async_update_entity("binary_sensor.door", area_id=kitchen.id)
+        device = device_registry.async_get_or_create(
+            config_entry_id=mock_config_entry.entry_id,
+            identifiers={("test", "robot")},
         )
+        device_registry.async_update_device(device.id, area_id=hallway.id)
         entity_registry.async_get_or_create(
-            domain="binary_sensor",
+            domain="vacuum",
             platform="test",
-            unique_id="door_2",
+            unique_id="robot",
             config_entry=mock_config_entry,
-            suggested_object_id="door_2",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.door_2", area_id=area2.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.door_1", "on", {"device_class": "door"}
-        )
-        hass.states.async_set(
-            "binary_sensor.door_2", "on", {"device_class": "door"}
+            device_id=device.id,
+            suggested_object_id="robot",
         )
 
-        result = discover_door_sensors(hass, [area1.id, area2.id])
-        assert sorted(result) == ["binary_sensor.door_1", "binary_sensor.door_2"]
+        index = AreaSensorIndex(hass)
+        index.track_entities(["vacuum.robot"])
+        index.async_build()
 
-    async def test_ignores_non_door_sensor(
-        self,
-        hass: HomeAssistant,
-        area_registry: ar.AreaRegistry,
-        entity_registry: er.EntityRegistry,
-        mock_config_entry: MockConfigEntry,
-    ) -> None:
-        """Excludes entities without door device class."""
-        area = area_registry.async_get_or_create("hallway")
-        entity_registry.async_get_or_create(
-            domain="binary_sensor",
-            platform="test",
-            unique_id="window_1",
-            config_entry=mock_config_entry,
-            suggested_object_id="window",
-        )
-        entity_registry.async_update_entity(
-            "binary_sensor.window", area_id=area.id,
-        )
-        hass.states.async_set(
-            "binary_sensor.window", "on", {"device_class": "window"}
-        )
+        assert index.get_entity_area("binary_sensor.door") == kitchen.id
+        assert index.get_entity_area("vacuum.robot") == hallway.id
+        assert index.get_entity_area("light.unknown") is None
+
+        device_registry.async_update_device(device.id, area_id=kitchen.id)
+        assert index.async_update_device(device.id) == {kitchen.id, hallway.id}
+        assert index.get_entity_area("vacuum.robot") == kitchen.id
 
-        result = discover_door_sensors(hass, [area.id])
-        assert result == []
+    async def test_unknown_area_returns_empty(self, hass: HomeAssistant) -> None:
+        """Lookups for unindexed areas return empty lists."""
+        index = AreaSensorIndex(hass)
+        index.async_build()
 
-    async def test_empty_area_ids(self, hass: HomeAssistant) -> None:
-        """Returns empty list when given no area IDs."""
-        result = discover_door_sensors(hass, [])
-        assert result == []
+        assert index.get_occupancy_sensors("nowhere") == []
+        assert index.get_door_sensors(["nowhere"]) == []
 
 
 # ---------------------------------------------------------------------------